@@ -0,0 +1,88 @@
+"""
+Logging overhead benchmark
+Times one tool call end to end under each logging configuration, with log
+output going to /dev/null so terminal speed doesn't count
+
+Run from the project root:
+    python benchmarks/bench_logging.py [--repeat N]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ['MOBUS_GEOCODE_CACHE'] = 'off'
+os.environ['MOBUS_RELOAD_INTERVAL'] = '0'
+
+from fastmcp import Client  # noqa: E402
+
+from src.server import mcp, RequestLoggingMiddleware  # noqa: E402
+from src.utils import logging_pipeline  # noqa: E402
+from harness import measure_async  # noqa: E402
+
+LOGGERS = [logging.getLogger("fastmcp"), logging.getLogger("Mo.Bus")]
+# The queue handler the server installed, before any case replaces it
+QUEUE_HANDLER = LOGGERS[0].handlers[0]
+
+# (name, level, payloads, sample rate, queued)
+CASES = [
+    ('debug + payloads, direct', 'DEBUG', True, 1.0, False),
+    ('debug + payloads, queued', 'DEBUG', True, 1.0, True),
+    ('info, direct', 'INFO', False, 1.0, False),
+    ('info, queued', 'INFO', False, 1.0, True),
+    ('info, 10% sampled', 'INFO', False, 0.1, True),
+    ('info, 1% sampled', 'INFO', False, 0.01, True),
+    ('warning', 'WARNING', False, 1.0, True)
+]
+
+
+def configure(level: str, payloads: bool, rate: float, queued: bool):
+    """Apply one case to the running server's loggers and middleware"""
+    listener = logging_pipeline._listener
+    handlers = [QUEUE_HANDLER] if queued else list(listener.handlers)
+    for target in LOGGERS:
+        target.handlers = handlers
+        target.setLevel(level)
+    for middleware in mcp.middleware:
+        if isinstance(middleware, RequestLoggingMiddleware):
+            middleware.include_payloads = payloads
+    logging_pipeline.SAMPLE_RATE = rate
+
+
+async def run(repeat: int):
+    print(f"{'logging':<28} {'median ms':>10} {'overhead ms':>12}")
+    async with Client(mcp) as client:
+        def call():
+            return client.call_tool('search_bus_routes', {'query': 'Puri'})
+
+        configure('CRITICAL', False, 1.0, True)
+        floor = statistics.median(await measure_async(call, repeat, 20))
+        print(f"{'off':<28} {floor:10.3f} {0:12.3f}")
+
+        for name, level, payloads, rate, queued in CASES:
+            configure(level, payloads, rate, queued)
+            ms = statistics.median(await measure_async(call, repeat, 20))
+            # Let the writer catch up so one case's backlog doesn't slow the next
+            logging_pipeline._listener.queue.join()
+            print(f"{name:<28} {ms:10.3f} {ms - floor:12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200, help='timed calls per case')
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull:
+        stderr, sys.stderr = sys.stderr, devnull
+        try:
+            asyncio.run(run(args.repeat))
+        finally:
+            sys.stderr = stderr
+
+
+if __name__ == '__main__':
+    main()
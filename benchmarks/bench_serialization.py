@@ -0,0 +1,66 @@
+"""
+Serialization benchmark
+Times each JSON backend and mode on the largest payloads the server sends
+
+Run from the project root:
+    python benchmarks/bench_serialization.py [--repeat N]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data import get_dataset  # noqa: E402
+from src.services.planner import plan_journey  # noqa: E402
+from src.utils import serialization  # noqa: E402
+
+
+def payloads():
+    dataset = get_dataset()
+    return {
+        'stops/all': dataset.stops,
+        'routes/all': dataset.routes,
+        'plan_bus_journey': plan_journey('KIIT Square', 'Puri')
+    }
+
+
+def time_call(func, data, compact: bool, repeat: int) -> float:
+    """Median milliseconds per call"""
+    func(data, compact)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(data, compact)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50, help='timed calls per case')
+    args = parser.parse_args()
+
+    backends = [('json', serialization.dumps_json)]
+    if serialization.orjson is not None:
+        backends.append(('orjson', serialization.dumps_orjson))
+    else:
+        print("orjson is not installed; timing the standard library only\n")
+
+    print(f"{'payload':<18} {'backend':<7} {'mode':<8} {'median ms':>10} {'bytes':>9} {'speedup':>8}")
+    for name, data in payloads().items():
+        baseline = None
+        for backend, func in backends:
+            for compact in (False, True):
+                ms = time_call(func, data, compact, args.repeat)
+                size = len(func(data, compact).encode('utf-8'))
+                if baseline is None:
+                    baseline = ms
+                mode = 'compact' if compact else 'pretty'
+                print(f"{name:<18} {backend:<7} {mode:<8} {ms:10.3f} {size:9d} {baseline / ms:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
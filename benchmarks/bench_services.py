@@ -0,0 +1,69 @@
+"""
+Micro-benchmarks of the data and service functions behind the tools
+
+Name lookups and planner results are memoized per dataset, so most calls
+here measure the warm path; the "uncached" entries call the underlying index
+or planner directly.
+"""
+from typing import Callable, Dict, List, Tuple
+
+from src.data import get_dataset, search_stops, search_routes, get_routes_for_stop, calculate_fare
+from src.services.planner import find_routes, plan_journey, plan_timed_journey, _plan_journey
+from src.services.geocoding import find_nearest_stops, get_coordinates
+from src.services.raptor import raptor_search, raptor_search_many, raptor_reach
+from src.services.reachability import find_reachable_stops
+from src.services.fares import stop_fare
+from src.services.connection_scan import connection_scan
+from src.utils.distance import calculate_distance, distances_from, stop_points
+
+GROUP = 'services'
+
+
+def benchmarks(points: Dict) -> List[Tuple[str, Callable]]:
+    """
+    (name, zero-argument callable) pairs, in report order
+
+    Args:
+        points: Query endpoints, see harness.endpoints
+    """
+    direct, transfer, point, city = points['direct'], points['transfer'], points['point'], points['city']
+    dataset = get_dataset()
+    network = dataset.network
+    sources = network.ids_for(dataset.stop_index.match(transfer[0]))
+    targets = network.ids_for(dataset.stop_index.match(transfer[1]))
+    stop_coordinates = stop_points(dataset.stops)
+    lats = [lat for _, lat, _ in stop_coordinates]
+    lons = [lon for _, _, lon in stop_coordinates]
+    # Twenty destinations spread over the network, for one shared search
+    target_sets = [[stop] for stop in range(0, network.num_stops, max(network.num_stops // 20, 1))][:20]
+
+    return [
+        ('search_stops exact', lambda: search_stops(direct[0])),
+        ('search_stops city', lambda: search_stops(city)),
+        ('search_stops typo', lambda: search_stops('baramnda')),
+        ('stop name index uncached', lambda: dataset.stop_name_index._search('vani vihar')),
+        ('stop name index typo uncached', lambda: dataset.stop_name_index._search('baramnda')),
+        ('search_routes', lambda: search_routes(city)),
+        ('get_routes_for_stop', lambda: get_routes_for_stop(direct[0])),
+        ('find_routes direct', lambda: find_routes(*direct)),
+        ('find_routes none', lambda: find_routes(*transfer)),
+        ('plan_journey direct', lambda: plan_journey(*direct)),
+        ('plan_journey transfer', lambda: plan_journey(*transfer)),
+        ('plan_journey transfer uncached', lambda: _plan_journey(dataset, *transfer, {})),
+        ('plan_timed_journey transfer', lambda: plan_timed_journey(*transfer, '09:00')),
+        ('raptor_search transfer', lambda: raptor_search(network, sources, targets, max_transfers=3)),
+        ('raptor_search_many 20 targets', lambda: raptor_search_many(network, sources, target_sets, max_transfers=3)),
+        ('one_transfer table transfer', lambda: dataset.transfers.one_transfer(sources, targets)),
+        ('raptor_reach 1 transfer', lambda: raptor_reach(network, sources, max_transfers=1)),
+        ('find_reachable_stops 60 min', lambda: find_reachable_stops(transfer[0], 1, 60)),
+        ('connection_scan transfer', lambda: connection_scan(
+            dataset.timetable, network.num_stops, sources, targets, 9 * 60)),
+        ('find_nearest_stops', lambda: find_nearest_stops(*point, dataset.stops)),
+        ('get_coordinates local', lambda: get_coordinates(direct[0])),
+        ('get_coordinates stubbed network', lambda: get_coordinates('Some Unlisted Place')),
+        ('calculate_distance', lambda: calculate_distance(*point, 19.8135, 85.8312)),
+        ('distances_from all stops', lambda: distances_from(*point, lats, lons)),
+        ('calculate_fare', lambda: calculate_fare(12.5)),
+        ('stop_fare transfer', lambda: stop_fare(*transfer)),
+        ('route distance lookup', lambda: dataset.route_distances.between(points['route'], 0, 5))
+    ]
@@ -0,0 +1,72 @@
+"""
+End-to-end benchmarks: every MCP tool (and the data resources) called
+through an in-process FastMCP client, so timings include request routing,
+middleware and JSON serialization
+"""
+from typing import Dict, List, Tuple
+
+from fastmcp import Client
+
+from src.server import mcp
+
+GROUP = 'tools'
+
+def tool_calls(points: Dict) -> List[Tuple[str, str, Dict]]:
+    """(benchmark name, tool, arguments) for every tool"""
+    (start, end), (from_stop, to_stop) = points['direct'], points['transfer']
+    return [
+        ('search_bus_routes', 'search_bus_routes', {'query': points['city']}),
+        ('search_bus_stops', 'search_bus_stops', {'query': start[:4]}),
+        ('get_route_details', 'get_route_details', {'route_number': points['route']}),
+        ('find_routes_between_stops', 'find_routes_between_stops', {'from_stop': start, 'to_stop': end}),
+        ('plan_bus_journey direct', 'plan_bus_journey', {'start': start, 'end': end}),
+        ('plan_bus_journey transfer', 'plan_bus_journey', {'start': from_stop, 'end': to_stop}),
+        ('plan_bus_journey timed', 'plan_bus_journey',
+         {'start': from_stop, 'end': to_stop, 'departure_time': '09:00'}),
+        ('calculate_bus_fare stops', 'calculate_bus_fare', {'from_stop': from_stop, 'to_stop': to_stop}),
+        ('calculate_bus_fare stubbed geocoding', 'calculate_bus_fare',
+         {'from_stop': 'Some Unlisted Place', 'to_stop': 'Another Unlisted Place'}),
+        ('calculate_bus_fare distance', 'calculate_bus_fare', {'distance_km': 12.5}),
+        ('plan_bus_journeys', 'plan_bus_journeys',
+         {'pairs': [[start, end], [from_stop, to_stop], [start, to_stop], [from_stop, end]]}),
+        ('fare_matrix', 'fare_matrix', {'origins': [start, from_stop], 'destinations': [end, to_stop]}),
+        ('get_reachable_stops', 'get_reachable_stops', {'stop_name': start, 'max_transfers': 1}),
+        ('get_stops_for_route', 'get_stops_for_route', {'route_number': points['route']}),
+        ('get_routes_for_stop', 'get_routes_for_stop', {'stop_name': start}),
+        ('reload_bus_database unchanged', 'reload_bus_database', {})
+    ]
+
+
+def resource_reads(points: Dict) -> List[Tuple[str, str]]:
+    """(benchmark name, resource uri) pairs"""
+    return [
+        ('resource routes/all', 'mobus://routes/all'),
+        ('resource stops/all', 'mobus://stops/all'),
+        ('resource stops/city', f"mobus://stops/city/{points['city']}"),
+        ('resource routes/{route_number}', f"mobus://routes/{points['route']}")
+    ]
+
+
+async def run(points: Dict, measure_async, summarize, repeat: int, warmup: int, name_filter: str = '') -> List[Dict]:
+    """Benchmark each tool call and resource read, returning summaries"""
+    calls = tool_calls(points)
+    results = []
+    async with Client(mcp) as client:
+        tools = {tool.name for tool in await client.list_tools()}
+        missing = tools - {tool for _, tool, _ in calls}
+        if missing:
+            print(f"Warning: no benchmark for tools {', '.join(sorted(missing))}")
+
+        for name, tool, arguments in calls:
+            if name_filter in name:
+                samples = await measure_async(
+                    lambda: client.call_tool(tool, arguments), repeat, warmup
+                )
+                results.append(summarize(name, GROUP, samples))
+
+        for name, uri in resource_reads(points):
+            if name_filter in name:
+                samples = await measure_async(lambda: client.read_resource(uri), repeat, warmup)
+                results.append(summarize(name, GROUP, samples))
+
+    return results
@@ -0,0 +1,255 @@
+"""
+Benchmark harness
+Timing loops, latency percentiles, a geocoding network stub and baseline files
+"""
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+DEFAULT_BASELINE = BASELINE_DIR / 'baseline.json'
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted samples"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def result_key(result: Dict) -> str:
+    """Unique name of a result, as stored in baselines"""
+    return f"{result['group']}/{result['name']}"
+
+
+def summarize(name: str, group: str, samples: List[float]) -> Dict:
+    """Latency percentiles (ms) and throughput of one benchmark"""
+    ordered = sorted(samples)
+    mean = statistics.fmean(ordered)
+    return {
+        'name': name,
+        'group': group,
+        'runs': len(ordered),
+        'p50_ms': round(percentile(ordered, 50), 5),
+        'p95_ms': round(percentile(ordered, 95), 5),
+        'p99_ms': round(percentile(ordered, 99), 5),
+        'mean_ms': round(mean, 5),
+        'ops_per_sec': round(1000 / mean, 1) if mean > 0 else float('inf')
+    }
+
+
+# Calls faster than this are timed in batches, so timer overhead doesn't dominate
+MIN_SAMPLE_MS = 0.05
+
+
+def measure(func: Callable, repeat: int, warmup: int) -> List[float]:
+    """
+    Milliseconds per call of func(), after warmup calls
+
+    Each sample of a very fast function is the average over a batch of
+    calls, which narrows the percentiles to the batch level.
+    """
+    for _ in range(warmup):
+        func()
+
+    started = time.perf_counter()
+    func()
+    single = (time.perf_counter() - started) * 1000
+    batch = max(1, int(MIN_SAMPLE_MS / single)) if single > 0 else 100
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(batch):
+            func()
+        samples.append((time.perf_counter() - started) * 1000 / batch)
+    return samples
+
+
+async def measure_async(func: Callable, repeat: int, warmup: int) -> List[float]:
+    """Milliseconds per await of func(), after warmup calls"""
+    for _ in range(warmup):
+        await func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+# ================== QUERY ENDPOINTS ==================
+
+# What the benchmarks query in the bundled database
+BUNDLED_ENDPOINTS = {
+    'direct': ('KIIT Square', 'Bhubaneswar Railway Station'),
+    'transfer': ('KIIT Square', 'Puri'),
+    'route': '1-H',
+    'city': 'Puri',
+    'point': (20.3557, 85.8183)
+}
+
+
+def endpoints() -> Dict:
+    """
+    Stops, route, city and point the benchmarks query
+
+    The bundled database's, or, for another database such as a synthetic
+    one (MOBUS_DATABASE), equivalents picked from it with a fixed seed.
+    """
+    from src.data import get_dataset
+    from src.services.planner import plan_journey
+
+    dataset = get_dataset()
+    if BUNDLED_ENDPOINTS['route'] in dataset.routes and BUNDLED_ENDPOINTS['direct'][0] in dataset.stop_ids_by_name:
+        return BUNDLED_ENDPOINTS
+
+    route_number = next(iter(dataset.routes))
+    route_stops = dataset.routes[route_number]['stops']
+    direct = (route_stops[0], route_stops[-1])
+
+    rng = random.Random(0)
+    names = sorted({stop for route in dataset.routes.values() for stop in route['stops']})
+    transfer = direct
+    for _ in range(500):
+        pair = tuple(rng.sample(names, 2))
+        if plan_journey(*pair).get('journey_type') == 'with_transfer':
+            transfer = pair
+            break
+
+    stop_ids = dataset.stop_ids_by_name.get(direct[0], [])
+    stop = dataset.stops[stop_ids[0]] if stop_ids else {}
+    coords = stop.get('coordinates')
+    return {
+        'direct': direct,
+        'transfer': transfer,
+        'route': route_number,
+        'city': stop.get('city') or next(iter(dataset.stops.values())).get('city', ''),
+        'point': (coords['lat'], coords['lon']) if coords else BUNDLED_ENDPOINTS['point']
+    }
+
+
+# ================== GEOCODING STUB ==================
+
+def fake_geocode(address: str, city: str = "Bhubaneswar") -> Dict:
+    """Deterministic coordinates around Bhubaneswar, shaped like a provider result"""
+    digest = zlib.crc32(f"{address}|{city}".lower().encode('utf-8'))
+    return {
+        'lat': 20.20 + (digest % 2000) / 10000,
+        'lon': 85.75 + (digest // 2000 % 2000) / 10000,
+        'name': address,
+        'address': f"{address}, {city}",
+        'source': 'benchmark_stub',
+        'confidence': 'medium'
+    }
+
+
+def stub_geocoding_network():
+    """
+    Replace every network provider of the shared geocoders with fake_geocode
+
+    Known stops and landmarks still resolve through the local gazetteer, so
+    only the network round trip (and its rate limiting) is taken out.
+    """
+    from src.services.geocoding import get_geocoder
+    from src.services.async_geocoding import get_async_geocoder
+
+    async def fake_geocode_async(address: str, city: str = "Bhubaneswar") -> Dict:
+        return fake_geocode(address, city)
+
+    geocoder = get_geocoder()
+    geocoder.serpapi_key = None
+    geocoder.geocode_with_serpapi = lambda address, city="Bhubaneswar": None
+    geocoder.geocode_with_osm = fake_geocode
+    geocoder.reverse_geocode = lambda lat, lon: {'display_name': f"{lat:.4f}, {lon:.4f}"}
+
+    async_geocoder = get_async_geocoder()
+    async_geocoder.serpapi_key = None
+    async_geocoder.geocode_with_osm = fake_geocode_async
+
+
+# ================== BASELINES ==================
+
+def environment() -> Dict:
+    """Where a set of results was measured"""
+    from src.data import get_dataset
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dataset_version': get_dataset().version,
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+
+
+def save_baseline(path: Path, results: List[Dict]):
+    """Write results as a baseline, merging into an existing file"""
+    path = Path(path)
+    previous = load_baseline(path) or {}
+    baseline = {'environment': environment(), 'results': previous.get('results', {})}
+    for result in results:
+        baseline['results'][result_key(result)] = result
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2) + '\n', encoding='utf-8')
+
+
+def load_baseline(path: Path) -> Optional[Dict]:
+    """A saved baseline, or None when there is none"""
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+
+
+def report(results: List[Dict], baseline: Optional[Dict] = None, threshold: float = 0.2) -> List[str]:
+    """
+    Print a results table, comparing p50 against the baseline when given
+
+    Returns:
+        Names of benchmarks whose p50 is slower than the baseline by more
+        than threshold (a fraction, 0.2 = 20%)
+    """
+    previous = (baseline or {}).get('results', {})
+    regressions = []
+
+    print(f"{'benchmark':<44} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'vs base':>9}")
+    group = None
+    for result in results:
+        if result['group'] != group:
+            group = result['group']
+            print(f"-- {group}")
+
+        change = ''
+        before = previous.get(result_key(result))
+        if before and before['p50_ms'] > 0:
+            ratio = result['p50_ms'] / before['p50_ms'] - 1
+            change = f"{ratio:+8.0%}"
+            if ratio > threshold:
+                change += '!'
+                regressions.append(result_key(result))
+
+        print(
+            f"{result['name']:<44} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} "
+            f"{result['p99_ms']:9.3f} {result['ops_per_sec']:10.1f} {change:>9}"
+        )
+
+    if baseline is not None:
+        env = baseline.get('environment', {})
+        print(f"\nBaseline: {env.get('recorded_at', '?')} on Python {env.get('python', '?')}, "
+              f"dataset {env.get('dataset_version', '?')}; '!' marks p50 more than {threshold:.0%} slower")
+
+        from src.data import get_dataset
+        if env.get('dataset_version') != get_dataset().version:
+            print(f"Warning: measured on dataset {get_dataset().version}, not the baseline's; "
+                  "pass --baseline to compare against a matching one")
+    return regressions
@@ -0,0 +1,80 @@
+"""
+Benchmark suite for Mo Bus MCP Server
+
+Micro-benchmarks of the data and service functions, and end-to-end calls
+of every MCP tool through an in-process client. Geocoding providers are
+stubbed, so no request leaves the machine and results are repeatable.
+
+Run from the project root:
+    python benchmarks/run.py                      # everything, compared to the baseline
+    python benchmarks/run.py --suite services --filter plan
+    python benchmarks/run.py --save-baseline      # record the current numbers
+
+Against a larger synthetic network (see src/data/synthetic.py):
+    MOBUS_DATABASE=synthetic_100x.json python benchmarks/run.py --baseline benchmarks/baselines/synthetic_100x.json
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+# Before the server is imported: no persistent cache, no provider keys, no watcher
+os.environ['MOBUS_GEOCODE_CACHE'] = 'off'
+os.environ['MOBUS_RELOAD_INTERVAL'] = '0'
+os.environ.pop('SERPAPI_KEY', None)
+os.environ.pop('SERP_API_KEY', None)
+
+import harness  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mo Bus benchmark suite")
+    parser.add_argument('--suite', choices=('all', 'services', 'tools'), default='all')
+    parser.add_argument('--filter', default='', help='only benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=200, help='timed runs per benchmark')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed runs first')
+    parser.add_argument('--baseline', default=str(harness.DEFAULT_BASELINE), help='baseline file')
+    parser.add_argument('--save-baseline', action='store_true', help='write results to the baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='p50 slowdown vs baseline counted as a regression (0.2 = 20%%)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit 1 if anything regressed')
+    parser.add_argument('--verbose', action='store_true', help='keep server logging on')
+    args = parser.parse_args()
+
+    import bench_services
+    import bench_tools
+
+    if not args.verbose:
+        # Keep the server's debug logs out of the timings and the report
+        logging.disable(logging.INFO)
+
+    harness.stub_geocoding_network()
+    points = harness.endpoints()
+
+    results = []
+    if args.suite in ('all', 'services'):
+        for name, func in bench_services.benchmarks(points):
+            if args.filter in name:
+                samples = harness.measure(func, args.repeat, args.warmup)
+                results.append(harness.summarize(name, bench_services.GROUP, samples))
+
+    if args.suite in ('all', 'tools'):
+        results.extend(asyncio.run(bench_tools.run(
+            points, harness.measure_async, harness.summarize, args.repeat, args.warmup, args.filter
+        )))
+
+    baseline = None if args.save_baseline else harness.load_baseline(args.baseline)
+    regressions = harness.report(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        harness.save_baseline(args.baseline, results)
+        print(f"\nSaved {len(results)} results to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,64 +3,229 @@ Data module for Mo Bus MCP Server
 Loads all bus data from JSON database
 """
 import json
+import logging
 import os
+import threading
+import time
 from pathlib import Path
+from typing import Callable, List, Optional
+
+from .dataset import Dataset, LANDMARK_COORDINATES
+from .index import normalize_stop_name
+from .snapshot import read_snapshot, source_digest
+from ..utils import startup
+from ..utils.metrics import METRICS, cache_stats
+
+logger = logging.getLogger("Mo.Bus.Data")
 
 # Get project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
-# Load JSON database
-JSON_DB_PATH = PROJECT_ROOT / "mo_bus_complete_database.json"
+# Load JSON database (MOBUS_DATABASE points elsewhere, e.g. at a synthetic one)
+JSON_DB_PATH = Path(os.getenv('MOBUS_DATABASE', str(PROJECT_ROOT / "mo_bus_complete_database.json")))
 
-def load_database():
-    """Load the complete Mo Bus database from JSON"""
+# Precompiled database and indexes, see src/data/snapshot.py
+DEFAULT_SNAPSHOT_PATH = JSON_DB_PATH.with_suffix('.snapshot')
+
+def _read_database_bytes() -> bytes:
     try:
-        with open(JSON_DB_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return JSON_DB_PATH.read_bytes()
     except FileNotFoundError:
         raise FileNotFoundError(
             f"Database file not found at {JSON_DB_PATH}. "
             "Please ensure mo_bus_complete_database.json exists in the project root."
         )
+
+def _parse_database(raw: bytes) -> dict:
+    try:
+        return json.loads(raw)
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in database file: {e}")
 
-# Load database on module import
-_database = load_database()
+def load_database():
+    """Load the complete Mo Bus database from JSON"""
+    return _parse_database(_read_database_bytes())
+
+def snapshot_path_from_env():
+    """Snapshot location from MOBUS_SNAPSHOT, or None when set to 'off'"""
+    path = os.getenv('MOBUS_SNAPSHOT', str(DEFAULT_SNAPSHOT_PATH))
+    if path.strip().lower() in ('', 'off', 'none', '0', 'false'):
+        return None
+    return path
+
+def load_dataset(raw: Optional[bytes] = None) -> Dataset:
+    """
+    Load the database with all its indexes
+    
+    Uses the binary snapshot when it was built from the current JSON (and
+    current code); otherwise parses the JSON and rebuilds every index.
+    
+    Args:
+        raw: Database file contents, when the caller has already read them
+    """
+    started = time.perf_counter()
+    if raw is None:
+        raw = _read_database_bytes()
+    source_hash = source_digest(raw)
+    
+    dataset = None
+    source = 'snapshot'
+    snapshot_path = snapshot_path_from_env()
+    if snapshot_path:
+        dataset = read_snapshot(snapshot_path, source_hash)
+    if dataset is None:
+        source = 'JSON'
+        dataset = Dataset(_parse_database(raw), source_hash.hex())
+    
+    logger.info(
+        f"Loaded {len(dataset.routes)} routes and {len(dataset.stops)} stops from {source} "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms (version {dataset.version})"
+    )
+    return dataset
+
+# Stops per page of the paged stop listing
+STOPS_PAGE_SIZE = 100
+
+_dataset = None
+_dataset_lock = threading.Lock()
 
-# Export data structures
-STOPS = _database.get('stops', {})
-ROUTES = _database.get('routes', {})
-FARE_STRUCTURE = _database.get('fare_structure', {})
-METADATA = _database.get('metadata', {})
+def get_dataset() -> Dataset:
+    """The database and its indexes, loaded on first use"""
+    global _dataset
+    if _dataset is None:
+        with _dataset_lock:
+            if _dataset is None:
+                with startup.phase('load dataset'):
+                    _dataset = load_dataset()
+    return _dataset
+
+# Called with the new dataset after every reload
+_reload_listeners: List[Callable[[Dataset], None]] = []
+_reload_lock = threading.Lock()
+
+def on_dataset_reload(listener: Callable[[Dataset], None]):
+    """Register a callback that refreshes state derived from the dataset"""
+    _reload_listeners.append(listener)
+
+def reload_dataset(force: bool = False) -> dict:
+    """
+    Rebuild the dataset from the database file and swap it in
+    
+    The new dataset and all its indexes are built while queries keep using
+    the current one; the swap itself is a single reference assignment.
+    Queries fetch the dataset once and use it throughout, so each sees one
+    consistent version. Caches keyed on the version drop their entries on
+    their next use, and registered listeners refresh the rest.
+    
+    Args:
+        force: Rebuild even when the file content is unchanged
+    
+    Returns:
+        Dict with 'reloaded', 'previous_version' and 'version'
+    
+    Raises:
+        FileNotFoundError, ValueError: The file is missing or not valid JSON;
+            the current dataset stays in place
+    """
+    global _dataset
+    with _reload_lock:
+        current = _dataset
+        previous_version = current.version if current is not None else None
+        raw = _read_database_bytes()
+        if current is not None and not force and source_digest(raw).hex() == current.source_hash:
+            return {'reloaded': False, 'previous_version': previous_version, 'version': previous_version}
+        
+        dataset = load_dataset(raw)
+        with _dataset_lock:
+            _dataset = dataset
+        logger.info(f"Swapped dataset version {previous_version} for {dataset.version}")
+        
+        for listener in list(_reload_listeners):
+            try:
+                listener(dataset)
+            except Exception:
+                logger.exception(f"Dataset reload listener {listener!r} failed")
+        
+        return {'reloaded': True, 'previous_version': previous_version, 'version': dataset.version}
+
+def _cache_metrics() -> dict:
+    """Hit ratios of the per-dataset lookup caches; empty until the dataset is loaded"""
+    dataset = _dataset
+    if dataset is None:
+        return {}
+    return {
+        'stop_search': cache_stats(dataset.stop_name_index.search),
+        'stop_resolve': cache_stats(dataset.stop_name_index.resolve),
+        'stop_positions': cache_stats(dataset.stop_index.positions),
+        'stop_ranked_positions': cache_stats(dataset.stop_index.ranked_positions)
+    }
+
+METRICS.add_collector('caches', _cache_metrics)
+
+# Module attributes served from the dataset, so importing this module stays cheap
+_DATASET_ATTRIBUTES = {
+    'DATASET_VERSION': 'version',
+    'STOPS': 'stops',
+    'ROUTES': 'routes',
+    'FARE_STRUCTURE': 'fare_structure',
+    'METADATA': 'metadata',
+    'STOP_NAME_INDEX': 'stop_name_index',
+    'STOP_INDEX': 'stop_index',
+    'NETWORK': 'network',
+    'TRANSFERS': 'transfers',
+    'TIMETABLE': 'timetable',
+    'STOP_SPATIAL_INDEX': 'spatial_index',
+    'STOP_COORDINATES': 'coordinates',
+    'ROUTE_DISTANCES': 'route_distances'
+}
+
+def __getattr__(name: str):
+    """Resolve DATASET, STOPS, ROUTES, the indexes, etc., loading the dataset if needed"""
+    if name == 'DATASET':
+        return get_dataset()
+    attribute = _DATASET_ATTRIBUTES.get(name)
+    if attribute is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_dataset(), attribute)
 
 # Helper functions
 def get_stop_info(stop_id: str) -> dict:
     """Get information about a specific stop"""
-    return STOPS.get(stop_id, {})
+    return get_dataset().stops.get(stop_id, {})
 
 def get_route_info(route_number: str) -> dict:
     """Get information about a specific route"""
-    return ROUTES.get(route_number, {})
+    return get_dataset().routes.get(route_number, {})
 
 def search_stops(query: str) -> list:
-    """Search for stops by name or city"""
-    query_lower = query.lower()
+    """Search for stops by name or city, best name matches first"""
+    dataset = get_dataset()
     results = []
-    for stop_id, stop_data in STOPS.items():
-        if (query_lower in stop_data.get('name', '').lower() or 
-            query_lower in stop_data.get('city', '').lower()):
+    seen = set()
+    for name in dataset.stop_name_index.resolve(query):
+        for stop_id in dataset.stop_ids_by_name[name]:
+            seen.add(stop_id)
             results.append({
                 'id': stop_id,
-                **stop_data
+                **dataset.stops[stop_id]
             })
+    
+    query_lower = query.lower()
+    for city, stop_ids in dataset.stop_ids_by_city.items():
+        if query_lower in city:
+            for stop_id in stop_ids:
+                if stop_id not in seen:
+                    results.append({
+                        'id': stop_id,
+                        **dataset.stops[stop_id]
+                    })
     return results
 
 def search_routes(query: str) -> list:
     """Search for routes by number or name"""
     query_lower = query.lower()
     results = []
-    for route_num, route_data in ROUTES.items():
+    for route_num, route_data in get_dataset().routes.items():
         if (query_lower in route_num.lower() or 
             query_lower in route_data.get('route_name', '').lower()):
             results.append({
@@ -71,67 +236,92 @@ def search_routes(query: str) -> list:
 
 def get_routes_for_stop(stop_name: str) -> list:
     """Get all routes that pass through a stop"""
-    stop_name_lower = stop_name.lower()
+    dataset = get_dataset()
     routes = []
-    for route_num, route_data in ROUTES.items():
-        stops = route_data.get('stops', [])
-        if any(stop_name_lower in stop.lower() for stop in stops):
-            routes.append({
-                'route_number': route_num,
-                'route_name': route_data.get('route_name', ''),
-                'stops': stops
-            })
+    for route_num in dataset.stop_index.routes_for(stop_name):
+        route_data = dataset.routes[route_num]
+        routes.append({
+            'route_number': route_num,
+            'route_name': route_data.get('route_name', ''),
+            'stops': route_data.get('stops', [])
+        })
     return routes
 
+def get_stops_in_city(city: str) -> list:
+    """All stops in a city (case-insensitive)"""
+    dataset = get_dataset()
+    return [
+        {'id': stop_id, **dataset.stops[stop_id]}
+        for stop_id in dataset.stop_ids_by_city.get(city.strip().lower(), [])
+    ]
+
+def get_stops_of_type(stop_type: str) -> list:
+    """All stops of a type such as 'educational' or 'hospital' (case-insensitive)"""
+    dataset = get_dataset()
+    return [
+        {'id': stop_id, **dataset.stops[stop_id]}
+        for stop_id in dataset.stop_ids_by_type.get(stop_type.strip().lower(), [])
+    ]
+
+def get_stops_page(page: int, page_size: int = STOPS_PAGE_SIZE) -> dict:
+    """
+    One page of the stop list, in database order
+    
+    Args:
+        page: Page number, starting at 1
+        page_size: Stops per page
+    """
+    dataset = get_dataset()
+    total = len(dataset.stop_ids)
+    start = (page - 1) * page_size
+    stop_ids = dataset.stop_ids[start:start + page_size] if page >= 1 else []
+    return {
+        'page': page,
+        'page_size': page_size,
+        'total_pages': (total + page_size - 1) // page_size,
+        'total_stops': total,
+        'stops': [{'id': stop_id, **dataset.stops[stop_id]} for stop_id in stop_ids]
+    }
+
 def calculate_fare(distance_km: float) -> int:
     """Calculate fare based on distance"""
-    distance_slabs = FARE_STRUCTURE.get('distance_slabs', [])
+    distance_slabs = get_dataset().fare_structure.get('distance_slabs', [])
     for slab in distance_slabs:
         if slab['min_km'] <= distance_km < slab['max_km']:
             return slab['fare']
     # Return max fare if distance exceeds all slabs
     return distance_slabs[-1]['fare'] if distance_slabs else 0
 
-def _enrich_stops_with_coordinates():
-    """Add approximate coordinates to stops"""
-    coordinate_map = {
-        'acharya_vihar_square': {'lat': 20.2943, 'lon': 85.8133},
-        'kiit_square': {'lat': 20.3557, 'lon': 85.8183},
-        'kiit_campus': {'lat': 20.3557, 'lon': 85.8183},
-        'patia_square': {'lat': 20.3540, 'lon': 85.8205},
-        'master_canteen': {'lat': 20.2697, 'lon': 85.8387},
-        'ag_square': {'lat': 20.2961, 'lon': 85.8245},
-        'baramunda_bsabt': {'lat': 20.2815, 'lon': 85.8038},
-        'bhubaneswar_railway_station': {'lat': 20.2697, 'lon': 85.8387},
-        'nandankanan': {'lat': 20.4008, 'lon': 85.8156},
-        'airport': {'lat': 20.2441, 'lon': 85.8178},
-        'biju_patnaik_airport': {'lat': 20.2441, 'lon': 85.8178},
-        'sum_hospital': {'lat': 20.2847, 'lon': 85.7753},
-        'vani_vihar_square': {'lat': 20.2972, 'lon': 85.8205},
-        'jaydev_vihar_square': {'lat': 20.2944, 'lon': 85.8180},
-        'aiims': {'lat': 20.3019, 'lon': 85.8181},
-        'khandagiri': {'lat': 20.2545, 'lon': 85.7783},
-        'puri': {'lat': 19.8135, 'lon': 85.8312},
-        'cuttack': {'lat': 20.4625, 'lon': 85.8828}
-    }
-    
-    for stop_id, coords in coordinate_map.items():
-        if stop_id in STOPS:
-            if 'coordinates' not in STOPS[stop_id]:
-                STOPS[stop_id]['coordinates'] = coords
-
-_enrich_stops_with_coordinates()
-
 # Export all
 __all__ = [
+    'DATASET',
+    'DATASET_VERSION',
     'STOPS',
     'ROUTES',
     'FARE_STRUCTURE',
     'METADATA',
+    'LANDMARK_COORDINATES',
+    'STOP_NAME_INDEX',
+    'STOP_INDEX',
+    'NETWORK',
+    'TRANSFERS',
+    'TIMETABLE',
+    'STOP_SPATIAL_INDEX',
+    'STOP_COORDINATES',
+    'ROUTE_DISTANCES',
+    'normalize_stop_name',
+    'load_dataset',
+    'get_dataset',
+    'reload_dataset',
+    'on_dataset_reload',
     'get_stop_info',
     'get_route_info',
     'search_stops',
     'search_routes',
     'get_routes_for_stop',
+    'get_stops_in_city',
+    'get_stops_of_type',
+    'get_stops_page',
+    'STOPS_PAGE_SIZE',
     'calculate_fare'
 ]
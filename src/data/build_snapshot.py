@@ -0,0 +1,27 @@
+"""
+Build the binary database snapshot
+
+Usage:
+    python -m src.data.build_snapshot [output_path]
+
+Rerun after editing mo_bus_complete_database.json or the indexing code;
+until then the server notices the snapshot is stale and loads the JSON.
+"""
+import os
+import sys
+
+from . import JSON_DB_PATH, snapshot_path_from_env
+from .snapshot import build_snapshot
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else snapshot_path_from_env()
+    if not output:
+        sys.exit("Snapshots are disabled (MOBUS_SNAPSHOT=off); pass an output path")
+
+    dataset = build_snapshot(JSON_DB_PATH, output)
+    print(f"Wrote {output} ({os.path.getsize(output)} bytes, database version {dataset.version})")
+
+
+if __name__ == '__main__':
+    main()
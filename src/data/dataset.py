@@ -0,0 +1,96 @@
+"""
+Dataset for Mo Bus MCP Server
+The parsed database together with every index derived from it
+"""
+from typing import Dict, List
+
+from .fuzzy import FuzzyNameIndex
+from .index import StopIndex
+from .network import TransitNetwork
+from .route_distances import RouteDistances
+from .timetable import Timetable
+from .transfers import TransferTable
+from ..utils.spatial import SpatialIndex
+
+# Approximate coordinates of well-known stops and landmarks, by stop id
+LANDMARK_COORDINATES = {
+    'acharya_vihar_square': {'lat': 20.2943, 'lon': 85.8133},
+    'kiit_square': {'lat': 20.3557, 'lon': 85.8183},
+    'kiit_campus': {'lat': 20.3557, 'lon': 85.8183},
+    'patia_square': {'lat': 20.3540, 'lon': 85.8205},
+    'master_canteen': {'lat': 20.2697, 'lon': 85.8387},
+    'ag_square': {'lat': 20.2961, 'lon': 85.8245},
+    'baramunda_bsabt': {'lat': 20.2815, 'lon': 85.8038},
+    'bhubaneswar_railway_station': {'lat': 20.2697, 'lon': 85.8387},
+    'nandankanan': {'lat': 20.4008, 'lon': 85.8156},
+    'airport': {'lat': 20.2441, 'lon': 85.8178},
+    'biju_patnaik_airport': {'lat': 20.2441, 'lon': 85.8178},
+    'sum_hospital': {'lat': 20.2847, 'lon': 85.7753},
+    'vani_vihar_square': {'lat': 20.2972, 'lon': 85.8205},
+    'jaydev_vihar_square': {'lat': 20.2944, 'lon': 85.8180},
+    'aiims': {'lat': 20.3019, 'lon': 85.8181},
+    'khandagiri': {'lat': 20.2545, 'lon': 85.7783},
+    'puri': {'lat': 19.8135, 'lon': 85.8312},
+    'cuttack': {'lat': 20.4625, 'lon': 85.8828}
+}
+
+
+def enrich_stops_with_coordinates(stops: Dict):
+    """Add approximate coordinates to stops"""
+    for stop_id, coords in LANDMARK_COORDINATES.items():
+        if stop_id in stops:
+            if 'coordinates' not in stops[stop_id]:
+                stops[stop_id]['coordinates'] = coords
+
+
+class Dataset:
+    """
+    The database plus every structure derived from it
+
+    Built in one go from the parsed JSON, or restored whole from a
+    snapshot, so the indexes always describe the same data.
+    """
+
+    def __init__(self, database: Dict, source_hash: str = ''):
+        self.source_hash = source_hash
+        self.stops: Dict = database.get('stops', {})
+        self.routes: Dict = database.get('routes', {})
+        self.fare_structure: Dict = database.get('fare_structure', {})
+        self.metadata: Dict = database.get('metadata', {})
+
+        enrich_stops_with_coordinates(self.stops)
+
+        # Ranked fuzzy lookup over stop display names, for stop search
+        self.stop_name_index = FuzzyNameIndex(stop.get('name', '') for stop in self.stops.values())
+        # Stop groupings, so filtered and paged reads touch only their results
+        self.stop_ids: List[str] = list(self.stops)
+        self.stop_ids_by_name: Dict[str, List[str]] = {}
+        self.stop_ids_by_city: Dict[str, List[str]] = {}
+        self.stop_ids_by_type: Dict[str, List[str]] = {}
+        for stop_id, stop in self.stops.items():
+            self.stop_ids_by_name.setdefault(stop.get('name', ''), []).append(stop_id)
+            self.stop_ids_by_city.setdefault(stop.get('city', '').lower(), []).append(stop_id)
+            self.stop_ids_by_type.setdefault(stop.get('type', '').lower(), []).append(stop_id)
+
+        # Inverted stop -> (route, position) index
+        self.stop_index = StopIndex(self.routes)
+
+        # Integer route/stop arrays for the journey planner
+        self.network = TransitNetwork(self.routes)
+
+        # Shared stops of every route pair, for one-transfer journeys
+        self.transfers = TransferTable(self.network)
+
+        # Headway-expanded trips, flattened into departure-sorted connections
+        self.timetable = Timetable(self.routes, self.network)
+
+        # Grid buckets over stops with coordinates, for nearest-stop queries
+        self.spatial_index = SpatialIndex.from_stops(self.stops)
+
+        # Kilometers along each route, for fares between stop positions
+        self.route_distances = RouteDistances(self.routes, self.stops, self.stop_ids_by_name)
+
+    @property
+    def version(self) -> str:
+        """Short content hash of the source database"""
+        return self.source_hash[:12]
@@ -0,0 +1,192 @@
+"""
+Fuzzy name index for Mo Bus MCP Server
+Trigram index over stop names giving ranked, typo- and spacing-tolerant matches
+"""
+import heapq
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Score bands: every exact or containment hit outranks every fuzzy hit
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+CONTAINS_SCORE = 0.6
+FUZZY_SCORE = 0.5
+
+# Only the names sharing the most trigrams are compared character by character
+FUZZY_CANDIDATES = 20
+# Fuzzy hits need this edit similarity (0-1)
+MIN_SIMILARITY = 0.6
+# Endpoint resolution keeps fuzzy hits this close to the best one
+RESOLVE_MARGIN = 0.1
+MAX_FUZZY_RESOLUTIONS = 5
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+# Abbreviations seen in the route data, folded before matching
+_ABBREVIATIONS = {
+    'sq': 'square',
+    'sqr': 'square',
+    'stn': 'station',
+    'rly': 'railway'
+}
+
+
+def compact_name(name: str) -> str:
+    """
+    Spacing-, case- and punctuation-insensitive form of a name
+
+    "Vani Vihar Sq.", "vani vihar square" and "Vanivihar Square" all
+    compact to "vaniviharsquare".
+    """
+    words = _NON_ALNUM.sub(' ', (name or '').lower()).split()
+    return ''.join(_ABBREVIATIONS.get(word, word) for word in words)
+
+
+def trigrams(compact: str) -> List[str]:
+    """Distinct trigrams of a compact name, padded so short names still have some"""
+    padded = f"  {compact} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def edit_similarity(query: str, name: str) -> float:
+    """
+    Similarity of two compact names (0-1), also trying the name's start
+
+    Comparing against the prefix lets a misspelt first word ("baramnda")
+    still match a longer name ("baramundabsabt").
+    """
+    full = SequenceMatcher(None, query, name, autojunk=False).ratio()
+    if len(name) <= len(query) + 1:
+        return full
+    prefix = SequenceMatcher(None, query, name[:len(query) + 1], autojunk=False).ratio()
+    return max(full, prefix)
+
+
+class FuzzyNameIndex:
+    """
+    Ranked name lookup: exact, prefix, containment, then fuzzy
+
+    Candidates come from trigram posting lists rather than a scan over all
+    names, and only when nothing contains the query are the names sharing
+    the most trigrams compared by edit similarity. A lookup therefore
+    touches a bounded number of names however large the index grows.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(name for name in names if name))
+        self.compact: List[str] = [compact_name(name) for name in self.names]
+        self.postings: Dict[str, List[int]] = {}
+        self.by_compact: Dict[str, List[int]] = {}
+
+        for i, compact in enumerate(self.compact):
+            for gram in trigrams(compact):
+                self.postings.setdefault(gram, []).append(i)
+            self.by_compact.setdefault(compact, []).append(i)
+
+        self._init_caches()
+
+    def _init_caches(self):
+        # Per-instance caches, so a rebuilt index never serves stale results
+        self.search = lru_cache(maxsize=8192)(self._search)
+        self.resolve = lru_cache(maxsize=4096)(self._resolve)
+
+    def __getstate__(self):
+        # Caches are rebuilt empty when unpickled from a snapshot
+        state = self.__dict__.copy()
+        del state['search'], state['resolve']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_caches()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _scores(self, query: str) -> Dict[int, float]:
+        """Score the names matching the query"""
+        compact = compact_name(query)
+        if not compact:
+            return {}
+
+        scores: Dict[int, float] = {}
+        for i in self.by_compact.get(compact, ()):
+            scores[i] = EXACT_SCORE
+
+        query_grams = trigrams(compact)
+
+        # Containment needs every inner trigram. Queries too short to have one
+        # only match names they start, listed under the padded trigram that
+        # marks a name's start, rather than every name
+        inner = [gram for gram in query_grams if ' ' not in gram]
+        if inner:
+            rarest = min(inner, key=lambda gram: len(self.postings.get(gram, ())))
+            containing = self.postings.get(rarest, ())
+        else:
+            containing = self.postings.get(f"  {compact}"[-3:], ())
+
+        for i in containing:
+            if i in scores:
+                continue
+            name = self.compact[i]
+            position = name.find(compact)
+            if position >= 0:
+                # Closer in length ranks higher within the band
+                coverage = len(compact) / len(name)
+                band = PREFIX_SCORE if position == 0 else CONTAINS_SCORE
+                scores[i] = band + 0.1 * coverage
+
+        # One or two characters are too little to suggest anything by similarity
+        if scores or not inner:
+            return scores
+
+        # Nothing contains the query: rank names by shared trigrams, then edit similarity
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for i in self.postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+
+        for i in heapq.nlargest(FUZZY_CANDIDATES, shared, key=shared.__getitem__):
+            similarity = edit_similarity(compact, self.compact[i])
+            if similarity >= MIN_SIMILARITY:
+                scores[i] = FUZZY_SCORE * similarity
+
+        return scores
+
+    def _search(self, query: str, limit: Optional[int] = 10) -> Tuple[Tuple[str, float], ...]:
+        """
+        Ranked candidates for a query, best first
+
+        Args:
+            query: Full or partial stop name
+            limit: Maximum number of candidates (None for all)
+
+        Returns:
+            Tuple of (name, score) pairs. Scores of 1.0 are exact matches,
+            0.6 and above contain the query, lower ones are fuzzy matches
+            (only returned when nothing contains the query). Queries of
+            fewer than three letters and digits only match names they start.
+        """
+        scores = self._scores(query)
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return tuple((self.names[i], round(scores[i], 4)) for i in ranked)
+
+    def _resolve(self, query: str) -> Tuple[str, ...]:
+        """
+        Names a query most plausibly refers to, best first
+
+        Every exact or containing match when there are any; otherwise the
+        few fuzzy matches close to the best one.
+        """
+        ranked = self.search(query, None)
+        if not ranked:
+            return ()
+        if ranked[0][1] >= CONTAINS_SCORE:
+            return tuple(name for name, score in ranked if score >= CONTAINS_SCORE)
+
+        cutoff = ranked[0][1] - RESOLVE_MARGIN * FUZZY_SCORE
+        return tuple(name for name, score in ranked[:MAX_FUZZY_RESOLUTIONS] if score >= cutoff)
@@ -0,0 +1,122 @@
+"""
+Stop index for Mo Bus MCP Server
+Inverted index from normalized stop names to route positions, built once at load time
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from .fuzzy import FuzzyNameIndex
+
+
+def normalize_stop_name(name: str) -> str:
+    """Normalize a stop name or query for index lookups"""
+    return name.lower()
+
+
+class StopIndex:
+    """Maps every distinct normalized stop name to its (route_number, position) postings"""
+
+    def __init__(self, routes: Dict):
+        # Route keys keep the database order so results match a linear scan
+        self.route_order: Dict[str, int] = {}
+        self.postings: Dict[str, List[Tuple[str, int]]] = {}
+
+        for ordinal, (route_num, route_data) in enumerate(routes.items()):
+            self.route_order[route_num] = ordinal
+            for position, stop in enumerate(route_data.get('stops', [])):
+                key = normalize_stop_name(stop)
+                self.postings.setdefault(key, []).append((route_num, position))
+
+        self.names = list(self.postings)
+        self.fuzzy = FuzzyNameIndex(self.names)
+        self._init_caches()
+
+    def _init_caches(self):
+        # Per-instance caches, so a rebuilt index never serves stale results
+        self.ranked_positions = lru_cache(maxsize=4096)(self._ranked_positions)
+        self.positions = lru_cache(maxsize=4096)(self._positions)
+
+    def __getstate__(self):
+        # Caches are rebuilt empty when unpickled from a snapshot
+        state = self.__dict__.copy()
+        del state['ranked_positions'], state['positions']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_caches()
+
+    def match(self, query: str) -> Tuple[str, ...]:
+        """Distinct normalized stop names the query resolves to, best match first"""
+        return self.fuzzy.resolve(query)
+
+    def _ranked_positions(self, query: str) -> Dict[str, Tuple[Tuple[int, int], ...]]:
+        """
+        Positions of matching stops on each route, with the match rank
+
+        Returns:
+            Route number -> (rank, position) pairs sorted by position, in
+            database route order. Rank 0 is the best-matching name.
+        """
+        merged: Dict[str, List[Tuple[int, int]]] = {}
+        for rank, name in enumerate(self.match(query)):
+            for route_num, position in self.postings[name]:
+                merged.setdefault(route_num, []).append((rank, position))
+
+        ordered = sorted(merged, key=self.route_order.__getitem__)
+        return {
+            route_num: tuple(sorted(merged[route_num], key=lambda item: item[1]))
+            for route_num in ordered
+        }
+
+    def _positions(self, query: str) -> Dict[str, Tuple[int, ...]]:
+        """
+        Positions of matching stops on each route
+
+        Returns:
+            Route number -> sorted positions, in database route order
+        """
+        return {
+            route_num: tuple(position for _, position in ranked)
+            for route_num, ranked in self.ranked_positions(query).items()
+        }
+
+    def routes_for(self, query: str) -> List[str]:
+        """Route numbers with at least one stop matching the query"""
+        return list(self.positions(query))
+
+    def on_route(self, query: str, route_number: str) -> bool:
+        """Check whether a stop matching the query is on the route"""
+        return route_number in self.positions(query)
+
+    def connections(self, from_query: str, to_query: str) -> List[Tuple[str, int, int]]:
+        """
+        Routes that reach the destination after the origin
+
+        Intersects the two posting lists. When either end matches several
+        stops on a route, the best-matching names win, then the shortest ride.
+
+        Returns:
+            List of (route_number, from_idx, to_idx) in database route order
+        """
+        from_positions = self.ranked_positions(from_query)
+        to_positions = self.ranked_positions(to_query)
+
+        if len(to_positions) < len(from_positions):
+            shared = [r for r in to_positions if r in from_positions]
+            shared.sort(key=self.route_order.__getitem__)
+        else:
+            shared = [r for r in from_positions if r in to_positions]
+
+        connections = []
+        for route_num in shared:
+            best = None
+            for from_rank, from_idx in from_positions[route_num]:
+                for to_rank, to_idx in to_positions[route_num]:
+                    if from_idx < to_idx:
+                        key = (from_rank + to_rank, to_idx - from_idx)
+                        if best is None or key < best[0]:
+                            best = (key, from_idx, to_idx)
+            if best is not None:
+                connections.append((route_num, best[1], best[2]))
+        return connections
@@ -0,0 +1,51 @@
+"""
+Compiled transit network for Mo Bus MCP Server
+Integer stop/route arrays used by the round-based journey planner
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from .index import normalize_stop_name
+
+
+class TransitNetwork:
+    """Routes as integer stop sequences plus a stop -> (route, position) table"""
+
+    def __init__(self, routes: Dict):
+        self.stop_ids: Dict[str, int] = {}
+        self.stop_names: List[str] = []
+        self.route_keys: List[str] = []
+        self.route_stops: List[Tuple[int, ...]] = []
+
+        stop_routes: List[List[Tuple[int, int]]] = []
+
+        for route_idx, (route_num, route_data) in enumerate(routes.items()):
+            sequence = []
+            for position, stop in enumerate(route_data.get('stops', [])):
+                key = normalize_stop_name(stop)
+                stop_id = self.stop_ids.get(key)
+                if stop_id is None:
+                    # First spelling seen is used for display
+                    stop_id = len(self.stop_names)
+                    self.stop_ids[key] = stop_id
+                    self.stop_names.append(stop)
+                    stop_routes.append([])
+                sequence.append(stop_id)
+                stop_routes[stop_id].append((route_idx, position))
+            self.route_keys.append(route_num)
+            self.route_stops.append(tuple(sequence))
+
+        self.stop_routes: List[Tuple[Tuple[int, int], ...]] = [
+            tuple(entries) for entries in stop_routes
+        ]
+
+    @property
+    def num_stops(self) -> int:
+        return len(self.stop_names)
+
+    @property
+    def num_routes(self) -> int:
+        return len(self.route_keys)
+
+    def ids_for(self, names: Iterable[str]) -> List[int]:
+        """Stop ids for normalized stop names (unknown names are skipped)"""
+        return [self.stop_ids[name] for name in names if name in self.stop_ids]
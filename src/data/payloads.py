@@ -0,0 +1,93 @@
+"""
+Resource payloads for Mo Bus MCP Server
+Serializes the bulk data resources once per database version
+"""
+import hashlib
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from . import get_dataset
+from ..utils.serialization import JSON_MODE, dumps
+
+# Resource name -> Dataset attribute it serializes
+PAYLOAD_SOURCES = {
+    'routes': 'routes',
+    'stops': 'stops',
+    'fare_structure': 'fare_structure',
+    'metadata': 'metadata'
+}
+
+
+class Payload(NamedTuple):
+    """A serialized resource and the hash clients compare between reads"""
+    text: str
+    sha256: str
+    size: int
+
+
+_lock = threading.Lock()
+_payloads: Dict[Tuple[str, bool], Payload] = {}
+_payloads_version = None
+
+
+def get_payload(name: str, compact: Optional[bool] = None) -> Payload:
+    """
+    Serialized JSON for one dataset resource, cached until the data changes
+
+    Args:
+        name: Key of PAYLOAD_SOURCES
+        compact: Without indentation or spaces, for clients that don't
+            need it human-readable; None follows MOBUS_JSON_MODE
+
+    Returns:
+        The payload; both variants carry the hash of the compact form, so it
+        identifies the content whichever one a client downloads
+    """
+    global _payloads_version
+
+    if name not in PAYLOAD_SOURCES:
+        raise KeyError(f"Unknown resource payload: {name}")
+
+    if compact is None:
+        compact = JSON_MODE == 'compact'
+
+    dataset = get_dataset()
+    key = (name, compact)
+    with _lock:
+        if _payloads_version != dataset.version:
+            _payloads.clear()
+            _payloads_version = dataset.version
+        payload = _payloads.get(key)
+        if payload is not None:
+            return payload
+
+        data = getattr(dataset, PAYLOAD_SOURCES[name])
+        compact_payload = _payloads.get((name, True))
+        if compact_payload is None:
+            text = dumps(data, compact=True)
+            compact_payload = Payload(text, hashlib.sha256(text.encode('utf-8')).hexdigest(), len(text.encode('utf-8')))
+            _payloads[(name, True)] = compact_payload
+        if compact:
+            return compact_payload
+
+        text = dumps(data, compact=False)
+        payload = Payload(text, compact_payload.sha256, len(text.encode('utf-8')))
+        _payloads[key] = payload
+        return payload
+
+
+def payload_versions() -> Dict:
+    """Dataset version plus hash and sizes of every resource payload"""
+    resources = {}
+    for name in PAYLOAD_SOURCES:
+        compact = get_payload(name, compact=True)
+        default = get_payload(name)
+        resources[name] = {
+            'sha256': compact.sha256,
+            'bytes': default.size,
+            'compact_bytes': compact.size
+        }
+    return {
+        'dataset_version': get_dataset().version,
+        'resources': resources
+    }
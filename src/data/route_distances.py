@@ -0,0 +1,116 @@
+"""
+Route distances for Mo Bus MCP Server
+Cumulative distance to every stop position along each route, built once at
+load time so the distance ridden between two positions is one subtraction
+"""
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.distance import calculate_distance
+
+# Spacing assumed when neither the route nor the database gives one
+DEFAULT_KM_PER_STOP = 1.0
+
+
+class RouteDistances:
+    """
+    Route number -> cumulative kilometers at each stop position
+
+    Each route is shaped from the coordinates of its stops where they are
+    known: straight-line distance between consecutive stops with
+    coordinates, spread evenly over the stops in between. Stops before the
+    first or after the last known stop are spaced by the route's own
+    kilometers per stop (its published distance_km over its stops), or the
+    network's typical spacing when it has none. A route's published
+    distance_km is taken as its true length and the shape is scaled to it.
+    """
+
+    def __init__(self, routes: Dict, stops: Dict, stop_ids_by_name: Dict[str, List[str]]):
+        coordinates: Dict[str, Tuple[float, float]] = {}
+        for name, stop_ids in stop_ids_by_name.items():
+            for stop_id in stop_ids:
+                coords = stops[stop_id].get('coordinates')
+                if coords and coords.get('lat') and coords.get('lon'):
+                    coordinates[name] = (coords['lat'], coords['lon'])
+                    break
+
+        spacings = [
+            route_data['distance_km'] / (len(route_data.get('stops', [])) - 1)
+            for route_data in routes.values()
+            if route_data.get('distance_km') and len(route_data.get('stops', [])) > 1
+        ]
+        self.km_per_stop = median(spacings) if spacings else DEFAULT_KM_PER_STOP
+        self.stop_coordinates = coordinates
+
+        self.cumulative: Dict[str, Tuple[float, ...]] = {}
+        self.coordinates: Dict[str, Tuple[Optional[Tuple[float, float]], ...]] = {}
+        for route_num, route_data in routes.items():
+            self.cumulative[route_num] = self._cumulative(route_data, coordinates)
+            self.coordinates[route_num] = tuple(coordinates.get(stop) for stop in route_data.get('stops', []))
+
+    def _cumulative(self, route_data: Dict, coordinates: Dict[str, Tuple[float, float]]) -> Tuple[float, ...]:
+        stops = route_data.get('stops', [])
+        if len(stops) < 2:
+            return tuple(0.0 for _ in stops)
+
+        length = route_data.get('distance_km')
+        spacing = length / (len(stops) - 1) if length else self.km_per_stop
+        segments = self._shaped_segments(stops, coordinates, spacing)
+        total = sum(segments)
+        if length and total:
+            scale = length / total
+            segments = [segment * scale for segment in segments]
+
+        cumulative = [0.0]
+        for segment in segments:
+            cumulative.append(cumulative[-1] + segment)
+        return tuple(cumulative)
+
+    @staticmethod
+    def _shaped_segments(
+        stops: List[str],
+        coordinates: Dict[str, Tuple[float, float]],
+        spacing: float
+    ) -> List[float]:
+        """Per-segment kilometers from stop coordinates, spacing where they are unknown"""
+        anchors = [(position, coordinates[stop]) for position, stop in enumerate(stops) if stop in coordinates]
+        segments = [spacing] * (len(stops) - 1)
+
+        for (start, start_coords), (end, end_coords) in zip(anchors, anchors[1:]):
+            anchored = calculate_distance(*start_coords, *end_coords) / (end - start)
+            for position in range(start, end):
+                segments[position] = anchored
+        return segments
+
+    def between(self, route_number: str, from_position: int, to_position: int) -> float:
+        """
+        Kilometers ridden between two stop positions on a route
+
+        Never less than the straight-line distance between the two stops
+        when both have coordinates.
+        """
+        cumulative = self.cumulative[route_number]
+        distance = abs(cumulative[to_position] - cumulative[from_position])
+        coordinates = self.coordinates[route_number]
+        start, end = coordinates[from_position], coordinates[to_position]
+        if start is not None and end is not None:
+            distance = max(distance, calculate_distance(*start, *end))
+        return distance
+
+    def straight_line(self, from_stops: Iterable[str], to_stops: Iterable[str]) -> Optional[float]:
+        """
+        Shortest straight-line kilometers from any of one set of stops to any of another
+
+        Returns:
+            Kilometers, or None when no stop of either set has coordinates
+        """
+        starts = [self.stop_coordinates[stop] for stop in from_stops if stop in self.stop_coordinates]
+        ends = [self.stop_coordinates[stop] for stop in to_stops if stop in self.stop_coordinates]
+        if not starts or not ends:
+            return None
+        return min(calculate_distance(*start, *end) for start in starts for end in ends)
+
+    def length(self, route_number: str) -> float:
+        """Kilometers from the first stop of a route to its last"""
+        cumulative = self.cumulative[route_number]
+        return cumulative[-1] if cumulative else 0.0
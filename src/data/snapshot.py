@@ -0,0 +1,152 @@
+"""
+Binary database snapshot for Mo Bus MCP Server
+Compiles the JSON database and all derived indexes into one file that loads
+without re-parsing or re-indexing
+
+Layout: a fixed header (magic, format version, SHA-256 of the source JSON,
+fingerprint of the indexing code, payload length and CRC-32) followed by a
+pickled Dataset. The file is memory-mapped for reading, and is only used
+when both hashes match the current JSON and code.
+
+The snapshot is a local build artifact; only load files you built yourself.
+
+Build with:
+    python -m src.data.build_snapshot [output_path]
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from .dataset import Dataset
+
+logger = logging.getLogger("Mo.Bus.Data")
+
+SNAPSHOT_MAGIC = b'MOBUSDB\x00'
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, source sha256, code fingerprint, payload length, payload crc32
+_HEADER = struct.Struct('<8sH32s32sQI')
+
+# Modules whose classes are pickled into the snapshot
+_DATA_DIR = Path(__file__).parent
+_PICKLED_SOURCES = (
+    _DATA_DIR / 'dataset.py',
+    _DATA_DIR / 'fuzzy.py',
+    _DATA_DIR / 'index.py',
+    _DATA_DIR / 'network.py',
+    _DATA_DIR / 'route_distances.py',
+    _DATA_DIR / 'timetable.py',
+    _DATA_DIR / 'transfers.py',
+    _DATA_DIR.parent / 'utils' / 'distance.py',
+    _DATA_DIR.parent / 'utils' / 'spatial.py'
+)
+
+
+def source_digest(data: bytes) -> bytes:
+    """SHA-256 of the raw JSON database"""
+    return hashlib.sha256(data).digest()
+
+
+def code_fingerprint() -> bytes:
+    """
+    Hash of the indexing code and interpreter version
+
+    A snapshot built by different code may hold objects with another
+    layout, so any edit to these modules makes existing snapshots stale.
+    """
+    digest = hashlib.sha256(f"{sys.version_info[:2]}|{SNAPSHOT_FORMAT_VERSION}".encode())
+    for path in _PICKLED_SOURCES:
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def write_snapshot(dataset: Dataset, path, source_hash: bytes):
+    """Write a dataset atomically (temp file, then rename)"""
+    payload = pickle.dumps(dataset, protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT_VERSION,
+        source_hash,
+        code_fingerprint(),
+        len(payload),
+        zlib.crc32(payload)
+    )
+
+    path = Path(path)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path, source_hash: bytes) -> Optional[Dataset]:
+    """
+    Load a dataset from a snapshot
+
+    Returns:
+        The dataset, or None when the file is missing, stale (built from
+        another JSON or other code) or corrupt
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                logger.debug(f"Snapshot {path} is truncated")
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return _load_mapped(mapped, path, source_hash)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+
+
+def _load_mapped(mapped: mmap.mmap, path, source_hash: bytes) -> Optional[Dataset]:
+    magic, format_version, snap_source, snap_code, length, crc = _HEADER.unpack_from(mapped)
+
+    if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION:
+        logger.debug(f"Snapshot {path} has an unknown format")
+        return None
+    if snap_source != source_hash:
+        logger.debug(f"Snapshot {path} was built from another database")
+        return None
+    if snap_code != code_fingerprint():
+        logger.debug(f"Snapshot {path} was built by other code")
+        return None
+    if _HEADER.size + length != len(mapped):
+        logger.warning(f"Snapshot {path} has the wrong length")
+        return None
+
+    with memoryview(mapped) as view:
+        payload = view[_HEADER.size:]
+        try:
+            if zlib.crc32(payload) != crc:
+                logger.warning(f"Snapshot {path} failed its checksum")
+                return None
+            dataset = pickle.loads(payload)
+        finally:
+            payload.release()
+
+    if not isinstance(dataset, Dataset):
+        logger.warning(f"Snapshot {path} does not hold a dataset")
+        return None
+    return dataset
+
+
+def build_snapshot(json_path, snapshot_path) -> Dataset:
+    """Compile the JSON database and its indexes into a snapshot"""
+    raw = Path(json_path).read_bytes()
+    source_hash = source_digest(raw)
+    dataset = Dataset(json.loads(raw), source_hash.hex())
+    write_snapshot(dataset, snapshot_path, source_hash)
+    return dataset
@@ -0,0 +1,350 @@
+"""
+Synthetic transit network generator
+Writes a database with the same schema as mo_bus_complete_database.json at
+any size, for load-testing the planner, search and resources
+
+Usage:
+    python -m src.data.synthetic --scale 100 --output synthetic_100x.json
+
+Then point the server (or benchmarks/run.py) at it:
+    MOBUS_DATABASE=synthetic_100x.json python -m src.server
+
+Stops are clustered into towns. Each route is a random walk from stop to
+nearby stop that keeps a rough heading, so routes look like corridors,
+cross each other where towns are dense, and reach neighbouring towns.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from ..utils.distance import calculate_distance
+
+# Size of the bundled database, the unit for --scale
+BASE_STOPS = 735
+BASE_ROUTES = 60
+# Average stops per town in the bundled database
+STOPS_PER_TOWN = 40
+
+CENTER = (20.30, 85.82)
+TOWN_RADIUS_KM = 4.0
+# Roads wind: route length is the straight-line sum times this
+DETOUR_FACTOR = 1.3
+KM_PER_DEGREE = 111.32
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+_SYLLABLES = [
+    'bara', 'munda', 'khanda', 'giri', 'patia', 'jaya', 'deva', 'nayapalli', 'saheed',
+    'rasul', 'chandra', 'sekhar', 'kalinga', 'linga', 'sundar', 'pada', 'kesari',
+    'manchi', 'bomi', 'tangi', 'niali', 'kaka', 'tapur', 'sale', 'konar', 'jatani',
+    'pipili', 'dela', 'nima', 'ghat', 'sakhi', 'gopal', 'palasuni', 'nakhara', 'vani',
+    'acharya', 'ranga', 'mahanadi', 'chha', 'bindu', 'sagar', 'odaga', 'balakati'
+]
+_TOWN_ENDINGS = ['', 'pur', 'garh', 'nagar', 'patna', 'pada']
+_STOP_SUFFIXES = [
+    'Square', 'Chhak', 'Colony', 'Market', 'Nagar', 'Bazar', 'Vihar', 'Road', 'Temple',
+    'School', 'College', 'Hospital', 'Bus Stand', 'Park', 'Office', 'Junction'
+]
+# Stop types in roughly their proportions in the bundled database
+_STOP_TYPES = [
+    'educational', 'village', 'area', 'residential', 'major', 'market', 'hospital',
+    'religious', 'government', 'road', 'commercial', 'junction'
+]
+
+DEFAULT_FARE_STRUCTURE = {
+    'base_fare': 5,
+    'currency': 'INR',
+    'per_stop_charge': 2,
+    'distance_slabs': [
+        {'min_km': 0, 'max_km': 5, 'fare': 5},
+        {'min_km': 5, 'max_km': 10, 'fare': 10},
+        {'min_km': 10, 'max_km': 20, 'fare': 15},
+        {'min_km': 20, 'max_km': 30, 'fare': 20},
+        {'min_km': 30, 'max_km': 50, 'fare': 30},
+        {'min_km': 50, 'max_km': 100, 'fare': 40}
+    ],
+    'max_fare': 50
+}
+
+
+def _word(rng: random.Random, parts: int) -> str:
+    return ''.join(rng.choice(_SYLLABLES) for _ in range(parts)).title()
+
+
+def _stop_id(name: str) -> str:
+    """Id in the style of the bundled data, e.g. kiit_square"""
+    return _NON_ALNUM.sub('_', name.lower()).strip('_')
+
+
+def _unique(name: str, used: set) -> str:
+    candidate, n = name, 2
+    while _stop_id(candidate) in used:
+        candidate = f"{name} {n}"
+        n += 1
+    used.add(_stop_id(candidate))
+    return candidate
+
+
+def _offset(lat: float, lon: float, north_km: float, east_km: float) -> Tuple[float, float]:
+    return (
+        lat + north_km / KM_PER_DEGREE,
+        lon + east_km / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+    )
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class _Grid:
+    """Stops bucketed by cell, for the random walk's neighbour lookups"""
+
+    def __init__(self, points: List[Tuple[float, float]], cell_degrees: float, members: Iterable[int] = None):
+        self.points = points
+        self.cell = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i in (range(len(points)) if members is None else members):
+            self.cells.setdefault(self.key(*points[i]), []).append(i)
+
+    def key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell)), int(math.floor(lon / self.cell))
+
+    def around(self, i: int, ring: int) -> List[int]:
+        row, col = self.key(*self.points[i])
+        found = []
+        for r in range(row - ring, row + ring + 1):
+            for c in range(col - ring, col + ring + 1):
+                found.extend(self.cells.get((r, c), ()))
+        return found
+
+
+def generate_database(
+    num_stops: int = BASE_STOPS,
+    num_routes: int = BASE_ROUTES,
+    min_route_stops: int = 5,
+    max_route_stops: int = 40,
+    shared_stop_density: float = 0.3,
+    hub_ratio: float = 0.05,
+    express_ratio: float = 0.2,
+    coordinate_ratio: float = 1.0,
+    min_headway: int = 10,
+    max_headway: int = 60,
+    seed: int = 0
+) -> Dict:
+    """
+    Build a synthetic database
+
+    Args:
+        num_stops: Number of stops
+        num_routes: Number of routes
+        min_route_stops, max_route_stops: Route length range (stops)
+        shared_stop_density: Chance (0-1) that a route steps onto a nearby
+            hub stop rather than an ordinary one; higher values mean more
+            routes share stops and more transfer options
+        hub_ratio: Fraction of stops that are hubs
+        express_ratio: Fraction of routes that run hub to hub across
+            towns, forming the backbone local routes transfer onto
+        coordinate_ratio: Fraction of stops that carry coordinates (the
+            bundled data has very few; 1.0 exercises the spatial paths)
+        min_headway, max_headway: Range of minutes between buses
+        seed: Random seed; the same arguments always give the same output
+
+    Returns:
+        Dict with metadata, fare_structure, stops and routes
+    """
+    rng = random.Random(seed)
+    num_towns = max(1, round(num_stops / STOPS_PER_TOWN))
+
+    # Towns spread over a disc whose area grows with their number
+    region_km = TOWN_RADIUS_KM * 3 * math.sqrt(num_towns)
+    towns = []
+    used_towns: set = set()
+    for _ in range(num_towns):
+        distance = region_km * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 2 * math.pi)
+        center = _offset(*CENTER, distance * math.cos(bearing), distance * math.sin(bearing))
+        name = _unique(_word(rng, 2) + rng.choice(_TOWN_ENDINGS), used_towns)
+        towns.append((name, center))
+
+    stops: Dict[str, Dict] = {}
+    stop_ids: List[str] = []
+    points: List[Tuple[float, float]] = []
+    used_stops: set = set()
+    for i in range(num_stops):
+        town, (lat, lon) = towns[i % num_towns]
+        spread = rng.gauss(0, TOWN_RADIUS_KM / 2)
+        bearing = rng.uniform(0, 2 * math.pi)
+        point = _offset(lat, lon, spread * math.cos(bearing), spread * math.sin(bearing))
+        name = _unique(f"{_word(rng, rng.randint(1, 2))} {rng.choice(_STOP_SUFFIXES)}", used_stops)
+        stop_id = _stop_id(name)
+
+        stop = {'name': name, 'city': town, 'type': rng.choice(_STOP_TYPES)}
+        if rng.random() < coordinate_ratio:
+            stop['coordinates'] = {'lat': round(point[0], 6), 'lon': round(point[1], 6)}
+        stops[stop_id] = stop
+        stop_ids.append(stop_id)
+        points.append(point)
+
+    hubs = set(rng.sample(range(num_stops), max(1, int(num_stops * hub_ratio)))) if num_stops else set()
+
+    # About four stops (or hubs) per cell on average
+    area_degrees = (2 * region_km / KM_PER_DEGREE) ** 2
+    grid = _Grid(points, max(math.sqrt(area_degrees / max(num_stops, 1)) * 2, 1e-4))
+    hub_grid = _Grid(points, max(math.sqrt(area_degrees / len(hubs)) * 2, 1e-4), hubs)
+
+    routes: Dict[str, Dict] = {}
+    for r in range(num_routes):
+        length = rng.randint(min_route_stops, max_route_stops)
+        if rng.random() < express_ratio:
+            path = _walk(rng, hub_grid, hubs, length, 1.0, start=rng.choice(sorted(hubs)))
+        else:
+            path = _walk(rng, grid, hubs, length, shared_stop_density)
+        if len(path) < 2:
+            continue
+        names = [stops[stop_ids[i]]['name'] for i in path]
+        distance = sum(
+            calculate_distance(*points[a], *points[b]) for a, b in zip(path, path[1:])
+        ) * DETOUR_FACTOR
+
+        first_bus = rng.randrange(5 * 60, 8 * 60, 5)
+        last_bus = rng.randrange(18 * 60, 22 * 60, 5)
+        route_number = f"S{r + 1}"
+        route = {
+            'route_number': route_number,
+            'route_name': f"{names[0]} ↔ {names[-1]}",
+            'start': names[0],
+            'end': names[-1],
+            'distance_km': round(distance, 1),
+            'stops': names,
+            'frequency_minutes': rng.randrange(min_headway, max_headway + 1, 5) if max_headway > min_headway else min_headway,
+            'first_bus': _clock(first_bus),
+            'last_bus': _clock(last_bus)
+        }
+        if len(names) > 4:
+            route['via'] = ', '.join(names[len(names) // 3:len(names) // 3 + 2])
+        if rng.random() < 0.1:
+            route['service'] = 'AC Only'
+        routes[route_number] = route
+
+    return {
+        'metadata': {
+            'version': 'synthetic',
+            'system_name': 'Mo Bus - synthetic test network',
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'total_routes': len(routes),
+            'total_stops': len(stops),
+            'cities_covered': [name for name, _ in towns[:50]],
+            'generator': {
+                'num_stops': num_stops,
+                'num_routes': num_routes,
+                'min_route_stops': min_route_stops,
+                'max_route_stops': max_route_stops,
+                'shared_stop_density': shared_stop_density,
+                'hub_ratio': hub_ratio,
+                'express_ratio': express_ratio,
+                'coordinate_ratio': coordinate_ratio,
+                'min_headway': min_headway,
+                'max_headway': max_headway,
+                'seed': seed
+            }
+        },
+        'fare_structure': DEFAULT_FARE_STRUCTURE,
+        'stops': stops,
+        'routes': routes
+    }
+
+
+def _walk(
+    rng: random.Random,
+    grid: _Grid,
+    hubs: set,
+    length: int,
+    shared_stop_density: float,
+    start: int = None
+) -> List[int]:
+    """Stop indexes of one route: a walk between nearby stops keeping a rough heading"""
+    current = rng.randrange(len(grid.points)) if start is None else start
+    heading = rng.uniform(0, 2 * math.pi)
+    route = [current]
+    visited = {current}
+
+    while len(route) < length:
+        candidates: List[int] = []
+        for ring in (1, 2, 4):
+            candidates = [i for i in grid.around(current, ring) if i not in visited]
+            if candidates:
+                break
+        if not candidates:
+            break
+        if len(candidates) > 12:
+            candidates = rng.sample(candidates, 12)
+
+        lat, lon = grid.points[current]
+        direction = (math.cos(heading), math.sin(heading))
+
+        def score(i: int) -> float:
+            d_lat, d_lon = grid.points[i][0] - lat, grid.points[i][1] - lon
+            norm = math.hypot(d_lat, d_lon) or 1e-9
+            return (d_lat * direction[0] + d_lon * direction[1]) / norm
+
+        ahead = [i for i in candidates if score(i) > 0.3] or candidates
+        shared = [i for i in ahead if i in hubs]
+        if shared and rng.random() < shared_stop_density:
+            ahead = shared
+        nxt = max(ahead, key=lambda i: score(i) + rng.uniform(0, 0.5))
+
+        heading += rng.gauss(0, 0.25)
+        route.append(nxt)
+        visited.add(nxt)
+        current = nxt
+
+    return route
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Mo Bus database")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help=f"multiple of the bundled size ({BASE_STOPS} stops, {BASE_ROUTES} routes)")
+    parser.add_argument('--stops', type=int, help='number of stops (overrides --scale)')
+    parser.add_argument('--routes', type=int, help='number of routes (overrides --scale)')
+    parser.add_argument('--min-route-stops', type=int, default=5)
+    parser.add_argument('--max-route-stops', type=int, default=40)
+    parser.add_argument('--shared-stop-density', type=float, default=0.3)
+    parser.add_argument('--hub-ratio', type=float, default=0.05)
+    parser.add_argument('--express-ratio', type=float, default=0.2)
+    parser.add_argument('--coordinate-ratio', type=float, default=1.0)
+    parser.add_argument('--min-headway', type=int, default=10, help='minutes')
+    parser.add_argument('--max-headway', type=int, default=60, help='minutes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', default='synthetic_database.json')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    database = generate_database(
+        num_stops=args.stops or max(2, round(BASE_STOPS * args.scale)),
+        num_routes=args.routes or max(1, round(BASE_ROUTES * args.scale)),
+        min_route_stops=args.min_route_stops,
+        max_route_stops=args.max_route_stops,
+        shared_stop_density=args.shared_stop_density,
+        hub_ratio=args.hub_ratio,
+        express_ratio=args.express_ratio,
+        coordinate_ratio=args.coordinate_ratio,
+        min_headway=args.min_headway,
+        max_headway=args.max_headway,
+        seed=args.seed
+    )
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(database, f, ensure_ascii=False)
+
+    print(
+        f"Wrote {args.output}: {len(database['stops'])} stops, {len(database['routes'])} routes "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == '__main__':
+    main()
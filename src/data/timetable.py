@@ -0,0 +1,137 @@
+"""
+Headway-expanded timetable for Mo Bus MCP Server
+Trips generated from first_bus, last_bus and frequency, flattened into
+departure-sorted connection arrays once at load time
+"""
+import re
+from typing import Dict, List
+
+from .network import TransitNetwork
+
+# Most routes publish no timetable; these defaults stand in for them
+DEFAULT_FIRST_BUS = '06:00'
+DEFAULT_LAST_BUS = '22:00'
+DEFAULT_HEADWAY_MINUTES = 20
+MINUTES_PER_STOP = 3
+
+_CLOCK_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*$')
+_TRIPS_PER_DAY_PATTERN = re.compile(r'(\d+)\s*trips?\s*/\s*day', re.IGNORECASE)
+_EVERY_MINUTES_PATTERN = re.compile(r'(\d+)\s*min', re.IGNORECASE)
+
+
+def parse_clock(value: str) -> int:
+    """
+    Parse a 24-hour HH:MM time
+
+    Returns:
+        Minutes since midnight
+
+    Raises:
+        ValueError: If the value is not a valid HH:MM time
+    """
+    match = _CLOCK_PATTERN.match(value or '')
+    if not match:
+        raise ValueError(f"Invalid time '{value}', expected HH:MM (24-hour)")
+    hours, minutes = int(match.group(1)), int(match.group(2))
+    if hours > 23 or minutes > 59:
+        raise ValueError(f"Invalid time '{value}', expected HH:MM (24-hour)")
+    return hours * 60 + minutes
+
+
+def format_clock(minutes: int) -> str:
+    """Format minutes since midnight as HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def route_service(route_data: Dict) -> Dict:
+    """
+    Service window and headway for a route
+
+    Uses frequency_minutes, or derives the headway from a
+    'N trips/day' / 'every N min' frequency string, and falls back to the
+    defaults for anything the route does not publish.
+
+    Returns:
+        Dictionary with first, last, headway (minutes) and published flag
+    """
+    published = 'first_bus' in route_data or 'frequency_minutes' in route_data or 'frequency' in route_data
+
+    try:
+        first = parse_clock(route_data.get('first_bus') or DEFAULT_FIRST_BUS)
+    except ValueError:
+        first = parse_clock(DEFAULT_FIRST_BUS)
+    try:
+        last = parse_clock(route_data.get('last_bus') or DEFAULT_LAST_BUS)
+    except ValueError:
+        last = parse_clock(DEFAULT_LAST_BUS)
+    last = max(first, last)
+
+    headway = route_data.get('frequency_minutes')
+    if not headway:
+        frequency = str(route_data.get('frequency') or '')
+        trips_match = _TRIPS_PER_DAY_PATTERN.search(frequency)
+        every_match = _EVERY_MINUTES_PATTERN.search(frequency)
+        if trips_match and int(trips_match.group(1)) > 1:
+            headway = (last - first) // (int(trips_match.group(1)) - 1)
+        elif every_match:
+            headway = int(every_match.group(1))
+    headway = int(headway) if headway and int(headway) > 0 else DEFAULT_HEADWAY_MINUTES
+
+    return {'first': first, 'last': last, 'headway': headway, 'published': published}
+
+
+class Timetable:
+    """
+    Connection arrays for connection-scan routing
+
+    Connection c is one hop of one trip: it leaves stop conn_from[c] at
+    conn_dep[c] and reaches conn_to[c] at conn_arr[c]. Arrays are sorted by
+    departure so a query can bisect to its start time.
+    """
+
+    def __init__(self, routes: Dict, network: TransitNetwork):
+        self.route_service: List[Dict] = [route_service(routes[key]) for key in network.route_keys]
+        self.trip_route: List[int] = []
+        self.trip_start: List[int] = []
+
+        connections = []
+        for route_idx, sequence in enumerate(network.route_stops):
+            service = self.route_service[route_idx]
+            if len(sequence) < 2:
+                continue
+            for start in range(service['first'], service['last'] + 1, service['headway']):
+                trip = len(self.trip_route)
+                self.trip_route.append(route_idx)
+                self.trip_start.append(start)
+                for position in range(len(sequence) - 1):
+                    departure = start + position * MINUTES_PER_STOP
+                    connections.append((
+                        departure,
+                        departure + MINUTES_PER_STOP,
+                        sequence[position],
+                        sequence[position + 1],
+                        trip,
+                        position
+                    ))
+
+        connections.sort()
+        self.conn_dep: List[int] = [c[0] for c in connections]
+        self.conn_arr: List[int] = [c[1] for c in connections]
+        self.conn_from: List[int] = [c[2] for c in connections]
+        self.conn_to: List[int] = [c[3] for c in connections]
+        self.conn_trip: List[int] = [c[4] for c in connections]
+        self.conn_pos: List[int] = [c[5] for c in connections]
+
+    @property
+    def num_connections(self) -> int:
+        return len(self.conn_dep)
+
+    @property
+    def num_trips(self) -> int:
+        return len(self.trip_route)
+
+    def headway(self, route_idx: int) -> int:
+        return self.route_service[route_idx]['headway']
+
+    def is_published(self, route_idx: int) -> bool:
+        return self.route_service[route_idx]['published']
@@ -0,0 +1,89 @@
+"""
+Route-to-route transfer table for Mo Bus MCP Server
+Shared stops of every pair of routes, with their positions on both, built once at load time
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from .network import TransitNetwork
+
+# A place to change buses: (stop_id, position on the first route, position on the second)
+Transfer = Tuple[int, int, int]
+
+
+class TransferTable:
+    """Maps (from_route, to_route) to the stops where one can change between them"""
+
+    def __init__(self, network: TransitNetwork):
+        self.network = network
+        pairs: Dict[Tuple[int, int], List[Transfer]] = {}
+
+        for stop_id, entries in enumerate(network.stop_routes):
+            for from_route, from_pos in entries:
+                for to_route, to_pos in entries:
+                    if from_route != to_route:
+                        pairs.setdefault((from_route, to_route), []).append((stop_id, from_pos, to_pos))
+
+        self.pairs: Dict[Tuple[int, int], Tuple[Transfer, ...]] = {
+            pair: tuple(transfers) for pair, transfers in pairs.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def between(self, from_route: int, to_route: int) -> Tuple[Transfer, ...]:
+        """Stops shared by two routes (empty when they never meet)"""
+        return self.pairs.get((from_route, to_route), ())
+
+    def one_transfer(self, sources: Iterable[int], targets: Iterable[int]) -> List[Dict]:
+        """
+        Journeys with exactly one transfer between two stop sets
+
+        The first bus is boarded before the transfer stop and the second is
+        left after it. Only the shortest journey for each pair of routes is
+        kept, and routes that already connect the two sets directly are
+        skipped.
+
+        Args:
+            sources: Stop ids where the journey may start
+            targets: Stop ids where the journey may end
+
+        Returns:
+            Journeys in the raptor_search shape (legs, transfers, stops
+            travelled), unsorted
+        """
+        stop_routes = self.network.stop_routes
+        boardings = [(stop, entry) for stop in dict.fromkeys(sources) for entry in stop_routes[stop]]
+        alightings = [(stop, entry) for stop in dict.fromkeys(targets) for entry in stop_routes[stop]]
+
+        # Routes that reach a target after a source need no transfer
+        last_target = {}
+        for _, (route_idx, position) in alightings:
+            if position > last_target.get(route_idx, -1):
+                last_target[route_idx] = position
+        direct = {
+            route_idx for _, (route_idx, position) in boardings
+            if position < last_target.get(route_idx, -1)
+        }
+
+        best: Dict[Tuple[int, int], Tuple[int, Tuple]] = {}
+        for source, (first_route, board_pos) in boardings:
+            if first_route in direct:
+                continue
+            for target, (second_route, alight_pos) in alightings:
+                if second_route in direct:
+                    continue
+                for stop, transfer_pos, second_board_pos in self.between(first_route, second_route):
+                    if transfer_pos <= board_pos or second_board_pos >= alight_pos:
+                        continue
+                    stops_travelled = (transfer_pos - board_pos) + (alight_pos - second_board_pos)
+                    pair = (first_route, second_route)
+                    if pair not in best or stops_travelled < best[pair][0]:
+                        best[pair] = (stops_travelled, (
+                            (first_route, source, stop, board_pos, transfer_pos),
+                            (second_route, stop, target, second_board_pos, alight_pos)
+                        ))
+
+        return [
+            {'transfers': 1, 'stops_travelled': stops_travelled, 'legs': list(legs)}
+            for stops_travelled, legs in best.values()
+        ]
@@ -0,0 +1,74 @@
+"""
+Database file watcher for Mo Bus MCP Server
+Polls the JSON database and hot-reloads the dataset when it changes
+
+MOBUS_RELOAD_INTERVAL: seconds between checks (default 0, watching disabled)
+"""
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from . import JSON_DB_PATH, reload_dataset
+
+logger = logging.getLogger("Mo.Bus.Data")
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DatabaseWatcher(threading.Thread):
+    """
+    Background thread that reloads the dataset after the file changes
+
+    A change is acted on once the file has looked the same for one whole
+    interval, so a copy still being written is never loaded half-finished.
+    A file that fails to load is logged and the current dataset kept.
+    """
+
+    def __init__(self, path: Path = JSON_DB_PATH, interval: float = 5.0):
+        super().__init__(name="mobus-database-watcher", daemon=True)
+        self.path = Path(path)
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        loaded = _file_signature(self.path)
+        pending = None
+        while not self._stopped.wait(self.interval):
+            signature = _file_signature(self.path)
+            if signature is None or signature == loaded:
+                pending = None
+                continue
+            if signature != pending:
+                # Changed since the last check; wait until it settles
+                pending = signature
+                continue
+
+            loaded, pending = signature, None
+            logger.info(f"{self.path.name} changed, reloading")
+            try:
+                reload_dataset()
+            except Exception as e:
+                logger.error(f"Keeping the current dataset; reloading {self.path} failed: {e}")
+
+
+def watcher_from_env() -> Optional[DatabaseWatcher]:
+    """Watcher configured by MOBUS_RELOAD_INTERVAL, or None when disabled"""
+    try:
+        interval = float(os.getenv('MOBUS_RELOAD_INTERVAL', '0'))
+    except ValueError:
+        logger.warning("Ignoring MOBUS_RELOAD_INTERVAL: expected a number of seconds")
+        return None
+    if interval <= 0:
+        return None
+    return DatabaseWatcher(JSON_DB_PATH, interval)
@@ -2,55 +2,252 @@
 Mo Bus MCP Server using FastMCP
 Clean, simple server for bus route planning
 """
-from fastmcp import FastMCP, Context
-import json
-from typing import Optional
+from .utils import startup
+from .utils.serialization import dumps
+from .utils.metrics import METRICS
+from .utils import logging_pipeline
+from .utils.logging_pipeline import TruncatedPayload, is_sampled
+
+with startup.phase('import fastmcp'):
+    from fastmcp import FastMCP, Context
+from typing import List, Optional
 import logging
+import os
+import time
 
 # Configure logging
 from fastmcp.utilities.logging import configure_logging, get_logger
-from fastmcp.server.middleware.logging import LoggingMiddleware
+from fastmcp.server.middleware import Middleware
 
-# Set up comprehensive logging
-configure_logging(level='DEBUG')
+# Level from LOG_LEVEL; records are written by a background thread
+configure_logging(level=logging_pipeline.LOG_LEVEL)
+logging_pipeline.install([logging.getLogger("fastmcp"), logging.getLogger("Mo.Bus")])
 logger = get_logger("Mo.Bus.Server")
+request_logger = get_logger("Mo.Bus.Requests")
 
-# Import data from JSON-based module
-from .data import (
-    STOPS, ROUTES, FARE_STRUCTURE, METADATA,
-    get_stop_info, get_route_info, search_stops,
-    search_routes, get_routes_for_stop, calculate_fare
-)
-from .services.planner import find_routes, plan_journey
-from .services.geocoding import get_coordinates, get_distance
+# Data, indexes and geocoders load on first use, not at import
+with startup.phase('import services'):
+    from .data import (
+        get_dataset, get_stop_info, get_route_info, search_stops,
+        search_routes, calculate_fare, get_stops_in_city, get_stops_of_type,
+        get_stops_page, reload_dataset
+    )
+    # Aliased: the get_routes_for_stop tool below would otherwise shadow it
+    from .data import get_routes_for_stop as routes_through_stop
+    from .data.payloads import get_payload, payload_versions
+    from .data.watcher import watcher_from_env
+    from .services.planner import find_routes, plan_journey, plan_timed_journey, plan_journeys
+    from .services.geocoding import get_coordinates, get_distance
+    from .services.async_geocoding import get_coordinates_many
+    from .services.reachability import find_reachable_stops
+    from .services.fares import stop_fare, discounted_fares
+    from .utils.distance import distance_matrix
 
 # Initialize FastMCP server
 mcp = FastMCP("Mo Bus Route Planner")
 
-# Add logging middleware for all MCP operations
-mcp.add_middleware(LoggingMiddleware(include_payloads=True, max_payload_length=2000))
+# Size limits of the batch tools
+MAX_BATCH_PAIRS = 200
+MAX_FARE_MATRIX_CELLS = 2500
+MAX_REACH_TRANSFERS = 3
+
+class RequestLoggingMiddleware(Middleware):
+    """
+    Logs the start, outcome and duration of every MCP message
+    
+    Also decides whether the message's debug and info records are sampled
+    (MOBUS_LOG_SAMPLE_RATE). Payloads are only serialized and truncated
+    when the record is written, on the logging thread.
+    """
+    
+    def __init__(self, include_payloads: bool, max_payload_length: int):
+        self.include_payloads = include_payloads
+        self.max_payload_length = max_payload_length
+    
+    async def on_message(self, context, call_next):
+        token = logging_pipeline.start_call()
+        try:
+            if self.include_payloads:
+                request_logger.info(
+                    "event=%s_start method=%s source=%s payload=%s",
+                    context.type, context.method, context.source,
+                    TruncatedPayload(context.message, self.max_payload_length)
+                )
+            else:
+                request_logger.info("event=%s_start method=%s source=%s", context.type, context.method, context.source)
+            
+            started = time.perf_counter()
+            try:
+                result = await call_next(context)
+            except Exception as e:
+                request_logger.error(
+                    "event=%s_error method=%s source=%s duration_ms=%.2f error=%s",
+                    context.type, context.method, context.source, (time.perf_counter() - started) * 1000, e
+                )
+                raise
+            request_logger.info(
+                "event=%s_success method=%s source=%s duration_ms=%.2f",
+                context.type, context.method, context.source, (time.perf_counter() - started) * 1000
+            )
+            return result
+        finally:
+            logging_pipeline.end_call(token)
+
+# Request logging wraps everything else, so its sampling decision covers the whole call
+mcp.add_middleware(RequestLoggingMiddleware(
+    include_payloads=logging_pipeline.LOG_PAYLOADS,
+    max_payload_length=logging_pipeline.LOG_PAYLOAD_LENGTH
+))
+
+class StartupProfileMiddleware(Middleware):
+    """Marks early requests and prints the startup profile after the first real call"""
+    
+    async def on_request(self, context, call_next):
+        if startup.is_reported():
+            return await call_next(context)
+        startup.mark(f"{context.method} received")
+        try:
+            return await call_next(context)
+        finally:
+            startup.mark(f"{context.method} answered")
+            if context.method in ('tools/call', 'resources/read', 'prompts/get'):
+                startup.report_once()
+
+if startup.ENABLED:
+    mcp.add_middleware(StartupProfileMiddleware())
+
+def _is_error_result(result) -> bool:
+    """Tools report failures as a JSON object with an "error" key first"""
+    content = getattr(result, 'content', None)
+    text = getattr(content[0], 'text', '') if content else ''
+    return text.lstrip('{ \r\n\t').startswith('"error"')
+
+class MetricsMiddleware(Middleware):
+    """Counts and times every tool call and resource read"""
+    
+    def __init__(self):
+        self._static_uris = None
+        self._templates = None
+    
+    async def on_call_tool(self, context, call_next):
+        tool = context.message.name
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await call_next(context)
+            failed = _is_error_result(result)
+            return result
+        finally:
+            METRICS.observe('mobus_tool_latency_ms', (time.perf_counter() - started) * 1000, tool=tool)
+            METRICS.increment('mobus_tool_calls_total', tool=tool)
+            if failed:
+                METRICS.increment('mobus_tool_errors_total', tool=tool)
+    
+    async def on_read_resource(self, context, call_next):
+        resource = await self._resource_label(str(context.message.uri))
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await call_next(context)
+            failed = False
+            return result
+        finally:
+            METRICS.observe('mobus_resource_latency_ms', (time.perf_counter() - started) * 1000, resource=resource)
+            METRICS.increment('mobus_resource_reads_total', resource=resource)
+            if failed:
+                METRICS.increment('mobus_resource_errors_total', resource=resource)
+    
+    async def _resource_label(self, uri: str) -> str:
+        """The resource's URI, or its template for templated ones, so labels stay bounded"""
+        if self._templates is None:
+            self._static_uris = set(await mcp.get_resources())
+            self._templates = list((await mcp.get_resource_templates()).values())
+        if uri in self._static_uris:
+            return uri
+        for template in self._templates:
+            if template.matches(uri) is not None:
+                return template.uri_template
+        return 'unknown'
+
+mcp.add_middleware(MetricsMiddleware())
 
 # ================== RESOURCES ==================
 
+# Payloads are serialized once per database version and served from memory
+
 @mcp.resource("mobus://routes/all")
 def get_all_routes() -> str:
     """Complete list of all Mo Bus routes with stops and timings"""
-    return json.dumps(ROUTES, indent=2, ensure_ascii=False)
+    return get_payload('routes').text
+
+@mcp.resource("mobus://routes/all/compact")
+def get_all_routes_compact() -> str:
+    """All Mo Bus routes as compact (non-indented) JSON"""
+    return get_payload('routes', compact=True).text
 
 @mcp.resource("mobus://stops/all")
 def get_all_stops() -> str:
     """Complete list of all bus stops across Odisha"""
-    return json.dumps(STOPS, indent=2, ensure_ascii=False)
+    return get_payload('stops').text
+
+@mcp.resource("mobus://stops/all/compact")
+def get_all_stops_compact() -> str:
+    """All bus stops as compact (non-indented) JSON"""
+    return get_payload('stops', compact=True).text
 
 @mcp.resource("mobus://fare/structure")
 def get_fare_structure() -> str:
     """Mo Bus fare calculation structure based on distance"""
-    return json.dumps(FARE_STRUCTURE, indent=2, ensure_ascii=False)
+    return get_payload('fare_structure').text
 
 @mcp.resource("mobus://system/info")
 def get_system_info() -> str:
     """Mo Bus system metadata and statistics"""
-    return json.dumps(METADATA, indent=2, ensure_ascii=False)
+    return get_payload('metadata').text
+
+@mcp.resource("mobus://system/version")
+def get_data_version() -> str:
+    """Database version and content hash of each data resource, to skip re-downloading unchanged data"""
+    return dumps(payload_versions())
+
+@mcp.resource("mobus://system/metrics")
+def get_metrics() -> str:
+    """Per-tool call counts, errors and latency percentiles, geocoder provider outcomes and cache hit ratios"""
+    return dumps(METRICS.snapshot())
+
+# Filtered views, read from precomputed groupings so each costs O(result)
+
+@mcp.resource("mobus://routes/{route_number}")
+def get_route_resource(route_number: str) -> str:
+    """A single Mo Bus route with its stops and timings"""
+    route_info = get_route_info(route_number)
+    if not route_info:
+        return dumps({"error": f"Route {route_number} not found"})
+    return dumps({"route_number": route_number, **route_info})
+
+@mcp.resource("mobus://stops/city/{city}")
+def get_city_stops_resource(city: str) -> str:
+    """All bus stops in one city (e.g. Bhubaneswar, Cuttack, Puri)"""
+    stops = get_stops_in_city(city)
+    if not stops:
+        return dumps({"error": f"No stops found in city {city}"})
+    return dumps({"city": city, "count": len(stops), "stops": stops})
+
+@mcp.resource("mobus://stops/type/{stop_type}")
+def get_typed_stops_resource(stop_type: str) -> str:
+    """All bus stops of one type (e.g. educational, hospital, railway_station)"""
+    stops = get_stops_of_type(stop_type)
+    if not stops:
+        return dumps({"error": f"No stops of type {stop_type}"})
+    return dumps({"type": stop_type, "count": len(stops), "stops": stops})
+
+@mcp.resource("mobus://stops/page/{page}")
+def get_stops_page_resource(page: int) -> str:
+    """One page of the stop list (page numbers start at 1)"""
+    response = get_stops_page(page)
+    if not response["stops"]:
+        return dumps({"error": f"Page {page} is out of range (1-{response['total_pages']})"})
+    return dumps(response)
 
 # ================== TOOLS ==================
 
@@ -65,13 +262,13 @@ def search_bus_routes(query: str, ctx: Context = None) -> str:
     Returns:
         JSON string with matching routes
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Searching bus routes with query: '{query}'")
     logger.debug(f"Route search initiated with query: {query}")
     
     results = search_routes(query)
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Found {len(results)} routes matching '{query}'")
     logger.info(f"Route search completed - found {len(results)} results")
     
@@ -81,15 +278,17 @@ def search_bus_routes(query: str, ctx: Context = None) -> str:
         "routes": results[:10]
     }
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Returning {min(10, len(results))} routes to client")
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
 
 @mcp.tool()
 def search_bus_stops(query: str, ctx: Context = None) -> str:
     """
-    Search for bus stops by name or city
+    Search for bus stops by name or city, best matches first
+    
+    Misspelt or differently spaced names still match (e.g. 'Vanivihar').
     
     Args:
         query: Stop name or city (e.g., 'Airport', 'Bhubaneswar', 'KIIT')
@@ -97,13 +296,13 @@ def search_bus_stops(query: str, ctx: Context = None) -> str:
     Returns:
         JSON string with matching stops
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Searching bus stops with query: '{query}'")
     logger.debug(f"Stop search initiated with query: {query}")
     
     results = search_stops(query)
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Found {len(results)} stops matching '{query}'")
     logger.info(f"Stop search completed - found {len(results)} results")
     
@@ -113,10 +312,10 @@ def search_bus_stops(query: str, ctx: Context = None) -> str:
         "stops": results[:20]
     }
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Returning {min(20, len(results))} stops to client")
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
 
 @mcp.tool()
 def get_route_details(route_number: str, ctx: Context = None) -> str:
@@ -129,7 +328,7 @@ def get_route_details(route_number: str, ctx: Context = None) -> str:
     Returns:
         JSON string with route details including all stops
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Fetching details for route: {route_number}")
     logger.debug(f"Route details requested for: {route_number}")
     
@@ -139,9 +338,9 @@ def get_route_details(route_number: str, ctx: Context = None) -> str:
         if ctx:
             ctx.warning(f"Route {route_number} not found")
         logger.warning(f"Route not found: {route_number}")
-        return json.dumps({"error": f"Route {route_number} not found"}, indent=2)
+        return dumps({"error": f"Route {route_number} not found"})
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Retrieved details for route {route_number} with {len(route_info.get('stops', []))} stops")
     logger.info(f"Route details retrieved - {route_number} has {len(route_info.get('stops', []))} stops")
     
@@ -150,10 +349,10 @@ def get_route_details(route_number: str, ctx: Context = None) -> str:
         **route_info
     }
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Sending route details to client")
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
 
 @mcp.tool()
 def find_routes_between_stops(from_stop: str, to_stop: str, ctx: Context = None) -> str:
@@ -167,13 +366,13 @@ def find_routes_between_stops(from_stop: str, to_stop: str, ctx: Context = None)
     Returns:
         JSON string with all connecting routes
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Finding routes from '{from_stop}' to '{to_stop}'")
     logger.debug(f"Route search initiated: {from_stop} -> {to_stop}")
     
     routes = find_routes(from_stop, to_stop)
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Found {len(routes)} possible route(s) between {from_stop} and {to_stop}")
     logger.info(f"Route planning completed - found {len(routes)} routes")
     
@@ -184,10 +383,10 @@ def find_routes_between_stops(from_stop: str, to_stop: str, ctx: Context = None)
         "routes": routes
     }
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Returning {len(routes)} route options to client")
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
 
 @mcp.tool()
 def plan_bus_journey(
@@ -195,6 +394,7 @@ def plan_bus_journey(
     end: str,
     minimize_transfers: bool = True,
     prefer_ac: bool = False,
+    departure_time: Optional[str] = None,
     ctx: Context = None
 ) -> str:
     """
@@ -205,11 +405,13 @@ def plan_bus_journey(
         end: Destination location name
         minimize_transfers: Prefer routes with fewer transfers (default: True)
         prefer_ac: Prefer AC buses if available (default: False)
+        departure_time: Departure time as HH:MM (24-hour). When given, plans the
+            earliest-arriving journey using bus timings, with wait and ride time per leg
     
     Returns:
         JSON string with complete journey plan
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Journey planning requested: {start} -> {end}")
         ctx.debug(f"   Preferences: minimize_transfers={minimize_transfers}, prefer_ac={prefer_ac}")
     
@@ -221,13 +423,22 @@ def plan_bus_journey(
         "prefer_ac": prefer_ac
     }
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug("Computing optimal journey path...")
     logger.debug("Computing journey plan...")
     
-    journey_plan = plan_journey(start, end, preferences)
+    if departure_time:
+        try:
+            journey_plan = plan_timed_journey(start, end, departure_time)
+        except ValueError as e:
+            if ctx:
+                ctx.warning(str(e))
+            logger.warning(f"Invalid departure time: {departure_time}")
+            return dumps({"error": str(e)})
+    else:
+        journey_plan = plan_journey(start, end, preferences)
     
-    if ctx:
+    if ctx and is_sampled():
         num_routes = len(journey_plan.get('routes', []))
         estimated_time = journey_plan.get('estimated_duration')
         total_fare = journey_plan.get('total_fare')
@@ -236,10 +447,10 @@ def plan_bus_journey(
     
     logger.info(f"Journey plan completed with {len(journey_plan.get('routes', []))} routes")
     
-    return json.dumps(journey_plan, indent=2, ensure_ascii=False)
+    return dumps(journey_plan)
 
 @mcp.tool()
-def calculate_bus_fare(
+async def calculate_bus_fare(
     from_stop: Optional[str] = None,
     to_stop: Optional[str] = None,
     distance_km: Optional[float] = None,
@@ -248,6 +459,10 @@ def calculate_bus_fare(
     """
     Calculate bus fare based on distance or between two stops
     
+    Between two bus stops, each ride is charged by the distance the bus
+    travels along its route, with a per-leg breakdown and concession fares.
+    Places off the bus network fall back to straight-line distance.
+    
     Args:
         from_stop: Starting stop name (optional if distance provided)
         to_stop: Destination stop name (optional if distance provided)
@@ -256,47 +471,256 @@ def calculate_bus_fare(
     Returns:
         JSON string with fare calculation
     """
-    if ctx:
-        ctx.debug(f"Fare calculation request: {from_stop or 'N/A'} -> {to_stop or 'N/A'} ({distance_km}km)")
+    if ctx and is_sampled():
+        await ctx.debug(f"Fare calculation request: {from_stop or 'N/A'} -> {to_stop or 'N/A'} ({distance_km}km)")
     logger.debug(f"Fare calculation initiated - from: {from_stop}, to: {to_stop}, distance: {distance_km}")
     
+    if distance_km is None and from_stop and to_stop:
+        route_fare = stop_fare(from_stop, to_stop)
+        if route_fare is not None:
+            if ctx and is_sampled():
+                await ctx.info(f"Fare calculated: INR {route_fare['fare_inr']} for {route_fare['distance_km']}km along the route")
+            logger.info(f"Fare calculation complete - INR {route_fare['fare_inr']} for {route_fare['distance_km']}km by route")
+            return dumps({
+                "from": from_stop,
+                "to": to_stop,
+                "distance_basis": "route",
+                **route_fare
+            })
+    
+    resolved_by = None
     if distance_km is None and from_stop and to_stop:
         try:
-            if ctx:
-                ctx.debug(f"Calculating distance between {from_stop} and {to_stop}...")
+            if ctx and is_sampled():
+                await ctx.debug(f"Calculating distance between {from_stop} and {to_stop}...")
             logger.debug(f"Calculating distance between {from_stop} and {to_stop}")
             
-            coords1 = get_coordinates(from_stop)
-            coords2 = get_coordinates(to_stop)
+            # Both endpoints resolve concurrently without blocking other tool calls
+            coords1, coords2 = await get_coordinates_many([from_stop, to_stop])
+            resolved_by = {"from": coords1['tier'], "to": coords2['tier']}
             distance_km = get_distance(
                 coords1['lat'], coords1['lon'],
                 coords2['lat'], coords2['lon']
             )
             
-            if ctx:
-                ctx.debug(f"Distance calculated: {distance_km:.2f} km")
+            if ctx and is_sampled():
+                await ctx.debug(f"Distance calculated: {distance_km:.2f} km")
             logger.info(f"Distance calculated: {distance_km:.2f} km")
         except Exception as e:
             if ctx:
-                ctx.warning(f"Could not calculate distance: {str(e)}, using default 10km")
+                await ctx.warning(f"Could not calculate distance: {str(e)}, using default 10km")
             logger.warning(f"Distance calculation failed: {e}, using default")
             distance_km = 10  # Default fallback
     
     fare = calculate_fare(distance_km or 0)
     
-    if ctx:
-        ctx.info(f"Fare calculated: INR {fare} for {distance_km}km")
-        ctx.debug(f"Sending fare information to client")
+    if ctx and is_sampled():
+        await ctx.info(f"Fare calculated: INR {fare} for {distance_km}km")
+        await ctx.debug(f"Sending fare information to client")
     logger.info(f"Fare calculation complete - INR {fare} for {distance_km}km")
     
     response = {
         "distance_km": round(distance_km, 2) if distance_km else None,
         "fare_inr": fare,
+        "discounted_fares": discounted_fares(get_dataset(), fare),
         "from": from_stop,
         "to": to_stop
     }
+    if resolved_by:
+        response["distance_basis"] = "straight_line"
+        # local/cache/network, or default when a stop fell back to the city centre
+        response["resolved_by"] = resolved_by
+    
+    return dumps(response)
+
+@mcp.tool()
+async def plan_bus_journeys(
+    pairs: List[List[str]],
+    minimize_transfers: bool = True,
+    departure_time: Optional[str] = None,
+    ctx: Context = None
+) -> str:
+    """
+    Plan journeys for many start/end pairs in one call
+    
+    Repeated pairs are planned once, and pairs with the same start share one
+    route search. Each result keeps only the best option's legs (route,
+    boarding and alighting stop, stop count).
+    
+    Args:
+        pairs: [start, end] location names, e.g. [["Patia", "Master Canteen"], ...]
+        minimize_transfers: Prefer routes with fewer transfers (default: True)
+        departure_time: Departure time as HH:MM (24-hour) for every pair. When
+            given, each journey is the earliest-arriving one using bus timings
+    
+    Returns:
+        JSON string with one journey summary per pair, in input order
+    """
+    if len(pairs) > MAX_BATCH_PAIRS:
+        return dumps({"error": f"At most {MAX_BATCH_PAIRS} pairs per call, got {len(pairs)}"})
+    if any(len(pair) != 2 for pair in pairs):
+        return dumps({"error": "Each pair must be [start, end]"})
+    
+    if ctx and is_sampled():
+        await ctx.info(f"Batch journey planning requested for {len(pairs)} pair(s)")
+    logger.info(f"Batch journey planning initiated: {len(pairs)} pairs")
+    
+    try:
+        journeys = plan_journeys(
+            [tuple(pair) for pair in pairs],
+            {"minimize_transfers": minimize_transfers},
+            departure_time or None
+        )
+    except ValueError as e:
+        if ctx:
+            await ctx.warning(str(e))
+        logger.warning(f"Invalid departure time: {departure_time}")
+        return dumps({"error": str(e)})
+    
+    found = sum(1 for journey in journeys if journey['journey_type'] != 'no_route_found')
+    if ctx and is_sampled():
+        await ctx.info(f"Planned {found} of {len(journeys)} journey(s)")
+    logger.info(f"Batch journey planning completed - {found}/{len(journeys)} connected")
+    
+    response = {
+        "total_pairs": len(journeys),
+        "journeys_found": found,
+        "journeys": journeys
+    }
+    return dumps(response)
+
+@mcp.tool()
+async def fare_matrix(
+    origins: List[str],
+    destinations: List[str],
+    ctx: Context = None
+) -> str:
+    """
+    Calculate bus fares from every origin to every destination
+    
+    Pairs of bus stops are priced by the distance ridden along the routes, as
+    in calculate_bus_fare. Only locations in pairs the bus network cannot
+    price are geocoded, each once and concurrently, and their straight-line
+    distances come from one batch calculation.
+    
+    Args:
+        origins: Starting stop or place names
+        destinations: Destination stop or place names
+    
+    Returns:
+        JSON string with distance_km and fare_inr matrices (one row per origin,
+        one column per destination), whether each distance follows the route
+        or a straight line, and how each geocoded location was resolved
+    """
+    cells = len(origins) * len(destinations)
+    if not cells:
+        return dumps({"error": "Give at least one origin and one destination"})
+    if cells > MAX_FARE_MATRIX_CELLS:
+        return dumps({"error": f"At most {MAX_FARE_MATRIX_CELLS} origin/destination pairs per call, got {cells}"})
+    
+    if ctx and is_sampled():
+        await ctx.info(f"Fare matrix requested: {len(origins)} x {len(destinations)}")
+    logger.info(f"Fare matrix initiated: {len(origins)} origins x {len(destinations)} destinations")
+    
+    route_fares = [[stop_fare(origin, destination) for destination in destinations] for origin in origins]
+    unpriced = [
+        (i, j) for i, row in enumerate(route_fares) for j, fare in enumerate(row) if fare is None
+    ]
+    
+    distances = [[fare['distance_km'] if fare else None for fare in row] for row in route_fares]
+    fares = [[fare['fare_inr'] if fare else None for fare in row] for row in route_fares]
+    basis = [["route" if fare else "straight_line" for fare in row] for row in route_fares]
+    
+    resolved = {}
+    if unpriced:
+        locations = list(dict.fromkeys(
+            [origins[i] for i, _ in unpriced] + [destinations[j] for _, j in unpriced]
+        ))
+        resolved = dict(zip(locations, await get_coordinates_many(locations)))
+        
+        # Rows and columns with at least one unpriced pair
+        rows = sorted({i for i, _ in unpriced})
+        columns = sorted({j for _, j in unpriced})
+        origin_coords = [resolved[origins[i]] for i in rows]
+        destination_coords = [resolved[destinations[j]] for j in columns]
+        straight = distance_matrix(
+            [c['lat'] for c in origin_coords], [c['lon'] for c in origin_coords],
+            [c['lat'] for c in destination_coords], [c['lon'] for c in destination_coords]
+        )
+        row_of = {i: r for r, i in enumerate(rows)}
+        column_of = {j: c for c, j in enumerate(columns)}
+        for i, j in unpriced:
+            distance = straight[row_of[i]][column_of[j]]
+            distances[i][j] = round(distance, 2)
+            fares[i][j] = calculate_fare(distance)
+    
+    if ctx and is_sampled():
+        await ctx.info(f"Fare matrix calculated for {cells} pair(s)")
+    logger.info(f"Fare matrix complete - {cells} pairs, {len(unpriced)} by straight-line distance")
     
-    return json.dumps(response, indent=2)
+    response = {
+        "origins": origins,
+        "destinations": destinations,
+        "distance_km": distances,
+        "fare_inr": fares,
+        "distance_basis": basis,
+        # local/cache/network, or default when a location fell back to the city centre
+        "resolved_by": {name: coords['tier'] for name, coords in resolved.items()}
+    }
+    return dumps(response)
+
+@mcp.tool()
+async def get_reachable_stops(
+    stop_name: str,
+    max_transfers: int = 1,
+    max_minutes: Optional[int] = 60,
+    ctx: Context = None
+) -> str:
+    """
+    Find every stop reachable from a stop within a transfer and time budget
+    
+    Useful for commute catchments: which stops can be reached from here in
+    under N minutes or with at most N changes of bus.
+    
+    Args:
+        stop_name: Starting bus stop name
+        max_transfers: Maximum number of transfers, 0 to 3 (default: 1)
+        max_minutes: Maximum estimated travel time in minutes, including
+            transfer penalties (default: 60; omit for no limit)
+    
+    Returns:
+        JSON string with reachable stops, quickest first, each with its
+        estimated time, transfers and route chain
+    """
+    if not 0 <= max_transfers <= MAX_REACH_TRANSFERS:
+        return dumps({"error": f"max_transfers must be between 0 and {MAX_REACH_TRANSFERS}"})
+    
+    if ctx and is_sampled():
+        await ctx.debug(f"Reachability from '{stop_name}': {max_transfers} transfer(s), {max_minutes} min")
+    logger.debug(f"Reachability search initiated: {stop_name}, transfers={max_transfers}, minutes={max_minutes}")
+    
+    result = find_reachable_stops(stop_name, max_transfers, max_minutes)
+    
+    if not result['origin_stops']:
+        if ctx:
+            await ctx.warning(f"Stop {stop_name} not found")
+        logger.warning(f"Stop not found: {stop_name}")
+        return dumps({"error": f"Stop {stop_name} not found"})
+    
+    reachable = result['reachable_stops']
+    if ctx and is_sampled():
+        await ctx.info(f"{len(reachable)} stop(s) reachable from {stop_name}")
+    logger.info(f"Reachability search completed - {len(reachable)} stops")
+    
+    response = {
+        "stop_name": stop_name,
+        "origin_stops": result['origin_stops'],
+        "max_transfers": max_transfers,
+        "max_minutes": max_minutes,
+        "total_reachable": len(reachable),
+        "reachable_stops": reachable
+    }
+    return dumps(response)
 
 @mcp.tool()
 def get_stops_for_route(route_number: str, ctx: Context = None) -> str:
@@ -309,7 +733,7 @@ def get_stops_for_route(route_number: str, ctx: Context = None) -> str:
     Returns:
         JSON string with ordered list of stops
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Retrieving stops for route: {route_number}")
     logger.debug(f"Retrieving stops for route: {route_number}")
     
@@ -319,11 +743,11 @@ def get_stops_for_route(route_number: str, ctx: Context = None) -> str:
         if ctx:
             ctx.warning(f"Route {route_number} not found")
         logger.warning(f"Route not found: {route_number}")
-        return json.dumps({"error": f"Route {route_number} not found"}, indent=2)
+        return dumps({"error": f"Route {route_number} not found"})
     
     stops = route_info.get('stops', [])
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Route {route_number} has {len(stops)} stops")
         ctx.debug(f"Sending {len(stops)} stops to client")
     logger.info(f"Retrieved {len(stops)} stops for route {route_number}")
@@ -335,7 +759,7 @@ def get_stops_for_route(route_number: str, ctx: Context = None) -> str:
         "stops": stops
     }
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
 
 @mcp.tool()
 def get_routes_for_stop(stop_name: str, ctx: Context = None) -> str:
@@ -348,13 +772,13 @@ def get_routes_for_stop(stop_name: str, ctx: Context = None) -> str:
     Returns:
         JSON string with all routes serving this stop
     """
-    if ctx:
+    if ctx and is_sampled():
         ctx.debug(f"Finding routes serving stop: {stop_name}")
     logger.debug(f"Finding routes for stop: {stop_name}")
     
-    routes = get_routes_for_stop(stop_name)
+    routes = routes_through_stop(stop_name)
     
-    if ctx:
+    if ctx and is_sampled():
         ctx.info(f"Stop {stop_name} is served by {len(routes)} route(s)")
         ctx.debug(f"Sending {len(routes)} routes to client")
     logger.info(f"Found {len(routes)} routes for stop: {stop_name}")
@@ -365,7 +789,52 @@ def get_routes_for_stop(stop_name: str, ctx: Context = None) -> str:
         "routes": routes
     }
     
-    return json.dumps(response, indent=2, ensure_ascii=False)
+    return dumps(response)
+
+@mcp.tool()
+async def reload_bus_database(force: bool = False, ctx: Context = None) -> str:
+    """
+    Reload the bus database file without restarting the server
+    
+    Args:
+        force: Rebuild even if the file has not changed
+    
+    Returns:
+        JSON string with the previous and current database versions
+    """
+    logger.info(f"Database reload requested (force={force})")
+    
+    try:
+        result = reload_dataset(force)
+    except (FileNotFoundError, ValueError) as e:
+        logger.error(f"Database reload failed, keeping the current data: {e}")
+        return dumps({"error": str(e)})
+    
+    dataset = get_dataset()
+    if ctx and is_sampled():
+        await ctx.info(f"Database version {result['version']} ({'reloaded' if result['reloaded'] else 'unchanged'})")
+    
+    response = {
+        **result,
+        "total_routes": len(dataset.routes),
+        "total_stops": len(dataset.stops)
+    }
+    return dumps(response)
+
+# ================== PROMETHEUS ENDPOINT ==================
+
+# Only served over HTTP transports (fastmcp run src/server.py --transport http);
+# MOBUS_METRICS_PATH=off disables it
+METRICS_PATH = os.getenv('MOBUS_METRICS_PATH', '/metrics')
+
+if METRICS_PATH.strip().lower() not in ('', 'off', 'none', '0', 'false'):
+    from starlette.requests import Request
+    from starlette.responses import PlainTextResponse
+    
+    @mcp.custom_route(METRICS_PATH, methods=["GET"])
+    async def prometheus_metrics(request: Request) -> PlainTextResponse:
+        """Metrics in the Prometheus text format"""
+        return PlainTextResponse(METRICS.prometheus(), media_type="text/plain; version=0.0.4")
 
 # ================== SERVER STARTUP ==================
 
@@ -374,11 +843,20 @@ def main():
     logger.info("=" * 80)
     logger.info("Mo Bus MCP Server Starting")
     logger.info("=" * 80)
-    logger.info(f"Total routes available: {len(ROUTES)}")
-    logger.info(f"Total stops available: {len(STOPS)}")
-    logger.info("Logging level: DEBUG - All operations will be tracked")
+    logger.info("Route data loads on first use")
+    logger.info(
+        f"Logging level: {logging_pipeline.LOG_LEVEL}, payloads "
+        f"{'on' if logging_pipeline.LOG_PAYLOADS else 'off'}, "
+        f"sampling {logging_pipeline.SAMPLE_RATE:.0%} of calls"
+    )
     logger.info("=" * 80)
     
+    watcher = watcher_from_env()
+    if watcher is not None:
+        logger.info(f"Watching the database file every {watcher.interval:g}s for changes")
+        watcher.start()
+    
+    startup.mark('server starting')
     mcp.run()
 
 if __name__ == "__main__":
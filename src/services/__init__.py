@@ -3,7 +3,16 @@ Services module for Mo Bus MCP Server
 Provides journey planning, geocoding, and route finding services
 """
 
-from .planner import find_routes, plan_journey, get_route_stops, is_stop_on_route
+from .planner import (
+    find_routes,
+    plan_journey,
+    plan_timed_journey,
+    plan_journeys,
+    summarize_journey,
+    get_route_stops,
+    is_stop_on_route
+)
+from .reachability import find_reachable_stops
 from .geocoding import (
     get_coordinates, 
     get_distance, 
@@ -14,8 +23,12 @@ from .geocoding import (
 __all__ = [
     'find_routes',
     'plan_journey',
+    'plan_timed_journey',
+    'plan_journeys',
+    'summarize_journey',
     'get_route_stops',
     'is_stop_on_route',
+    'find_reachable_stops',
     'get_coordinates',
     'get_distance',
     'geocode_location',
@@ -0,0 +1,291 @@
+"""
+Async Geocoding Service
+httpx-based counterpart of MultiSourceGeocoder for use inside async tools
+Resolves several locations concurrently and hedges SerpAPI with OSM under a latency budget
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from .geocache import GeocodeCache, NOT_FOUND, normalize_cache_key
+from .gazetteer import LocalGazetteer
+from ..data import on_dataset_reload
+from ..utils.metrics import METRICS
+from ..utils.ratelimit import provider_bucket
+from ..utils.singleflight import AsyncSingleFlight
+from .geocoding import (
+    SERPAPI_SEARCH_URL,
+    NOMINATIM_SEARCH_URL,
+    USER_AGENT,
+    DEFAULT_COORDINATES,
+    PROVIDER_ERROR,
+    build_serpapi_params,
+    parse_serpapi_response,
+    build_osm_params,
+    parse_osm_response,
+    record_provider_request,
+    get_geocoder
+)
+
+logger = logging.getLogger("Mo.Bus.Geocoding")
+
+DEFAULT_LATENCY_BUDGET = 4.0    # Seconds for a whole lookup, including rate-limit waits
+DEFAULT_HEDGE_DELAY = 0.75      # Seconds to wait on SerpAPI before also asking OSM
+
+
+class AsyncMultiSourceGeocoder:
+    """Async geocoder racing SerpAPI and OSM Nominatim under a latency budget"""
+
+    def __init__(
+        self,
+        cache: Optional[GeocodeCache] = None,
+        gazetteer: Optional[LocalGazetteer] = None,
+        latency_budget: float = DEFAULT_LATENCY_BUDGET,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY
+    ):
+        self.cache = cache
+        self.gazetteer = gazetteer
+        self.serpapi_key = os.getenv('SERPAPI_KEY', os.getenv('SERP_API_KEY'))
+        self.latency_budget = latency_budget
+        self.hedge_delay = hedge_delay
+        # Per-provider buckets, shared with the sync geocoder
+        self.serpapi_limiter = provider_bucket('serpapi')
+        self.osm_limiter = provider_bucket('osm')
+        # Concurrent lookups of the same address share one provider race
+        self._inflight = AsyncSingleFlight()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(headers={'User-Agent': USER_AGENT})
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def geocode_with_serpapi(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
+        """Geocode using SerpAPI Google Maps (None without an API key, PROVIDER_ERROR on failure)"""
+        if not self.serpapi_key:
+            return None
+
+        await self.serpapi_limiter.acquire_async()
+
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().get(
+                SERPAPI_SEARCH_URL,
+                params=build_serpapi_params(address, city, self.serpapi_key),
+                timeout=self.latency_budget
+            )
+            response.raise_for_status()
+            result = parse_serpapi_response(response.json())
+            record_provider_request('serpapi', started, 'hit' if result else 'miss')
+            return result
+        except asyncio.CancelledError:
+            record_provider_request('serpapi', started, 'cancelled')
+            raise
+        except Exception as e:
+            record_provider_request('serpapi', started, 'error')
+            logger.warning(f"SerpAPI geocoding error: {e}")
+
+        return PROVIDER_ERROR
+
+    async def geocode_with_osm(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
+        """Geocode using OpenStreetMap Nominatim (PROVIDER_ERROR on failure)"""
+        await self.osm_limiter.acquire_async()
+
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().get(
+                NOMINATIM_SEARCH_URL,
+                params=build_osm_params(address, city),
+                timeout=self.latency_budget
+            )
+            response.raise_for_status()
+            result = parse_osm_response(response.json())
+            record_provider_request('osm', started, 'hit' if result else 'miss')
+            return result
+        except asyncio.CancelledError:
+            record_provider_request('osm', started, 'cancelled')
+            raise
+        except Exception as e:
+            record_provider_request('osm', started, 'error')
+            logger.warning(f"OSM geocoding error: {e}")
+
+        return PROVIDER_ERROR
+
+    async def geocode(
+        self,
+        address: str,
+        city: str = "Bhubaneswar",
+        latency_budget: Optional[float] = None
+    ) -> Optional[Dict]:
+        """
+        Geocode with a hedged provider race
+
+        SerpAPI is asked first. If it has not answered within hedge_delay, or
+        answers empty, OSM is asked too, and the first usable answer wins.
+        Known stops and landmarks are answered locally without any request,
+        and nothing is negatively cached when the budget runs out or a
+        provider request fails. Concurrent
+        lookups of the same address share one race, each within its own budget.
+
+        Args:
+            address: Address or location name
+            city: City name
+            latency_budget: Seconds allowed for the whole lookup
+
+        Returns:
+            Best geocoding result or None, with 'tier' set to 'local',
+            'cache' or 'network'
+        """
+        if self.gazetteer is not None:
+            local = self.gazetteer.lookup(address, city)
+            if local is not None:
+                METRICS.increment('mobus_geocode_lookups_total', tier='local')
+                return {**local, 'tier': 'local'}
+
+        if self.cache is not None:
+            cached = self.cache.get(address, city)
+            if cached is NOT_FOUND:
+                METRICS.increment('mobus_geocode_lookups_total', tier='cache_not_found')
+                return None
+            if cached is not None:
+                METRICS.increment('mobus_geocode_lookups_total', tier='cache')
+                return {**cached, 'tier': 'cache'}
+
+        budget = self.latency_budget if latency_budget is None else latency_budget
+        try:
+            result, shared = await self._inflight.do(
+                normalize_cache_key(address, city),
+                lambda: self._geocode_network(address, city),
+                timeout=budget
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Geocoding '{address}' exceeded {budget}s budget")
+            METRICS.increment('mobus_geocode_lookups_total', tier='timeout')
+            return None
+        if shared:
+            METRICS.increment('mobus_geocode_coalesced_total')
+
+        METRICS.increment('mobus_geocode_lookups_total', tier='network' if result else 'not_found')
+        return {**result, 'tier': 'network'} if result else None
+
+    async def _geocode_network(self, address: str, city: str) -> Optional[Dict]:
+        """Race the providers and cache the answer"""
+        providers = [self.geocode_with_osm]
+        if self.serpapi_key:
+            providers.insert(0, self.geocode_with_serpapi)
+
+        result = await self._race(providers, address, city)
+        if result is PROVIDER_ERROR:
+            # Retried on the next lookup rather than remembered as not found
+            return None
+        if self.cache is not None:
+            self.cache.put(address, city, result)
+        return result
+
+    async def _race(self, providers: List, address: str, city: str):
+        """
+        Start providers in order, hedging after hedge_delay, and return the first hit
+
+        Returns:
+            The first result, None when every provider answered empty, or
+            PROVIDER_ERROR when none had a result and at least one failed
+        """
+        failed = False
+        waiting = list(providers)
+        pending = {asyncio.ensure_future(waiting.pop(0)(address, city))}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    if result is PROVIDER_ERROR:
+                        failed = True
+                    elif result:
+                        return result
+
+                # Hedge delay passed or a provider came back empty
+                if waiting:
+                    pending.add(asyncio.ensure_future(waiting.pop(0)(address, city)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return PROVIDER_ERROR if failed else None
+
+    async def geocode_many(
+        self,
+        addresses: List[str],
+        city: str = "Bhubaneswar",
+        latency_budget: Optional[float] = None
+    ) -> List[Optional[Dict]]:
+        """Geocode several locations concurrently, preserving order"""
+        return list(await asyncio.gather(*(
+            self.geocode(address, city, latency_budget) for address in addresses
+        )))
+
+
+# Global async geocoder, built on first use
+_async_geocoder: Optional[AsyncMultiSourceGeocoder] = None
+_async_geocoder_lock = threading.Lock()
+
+def get_async_geocoder() -> AsyncMultiSourceGeocoder:
+    """The shared async geocoder, using the sync geocoder's persistent cache and gazetteer"""
+    global _async_geocoder
+    if _async_geocoder is None:
+        with _async_geocoder_lock:
+            if _async_geocoder is None:
+                geocoder = get_geocoder()
+                _async_geocoder = AsyncMultiSourceGeocoder(cache=geocoder.cache, gazetteer=geocoder.gazetteer)
+    return _async_geocoder
+
+def _share_gazetteer(dataset):
+    """Pick up the gazetteer the sync geocoder rebuilt after a dataset reload"""
+    if _async_geocoder is not None:
+        _async_geocoder.gazetteer = get_geocoder().gazetteer
+
+# Registered after geocoding's own listener, so it runs once that has rebuilt
+on_dataset_reload(_share_gazetteer)
+
+async def geocode_location_async(location: str, city: str = "Bhubaneswar") -> Optional[Dict]:
+    """Geocode a location without blocking the event loop"""
+    return await get_async_geocoder().geocode(location, city)
+
+async def get_coordinates_many(locations: List[str], city: str = "Bhubaneswar") -> List[Dict[str, float]]:
+    """
+    Get coordinates for several locations concurrently
+
+    Falls back to Bhubaneswar center for any location that cannot be
+    resolved, like get_coordinates.
+
+    Returns:
+        List of dictionaries with lat, lon and tier keys, in input order
+    """
+    results = await get_async_geocoder().geocode_many(locations, city)
+    coordinates = []
+    for location, result in zip(locations, results):
+        if result:
+            coordinates.append({'lat': result['lat'], 'lon': result['lon'], 'tier': result['tier']})
+        else:
+            logger.warning(f"Could not resolve '{location}', using {city} centre")
+            coordinates.append({**DEFAULT_COORDINATES, 'tier': 'default'})
+    return coordinates
@@ -0,0 +1,92 @@
+"""
+Connection scan (CSA) earliest-arrival search
+Scans the departure-sorted connections of a Timetable once, from the requested time
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..data.timetable import Timetable
+
+INFINITY = float('inf')
+
+# One ride in a journey: (enter_connection, exit_connection)
+TimedLeg = Tuple[int, int]
+
+
+def connection_scan(
+    timetable: Timetable,
+    num_stops: int,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    departure: int
+) -> Optional[Dict]:
+    """
+    Earliest arrival from any source stop to any target stop
+
+    Args:
+        timetable: Precomputed connection arrays
+        num_stops: Number of stops in the compiled network
+        sources: Stop ids where the journey may start
+        targets: Stop ids where the journey may end
+        departure: Earliest departure, in minutes since midnight
+
+    Returns:
+        Dict with arrival time, target stop and legs, or None if no
+        trip reaches a target that day
+    """
+    earliest = [INFINITY] * num_stops
+    is_target = [False] * num_stops
+    for stop in targets:
+        is_target[stop] = True
+    source_list = list(sources)
+    for stop in source_list:
+        earliest[stop] = departure
+    if not source_list or not any(is_target):
+        return None
+
+    conn_dep = timetable.conn_dep
+    conn_arr = timetable.conn_arr
+    conn_from = timetable.conn_from
+    conn_to = timetable.conn_to
+    conn_trip = timetable.conn_trip
+
+    boarded: Dict[int, int] = {}  # trip -> connection where it was boarded
+    reached_by: Dict[int, TimedLeg] = {}  # stop -> leg that reached it first
+    best_arrival = INFINITY
+    best_target = -1
+
+    for conn in range(bisect_left(conn_dep, departure), len(conn_dep)):
+        if conn_dep[conn] >= best_arrival:
+            break
+        trip = conn_trip[conn]
+        enter = boarded.get(trip)
+        if enter is None:
+            if earliest[conn_from[conn]] > conn_dep[conn]:
+                continue
+            enter = boarded[trip] = conn
+
+        arrival = conn_arr[conn]
+        stop = conn_to[conn]
+        if arrival < earliest[stop]:
+            earliest[stop] = arrival
+            reached_by[stop] = (enter, conn)
+            if is_target[stop] and arrival < best_arrival:
+                best_arrival = arrival
+                best_target = stop
+
+    if best_target < 0:
+        return None
+
+    legs: List[TimedLeg] = []
+    stop = best_target
+    while stop in reached_by:
+        leg = reached_by[stop]
+        legs.append(leg)
+        stop = conn_from[leg[0]]
+    legs.reverse()
+
+    return {
+        'arrival': best_arrival,
+        'target': best_target,
+        'legs': legs
+    }
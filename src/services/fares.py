@@ -0,0 +1,136 @@
+"""
+Fare service
+Fares from the distance actually ridden along routes, with no geocoding
+"""
+import os
+from typing import Dict, Optional
+
+from ..data import get_dataset, on_dataset_reload, calculate_fare
+from ..data.index import normalize_stop_name
+from ..utils.lru import MISSING, VersionedLRUCache
+from ..utils.metrics import METRICS
+from .raptor import raptor_search
+
+# Transfers considered when pricing a trip between two stops
+MAX_FARE_TRANSFERS = 3
+
+# Sized like the planner result caches (0 disables caching)
+_fare_cache = VersionedLRUCache(int(os.getenv('MOBUS_PLAN_CACHE_SIZE', '1024')))
+
+def _clear_cache(dataset):
+    _fare_cache.clear()
+
+on_dataset_reload(_clear_cache)
+
+def _fare_cache_stats() -> Dict:
+    return {'stop_fare': _fare_cache.stats()}
+
+METRICS.add_collector('caches', _fare_cache_stats)
+
+def discounted_fares(dataset, fare: float) -> Dict[str, float]:
+    """The fare after each concession in the dataset's fare structure, by concession name"""
+    discounts = dataset.fare_structure.get('discounts', {})
+    return {
+        name: round(fare * (100 - discount.get('percentage', 0)) / 100, 2)
+        for name, discount in discounts.items()
+    }
+
+def leg_fare(dataset, route_number: str, from_position: int, to_position: int) -> Dict:
+    """
+    Fare for one ride between two stop positions on a route
+
+    Args:
+        dataset: Dataset the route and its distances come from
+        route_number: Route ridden
+        from_position: Position of the boarding stop on the route
+        to_position: Position of the alighting stop on the route
+
+    Returns:
+        Dict with distance_km and fare_inr
+    """
+    return _priced(dataset.route_distances.between(route_number, from_position, to_position))
+
+def _priced(distance: float) -> Dict:
+    return {
+        'distance_km': round(distance, 2),
+        'fare_inr': calculate_fare(distance)
+    }
+
+def stop_fare(from_stop: str, to_stop: str) -> Optional[Dict]:
+    """
+    Fare between two stops over the bus network
+
+    Uses the journey with the fewest transfers (then the fewest stops, then
+    the shortest distance) and charges each ride by the distance travelled
+    along its route.
+
+    Args:
+        from_stop: Starting stop name
+        to_stop: Destination stop name
+
+    Returns:
+        Dict with distance_km, fare_inr, discounted_fares and per-leg
+        breakdown, or None when either stop is unknown or no bus connects them.
+        Cached results are shared between callers and must not be modified.
+    """
+    dataset = get_dataset()
+    key = (normalize_stop_name(from_stop), normalize_stop_name(to_stop))
+    cached = _fare_cache.get(dataset.version, key)
+    if cached is not MISSING:
+        return cached
+
+    network = dataset.network
+    sources = network.ids_for(dataset.stop_index.match(from_stop))
+    targets = network.ids_for(dataset.stop_index.match(to_stop))
+    journeys = raptor_search(
+        network,
+        sources,
+        targets,
+        max_transfers=MAX_FARE_TRANSFERS,
+        stop_after=1
+    )
+
+    fare = None
+    if journeys:
+        route_distances = dataset.route_distances
+        options = []
+        for journey in journeys:
+            legs = []
+            for route_idx, board_stop, alight_stop, board_pos, alight_pos in journey['legs']:
+                route_num = network.route_keys[route_idx]
+                route_stops = dataset.routes[route_num]['stops']
+                legs.append({
+                    'route_number': route_num,
+                    'from': route_stops[board_pos],
+                    'to': route_stops[alight_pos],
+                    'distance_km': route_distances.between(route_num, board_pos, alight_pos)
+                })
+            distance = sum(leg['distance_km'] for leg in legs)
+            options.append((journey['transfers'], journey['stops_travelled'], distance, legs))
+
+        transfers, _, distance, legs = min(options, key=lambda option: option[:3])
+
+        # Route shapes are estimated from the few stops with coordinates, so
+        # the ride is stretched to at least the straight line between the
+        # places asked about when both are known
+        straight_line = route_distances.straight_line(
+            [network.stop_names[stop] for stop in sources],
+            [network.stop_names[stop] for stop in targets]
+        )
+        scale = straight_line / distance if straight_line and 0 < distance < straight_line else 1.0
+        for leg in legs:
+            leg.update(_priced(leg['distance_km'] * scale))
+            leg['discounted_fares'] = discounted_fares(dataset, leg['fare_inr'])
+        distance *= scale
+
+        total = sum(leg['fare_inr'] for leg in legs)
+        fare = {
+            'distance_km': round(distance, 2),
+            'fare_inr': total,
+            'discounted_fares': discounted_fares(dataset, total),
+            'total_transfers': transfers,
+            'legs': legs
+        }
+
+    _fare_cache.put(dataset.version, key, fare)
+    return fare
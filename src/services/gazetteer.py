@@ -0,0 +1,156 @@
+"""
+Local gazetteer
+Resolves locations against the stop database, the landmark table and a
+user alias file, so well-known places never need a network lookup
+"""
+import json
+import logging
+import os
+import re
+from typing import Dict, List, Optional
+
+from ..data import PROJECT_ROOT, LANDMARK_COORDINATES, get_dataset
+
+logger = logging.getLogger("Mo.Bus.Geocoding")
+
+DEFAULT_ALIAS_PATH = PROJECT_ROOT / "location_aliases.json"
+
+# Tiers in lookup order: user aliases override the database
+SOURCE_ALIAS = 'local_alias'
+SOURCE_STOP = 'local_stop'
+SOURCE_LANDMARK = 'local_landmark'
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_place_name(text: str) -> str:
+    """Lowercase, with punctuation and underscores folded into single spaces"""
+    return _NON_ALNUM.sub(' ', (text or '').lower()).strip()
+
+
+def load_aliases(path) -> Dict:
+    """
+    Read an alias file
+
+    The file maps a place name to either a stop id from the database or an
+    object with lat, lon and optionally name and city:
+
+        {"zoo": "nandankanan", "my office": {"lat": 20.35, "lon": 85.82}}
+
+    A missing file means no aliases; a malformed one is logged and ignored.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            aliases = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring location alias file {path}: {e}")
+        return {}
+
+    if not isinstance(aliases, dict):
+        logger.warning(f"Ignoring location alias file {path}: expected a JSON object")
+        return {}
+    return aliases
+
+
+class LocalGazetteer:
+    """Exact-name lookup table over places with known coordinates"""
+
+    def __init__(self, stops: Dict, landmarks: Dict, aliases: Optional[Dict] = None):
+        # normalized name -> candidate results, preferred first
+        self.entries: Dict[str, List[Dict]] = {}
+
+        for alias, target in (aliases or {}).items():
+            entry = self._alias_entry(alias, target, stops, landmarks)
+            if entry is not None:
+                self._add(alias, entry)
+
+        for stop_id, stop_info in stops.items():
+            coords = stop_info.get('coordinates')
+            if not coords:
+                continue
+            entry = self._entry(stop_info.get('name', stop_id), stop_info.get('city', ''), coords, SOURCE_STOP, stop_id)
+            self._add(stop_info.get('name', ''), entry)
+            self._add(stop_id, entry)
+
+        for stop_id, coords in landmarks.items():
+            stop_info = stops.get(stop_id, {})
+            name = stop_info.get('name') or stop_id.replace('_', ' ').title()
+            self._add(stop_id, self._entry(name, stop_info.get('city', ''), coords, SOURCE_LANDMARK, stop_id))
+
+    @staticmethod
+    def _entry(name: str, city: str, coords: Dict, source: str, stop_id: Optional[str] = None) -> Dict:
+        return {
+            'lat': coords['lat'],
+            'lon': coords['lon'],
+            'name': name,
+            'address': f"{name}, {city}" if city else name,
+            'city': city,
+            'stop_id': stop_id,
+            'source': source,
+            'confidence': 'high'
+        }
+
+    def _alias_entry(self, alias: str, target, stops: Dict, landmarks: Dict) -> Optional[Dict]:
+        if isinstance(target, str):
+            stop_info = stops.get(target, {})
+            coords = stop_info.get('coordinates') or landmarks.get(target)
+            if not coords:
+                logger.warning(f"Location alias '{alias}' points at '{target}', which has no coordinates")
+                return None
+            name = stop_info.get('name') or target.replace('_', ' ').title()
+            return self._entry(name, stop_info.get('city', ''), coords, SOURCE_ALIAS, target)
+
+        if isinstance(target, dict) and 'lat' in target and 'lon' in target:
+            return self._entry(target.get('name', alias), target.get('city', ''), target, SOURCE_ALIAS)
+
+        logger.warning(f"Location alias '{alias}' needs a stop id or lat/lon")
+        return None
+
+    def _add(self, name: str, entry: Dict):
+        key = normalize_place_name(name)
+        if key:
+            candidates = self.entries.setdefault(key, [])
+            if entry not in candidates:
+                candidates.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
+        """
+        Resolve a place by exact (normalized) name
+
+        "KIIT Square", "kiit_square" and "KIIT Square, Bhubaneswar" all
+        match the same stop. When a name exists in several cities, the one
+        in the requested city wins.
+
+        Returns:
+            Result dict shaped like the network geocoders' (lat, lon, name,
+            address, source, confidence) plus stop_id, or None
+        """
+        key = normalize_place_name(address)
+        city_key = normalize_place_name(city)
+        candidates = self.entries.get(key)
+
+        if candidates is None and city_key and key.endswith(' ' + city_key):
+            candidates = self.entries.get(key[:-len(city_key) - 1])
+        if not candidates:
+            return None
+
+        for entry in candidates:
+            if entry['source'] == SOURCE_ALIAS or normalize_place_name(entry['city']) == city_key:
+                return dict(entry)
+        return dict(candidates[0])
+
+
+def gazetteer_from_env() -> LocalGazetteer:
+    """
+    Build the gazetteer from the database and the alias file
+
+    MOBUS_LOCATION_ALIASES: path of the alias file (default location_aliases.json
+    in the project root)
+    """
+    path = os.getenv('MOBUS_LOCATION_ALIASES', str(DEFAULT_ALIAS_PATH))
+    return LocalGazetteer(get_dataset().stops, LANDMARK_COORDINATES, load_aliases(path))
@@ -0,0 +1,197 @@
+"""
+Persistent geocoding cache
+SQLite-backed store for geocoder results with TTLs, negative caching and LRU eviction
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from ..data import PROJECT_ROOT
+
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".geocode_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600        # Landmarks rarely move
+DEFAULT_NEGATIVE_TTL_SECONDS = 6 * 3600     # Retry unknown places a few times a day
+DEFAULT_MAX_ENTRIES = 10000
+
+# LRU recency is only refreshed this often, so warm hits rarely write
+ACCESS_RESOLUTION_SECONDS = 60
+
+# Sentinel distinguishing a cached "not found" from a cache miss
+NOT_FOUND = object()
+
+
+def normalize_cache_key(address: str, city: str) -> str:
+    """Case- and whitespace-insensitive key for an (address, city) pair"""
+    address_norm = ' '.join((address or '').lower().split())
+    city_norm = ' '.join((city or '').lower().split())
+    return f"{address_norm}|{city_norm}"
+
+
+class GeocodeCache:
+    """Thread-safe SQLite cache of geocoding results"""
+
+    def __init__(
+        self,
+        path: str = str(DEFAULT_CACHE_PATH),
+        ttl: float = DEFAULT_TTL_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.stats = {
+            'hits': 0,
+            'negative_hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+        self._lock = threading.Lock()
+
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._init_schema()
+            self.path = path
+        except sqlite3.Error:
+            # Unwritable location: keep the cache for this process only
+            self._conn = sqlite3.connect(':memory:', check_same_thread=False)
+            self._init_schema()
+            self.path = ':memory:'
+
+    def _init_schema(self):
+        if self._conn.execute("PRAGMA journal_mode=WAL").fetchone()[0] == 'wal':
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                " key TEXT PRIMARY KEY,"
+                " result TEXT,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS geocode_accessed ON geocode (accessed_at)"
+            )
+
+    def get(self, address: str, city: str):
+        """
+        Look up a cached result
+
+        Returns:
+            The cached result dict, NOT_FOUND for a cached negative result,
+            or None on a miss
+        """
+        key = normalize_cache_key(address, city)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, expires_at, accessed_at FROM geocode WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            result, expires_at, accessed_at = row
+            if expires_at <= now:
+                with self._conn:
+                    self._conn.execute("DELETE FROM geocode WHERE key = ?", (key,))
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            if now - accessed_at >= ACCESS_RESOLUTION_SECONDS:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE geocode SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+
+            if result is None:
+                self.stats['negative_hits'] += 1
+                return NOT_FOUND
+
+            self.stats['hits'] += 1
+            return json.loads(result)
+
+    def put(self, address: str, city: str, result: Optional[Dict]):
+        """Store a result, or a negative entry when result is None"""
+        key = normalize_cache_key(address, city)
+        now = time.time()
+        ttl = self.ttl if result is not None else self.negative_ttl
+        payload = json.dumps(result, ensure_ascii=False) if result is not None else None
+
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO geocode (key, result, expires_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, payload, now + ttl, now)
+                )
+            self.stats['stores'] += 1
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then least recently used ones over max_entries"""
+        with self._conn:
+            self._conn.execute("DELETE FROM geocode WHERE expires_at <= ?", (now,))
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM geocode WHERE key IN ("
+                    " SELECT key FROM geocode ORDER BY accessed_at LIMIT ?)",
+                    (excess,)
+                )
+                self.stats['evictions'] += excess
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM geocode")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM geocode").fetchone()
+        return count
+
+    def hit_ratio(self) -> float:
+        """Share of lookups answered from the cache (positive or negative)"""
+        hits = self.stats['hits'] + self.stats['negative_hits']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
+
+    def get_stats(self) -> Dict:
+        """Counters plus current size and hit ratio"""
+        return {
+            **self.stats,
+            'entries': len(self),
+            'hit_ratio': round(self.hit_ratio(), 4),
+            'path': self.path
+        }
+
+
+def cache_from_env() -> Optional[GeocodeCache]:
+    """
+    Build the cache from environment settings
+
+    MOBUS_GEOCODE_CACHE: database path, or 'off' to disable caching
+    MOBUS_GEOCODE_CACHE_TTL / MOBUS_GEOCODE_CACHE_NEGATIVE_TTL: seconds
+    MOBUS_GEOCODE_CACHE_MAX_ENTRIES: size bound before LRU eviction
+    """
+    path = os.getenv('MOBUS_GEOCODE_CACHE', str(DEFAULT_CACHE_PATH))
+    if path.strip().lower() in ('', 'off', 'none', '0', 'false'):
+        return None
+
+    return GeocodeCache(
+        path=path,
+        ttl=float(os.getenv('MOBUS_GEOCODE_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+        negative_ttl=float(os.getenv('MOBUS_GEOCODE_CACHE_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL_SECONDS)),
+        max_entries=int(os.getenv('MOBUS_GEOCODE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    )
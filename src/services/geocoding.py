@@ -3,31 +3,122 @@ Enhanced Geocoding Service
 Uses BOTH SerpAPI (Google Maps) and OpenStreetMap Nominatim for accurate location finding
 Falls back between services for maximum reliability
 """
+import logging
 import os
-import requests
+import threading
 import time
 from typing import Dict, List, Optional, Tuple
-from math import radians, sin, cos, sqrt, atan2
+
+from .geocache import GeocodeCache, NOT_FOUND, cache_from_env, normalize_cache_key
+from .gazetteer import LocalGazetteer, gazetteer_from_env
+from ..data import get_dataset, on_dataset_reload
+from ..utils.distance import calculate_distance
+from ..utils import startup
+from ..utils.metrics import METRICS
+from ..utils.ratelimit import provider_bucket
+from ..utils.singleflight import SingleFlight
+from ..utils.spatial import SpatialIndex
+
+logger = logging.getLogger("Mo.Bus.Geocoding")
+
+SERPAPI_SEARCH_URL = 'https://serpapi.com/search'
+NOMINATIM_SEARCH_URL = 'https://nominatim.openstreetmap.org/search'
+NOMINATIM_REVERSE_URL = 'https://nominatim.openstreetmap.org/reverse'
+USER_AGENT = 'MoBusApp/1.0 (Bus Route Planner)'
+
+# Used when a location cannot be resolved (Bhubaneswar center)
+DEFAULT_COORDINATES = {'lat': 20.2961, 'lon': 85.8245}
+
+# Returned by a provider whose request failed, as opposed to None for a
+# provider that answered with no results. Failures are never cached
+PROVIDER_ERROR = object()
+
+def build_serpapi_params(address: str, city: str, api_key: str) -> Dict:
+    """Query parameters for a SerpAPI Google Maps search"""
+    return {
+        'engine': 'google_maps',
+        'q': f"{address}, {city}, Odisha, India",
+        'type': 'search',
+        'api_key': api_key
+    }
+
+def parse_serpapi_response(data: Dict) -> Optional[Dict]:
+    """Best result from a SerpAPI Google Maps response, or None"""
+    local_results = data.get('local_results', [])
+    
+    if local_results:
+        result = local_results[0]
+        gps = result.get('gps_coordinates', {})
+        
+        if gps:
+            return {
+                'lat': gps.get('latitude'),
+                'lon': gps.get('longitude'),
+                'name': result.get('title', ''),
+                'address': result.get('address', ''),
+                'type': result.get('type', ''),
+                'rating': result.get('rating'),
+                'place_id': result.get('place_id', ''),
+                'source': 'google_maps_serpapi',
+                'confidence': 'high'
+            }
+    
+    return None
+
+def build_osm_params(address: str, city: str) -> Dict:
+    """Query parameters for a Nominatim search"""
+    return {
+        'q': f"{address}, {city}, Odisha, India",
+        'format': 'json',
+        'limit': 1,
+        'addressdetails': 1
+    }
+
+def parse_osm_response(results: List) -> Optional[Dict]:
+    """Best result from a Nominatim search response, or None"""
+    if results:
+        result = results[0]
+        return {
+            'lat': float(result['lat']),
+            'lon': float(result['lon']),
+            'name': result.get('display_name', ''),
+            'address': result.get('display_name', ''),
+            'type': result.get('type', ''),
+            'importance': float(result.get('importance', 0)),
+            'source': 'openstreetmap',
+            'confidence': 'medium'
+        }
+    
+    return None
+
+def record_provider_request(provider: str, started: float, outcome: str):
+    """Count a provider request ('hit', 'miss' or 'error') and time it from started"""
+    METRICS.increment('mobus_geocode_provider_requests_total', provider=provider, outcome=outcome)
+    METRICS.observe('mobus_geocode_provider_latency_ms', (time.perf_counter() - started) * 1000, provider=provider)
 
 class MultiSourceGeocoder:
     """Intelligent geocoder using SerpAPI and OSM Nominatim with fallback"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[GeocodeCache] = None,
+        gazetteer: Optional[LocalGazetteer] = None
+    ):
+        self.cache = cache
+        self.gazetteer = gazetteer
         self.serpapi_key = os.getenv('SERPAPI_KEY', os.getenv('SERP_API_KEY'))
+        
+        # Imported here so sessions that never geocode don't pay for it at startup
+        import requests
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'MoBusApp/1.0 (Bus Route Planner)'
+            'User-Agent': USER_AGENT
         })
-        self.last_request_time = 0
-        self.min_request_interval = 1.0  # Rate limiting
-    
-    def _rate_limit(self):
-        """Ensure we don't exceed API rate limits"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        # Per-provider buckets, shared with the async geocoder
+        self.serpapi_limiter = provider_bucket('serpapi')
+        self.osm_limiter = provider_bucket('osm')
+        # Concurrent lookups of the same address share one network lookup
+        self._inflight = SingleFlight()
     
     def geocode_with_serpapi(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
         """
@@ -38,54 +129,31 @@ class MultiSourceGeocoder:
             city: City name
         
         Returns:
-            Dictionary with lat, lon, name, address or None
+            Dictionary with lat, lon, name, address, None when nothing
+            matched (or without an API key), or PROVIDER_ERROR
         """
         if not self.serpapi_key:
             return None
         
-        self._rate_limit()
-        
-        # Build search query
-        query = f"{address}, {city}, Odisha, India"
-        
-        params = {
-            'engine': 'google_maps',
-            'q': query,
-            'type': 'search',
-            'api_key': self.serpapi_key
-        }
+        self.serpapi_limiter.acquire()
         
+        started = time.perf_counter()
         try:
             response = self.session.get(
-                'https://serpapi.com/search',
-                params=params,
+                SERPAPI_SEARCH_URL,
+                params=build_serpapi_params(address, city, self.serpapi_key),
                 timeout=10
             )
             response.raise_for_status()
             
-            data = response.json()
-            local_results = data.get('local_results', [])
-            
-            if local_results:
-                result = local_results[0]
-                gps = result.get('gps_coordinates', {})
-                
-                if gps:
-                    return {
-                        'lat': gps.get('latitude'),
-                        'lon': gps.get('longitude'),
-                        'name': result.get('title', ''),
-                        'address': result.get('address', ''),
-                        'type': result.get('type', ''),
-                        'rating': result.get('rating'),
-                        'place_id': result.get('place_id', ''),
-                        'source': 'google_maps_serpapi',
-                        'confidence': 'high'
-                    }
+            result = parse_serpapi_response(response.json())
+            record_provider_request('serpapi', started, 'hit' if result else 'miss')
+            return result
         except Exception as e:
-            print(f"SerpAPI geocoding error: {e}")
+            record_provider_request('serpapi', started, 'error')
+            logger.warning(f"SerpAPI geocoding error: {e}")
         
-        return None
+        return PROVIDER_ERROR
     
     def geocode_with_osm(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
         """
@@ -96,69 +164,93 @@ class MultiSourceGeocoder:
             city: City name
         
         Returns:
-            Dictionary with lat, lon, display_name or None
+            Dictionary with lat, lon, display_name, None when nothing
+            matched, or PROVIDER_ERROR
         """
-        self._rate_limit()
-        
-        # Build search query
-        query = f"{address}, {city}, Odisha, India"
-        
-        params = {
-            'q': query,
-            'format': 'json',
-            'limit': 1,
-            'addressdetails': 1
-        }
+        self.osm_limiter.acquire()
         
+        started = time.perf_counter()
         try:
             response = self.session.get(
-                'https://nominatim.openstreetmap.org/search',
-                params=params,
+                NOMINATIM_SEARCH_URL,
+                params=build_osm_params(address, city),
                 timeout=10
             )
             response.raise_for_status()
             
-            results = response.json()
-            if results:
-                result = results[0]
-                return {
-                    'lat': float(result['lat']),
-                    'lon': float(result['lon']),
-                    'name': result.get('display_name', ''),
-                    'address': result.get('display_name', ''),
-                    'type': result.get('type', ''),
-                    'importance': float(result.get('importance', 0)),
-                    'source': 'openstreetmap',
-                    'confidence': 'medium'
-                }
+            result = parse_osm_response(response.json())
+            record_provider_request('osm', started, 'hit' if result else 'miss')
+            return result
         except Exception as e:
-            print(f"OSM geocoding error: {e}")
+            record_provider_request('osm', started, 'error')
+            logger.warning(f"OSM geocoding error: {e}")
         
-        return None
+        return PROVIDER_ERROR
     
     def geocode(self, address: str, city: str = "Bhubaneswar") -> Optional[Dict]:
         """
         Intelligent geocoding with multi-source fallback
-        Tries SerpAPI first (more accurate), falls back to OSM
+        Resolves known stops and landmarks locally, then checks the persistent
+        cache, then tries SerpAPI first (more accurate), falls back to OSM
         
         Args:
             address: Address or location name
             city: City name
         
         Returns:
-            Best geocoding result or None
+            Best geocoding result or None. Its 'tier' key says what answered:
+            'local', 'cache' or 'network'
         """
-        # Try SerpAPI first (Google Maps - most accurate)
-        result = self.geocode_with_serpapi(address, city)
-        if result:
-            return result
+        # Stops and landmarks we already know never leave the process
+        if self.gazetteer is not None:
+            local = self.gazetteer.lookup(address, city)
+            if local is not None:
+                METRICS.increment('mobus_geocode_lookups_total', tier='local')
+                return {**local, 'tier': 'local'}
         
-        # Fallback to OSM Nominatim (free, reliable)
-        result = self.geocode_with_osm(address, city)
-        if result:
-            return result
+        # Warm lookups skip the network and the rate limiter entirely
+        if self.cache is not None:
+            cached = self.cache.get(address, city)
+            if cached is NOT_FOUND:
+                METRICS.increment('mobus_geocode_lookups_total', tier='cache_not_found')
+                return None
+            if cached is not None:
+                METRICS.increment('mobus_geocode_lookups_total', tier='cache')
+                return {**cached, 'tier': 'cache'}
         
-        return None
+        result, shared = self._inflight.do(
+            normalize_cache_key(address, city),
+            lambda: self._geocode_network(address, city)
+        )
+        if shared:
+            METRICS.increment('mobus_geocode_coalesced_total')
+        
+        METRICS.increment('mobus_geocode_lookups_total', tier='network' if result else 'not_found')
+        return {**result, 'tier': 'network'} if result else None
+    
+    def _geocode_network(self, address: str, city: str) -> Optional[Dict]:
+        """Ask the providers and cache the answer"""
+        # Try SerpAPI first (Google Maps - most accurate), falling back to
+        # OSM Nominatim (free, reliable)
+        providers = [self.geocode_with_osm]
+        if self.serpapi_key:
+            providers.insert(0, self.geocode_with_serpapi)
+        
+        result = None
+        failed = False
+        for provider in providers:
+            result = provider(address, city)
+            if result is PROVIDER_ERROR:
+                failed = True
+                result = None
+            elif result:
+                break
+        
+        # "Not found" is only remembered when every provider said so; a
+        # failed request is retried on the next lookup
+        if self.cache is not None and (result or not failed):
+            self.cache.put(address, city, result)
+        return result
     
     def reverse_geocode(self, lat: float, lon: float) -> Optional[Dict]:
         """
@@ -171,7 +263,7 @@ class MultiSourceGeocoder:
         Returns:
             Dictionary with address details or None
         """
-        self._rate_limit()
+        self.osm_limiter.acquire()
         
         params = {
             'lat': lat,
@@ -182,7 +274,7 @@ class MultiSourceGeocoder:
         
         try:
             response = self.session.get(
-                'https://nominatim.openstreetmap.org/reverse',
+                NOMINATIM_REVERSE_URL,
                 params=params,
                 timeout=10
             )
@@ -190,35 +282,10 @@ class MultiSourceGeocoder:
             
             return response.json()
         except Exception as e:
-            print(f"Reverse geocoding error: {e}")
+            logger.warning(f"Reverse geocoding error: {e}")
         
         return None
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """
-    Calculate distance between two coordinates using Haversine formula
-    
-    Args:
-        lat1: Latitude of first point
-        lon1: Longitude of first point
-        lat2: Latitude of second point
-        lon2: Longitude of second point
-    
-    Returns:
-        Distance in kilometers
-    """
-    R = 6371  # Earth's radius in kilometers
-    
-    lat1_rad = radians(lat1)
-    lat2_rad = radians(lat2)
-    delta_lat = radians(lat2 - lat1)
-    delta_lon = radians(lon2 - lon1)
-    
-    a = sin(delta_lat / 2) ** 2 + cos(lat1_rad) * cos(lat2_rad) * sin(delta_lon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    
-    return R * c
-
 def find_nearest_stops(
     lat: float, 
     lon: float, 
@@ -239,39 +306,66 @@ def find_nearest_stops(
     Returns:
         List of nearest stops with distance info
     """
-    user_location = (lat, lon)
-    nearest_stops = []
+    # Prebuilt index for the database; other stop tables get a one-off index
+    dataset = get_dataset()
+    if stops_data is dataset.stops:
+        spatial_index = dataset.spatial_index
+    else:
+        spatial_index = SpatialIndex.from_stops(stops_data)
     
-    for stop_id, stop_info in stops_data.items():
-        stop_coords = stop_info.get('coordinates')
-        if not stop_coords:
-            continue
-        
-        stop_lat = stop_coords.get('lat')
-        stop_lon = stop_coords.get('lon')
-        if not stop_lat or not stop_lon:
-            continue
-        
-        distance_km = calculate_distance(lat, lon, stop_lat, stop_lon)
-        
-        if distance_km <= max_distance_km:
-            nearest_stops.append({
-                'stop_id': stop_id,
-                'stop_name': stop_info.get('name', ''),
-                'city': stop_info.get('city', ''),
-                'distance_km': round(distance_km, 2),
-                'distance_m': round(distance_km * 1000),
-                'walking_time_min': round(distance_km * 12),  # ~12 min per km walking
-                'coordinates': stop_coords
-            })
+    nearest_stops = []
     
-    # Sort by distance
-    nearest_stops.sort(key=lambda x: x['distance_km'])
+    # Only stops in grid cells near the search circle are measured, nearest first
+    for stop_id, distance_km in spatial_index.nearest(lat, lon, max_results, max_distance_km):
+        stop_info = stops_data[stop_id]
+        nearest_stops.append({
+            'stop_id': stop_id,
+            'stop_name': stop_info.get('name', ''),
+            'city': stop_info.get('city', ''),
+            'distance_km': round(distance_km, 2),
+            'distance_m': round(distance_km * 1000),
+            'walking_time_min': round(distance_km * 12),  # ~12 min per km walking
+            'coordinates': stop_info['coordinates']
+        })
     
-    return nearest_stops[:max_results]
+    return nearest_stops
 
-# Global geocoder instance
-_geocoder = MultiSourceGeocoder()
+# Global geocoder instance, built on first use
+_geocoder: Optional[MultiSourceGeocoder] = None
+_geocoder_lock = threading.Lock()
+
+def get_geocoder() -> MultiSourceGeocoder:
+    """The shared geocoder, with its persistent cache and local gazetteer"""
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                with startup.phase('build geocoder'):
+                    _geocoder = MultiSourceGeocoder(cache=cache_from_env(), gazetteer=gazetteer_from_env())
+    return _geocoder
+
+def _refresh_gazetteer(dataset):
+    """Rebuild the gazetteer (and re-read the alias file) after a dataset reload"""
+    if _geocoder is not None:
+        _geocoder.gazetteer = gazetteer_from_env()
+
+on_dataset_reload(_refresh_gazetteer)
+
+def _geocode_cache_metrics() -> Dict:
+    """Persistent geocoding cache figures, once the geocoder exists"""
+    if _geocoder is None or _geocoder.cache is None:
+        return {}
+    stats = _geocoder.cache.get_stats()
+    return {
+        'geocode_cache': {
+            'hits': stats['hits'] + stats['negative_hits'],
+            'misses': stats['misses'],
+            'size': stats['entries'],
+            'hit_ratio': stats['hit_ratio']
+        }
+    }
+
+METRICS.add_collector('caches', _geocode_cache_metrics)
 
 def get_coordinates(location: str, city: str = "Bhubaneswar") -> Dict[str, float]:
     """
@@ -281,14 +375,16 @@ def get_coordinates(location: str, city: str = "Bhubaneswar") -> Dict[str, float
         location: Location name
     
     Returns:
-        Dictionary with lat and lon keys
+        Dictionary with lat and lon keys, plus the tier that answered
+        ('local', 'cache', 'network', or 'default' for the fallback)
     """
-    result = _geocoder.geocode(location, city)
+    result = get_geocoder().geocode(location, city)
     if result:
-        return {'lat': result['lat'], 'lon': result['lon']}
+        return {'lat': result['lat'], 'lon': result['lon'], 'tier': result['tier']}
     
     # Fallback to default (Bhubaneswar center)
-    return {'lat': 20.2961, 'lon': 85.8245}
+    logger.warning(f"Could not resolve '{location}', using {city} centre")
+    return {**DEFAULT_COORDINATES, 'tier': 'default'}
 
 def get_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two points (backward compatible)"""
@@ -296,11 +392,18 @@ def get_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
 
 def geocode_location(location: str, city: str = "Bhubaneswar") -> Optional[Dict]:
     """Geocode a location (backward compatible)"""
-    return _geocoder.geocode(location, city)
+    return get_geocoder().geocode(location, city)
+
+def get_geocode_cache_stats() -> Optional[Dict]:
+    """Hit/miss counters of the geocoding cache (None when caching is off)"""
+    cache = get_geocoder().cache
+    if cache is None:
+        return None
+    return cache.get_stats()
 
 def reverse_geocode_location(lat: float, lon: float) -> Optional[Dict]:
     """Reverse geocode coordinates (backward compatible)"""
-    return _geocoder.reverse_geocode(lat, lon)
+    return get_geocoder().reverse_geocode(lat, lon)
 
 def calculate_distance_between_locations(loc1: str, loc2: str) -> float:
     """Calculate distance between two named locations"""
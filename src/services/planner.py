@@ -2,8 +2,49 @@
 Journey planning and route finding service
 Uses JSON database for all operations
 """
-from typing import List, Dict, Optional
-from ..data import ROUTES, STOPS, get_routes_for_stop
+import os
+from typing import List, Dict, Optional, Sequence, Tuple
+from ..data import get_dataset, on_dataset_reload
+from ..data.fuzzy import compact_name
+from ..data.index import normalize_stop_name
+from ..data.timetable import MINUTES_PER_STOP, parse_clock, format_clock
+from ..utils.lru import MISSING, VersionedLRUCache
+from ..utils.metrics import METRICS
+from .raptor import raptor_search_many
+from .fares import leg_fare, discounted_fares
+from .connection_scan import connection_scan
+
+TRANSFER_PENALTY_MINUTES = 10
+DEFAULT_MAX_TRANSFERS = 3
+MAX_JOURNEY_OPTIONS = 3
+
+# Results per planner function kept for repeated queries (0 disables caching)
+PLAN_CACHE_SIZE = int(os.getenv('MOBUS_PLAN_CACHE_SIZE', '1024'))
+
+# Keyed on the lowercased query, like the stop index's own lookups; compact
+# names would merge more spellings but cost more than a cache hit saves.
+# Cached results are shared between callers and must not be modified.
+_route_cache = VersionedLRUCache(PLAN_CACHE_SIZE)
+_journey_cache = VersionedLRUCache(PLAN_CACHE_SIZE)
+_timed_journey_cache = VersionedLRUCache(PLAN_CACHE_SIZE)
+
+def _clear_caches(dataset):
+    # Entries of an old version are never served; this frees them right away
+    _route_cache.clear()
+    _journey_cache.clear()
+    _timed_journey_cache.clear()
+
+on_dataset_reload(_clear_caches)
+
+def plan_cache_stats() -> Dict:
+    """Hit/miss figures of the planner result caches"""
+    return {
+        'find_routes': _route_cache.stats(),
+        'plan_journey': _journey_cache.stats(),
+        'plan_timed_journey': _timed_journey_cache.stats()
+    }
+
+METRICS.add_collector('caches', plan_cache_stats)
 
 def find_routes(from_location: str, to_location: str) -> List[Dict]:
     """
@@ -16,40 +57,35 @@ def find_routes(from_location: str, to_location: str) -> List[Dict]:
     Returns:
         List of routes with journey details
     """
-    from_location_lower = from_location.lower()
-    to_location_lower = to_location.lower()
+    dataset = get_dataset()
+    key = (normalize_stop_name(from_location), normalize_stop_name(to_location))
+    cached = _route_cache.get(dataset.version, key)
+    if cached is not MISSING:
+        return cached
     
     matching_routes = []
     
-    for route_num, route_data in ROUTES.items():
-        stops = [stop.lower() for stop in route_data.get('stops', [])]
-        
-        # Find if both locations are in this route
-        from_idx = -1
-        to_idx = -1
-        
-        for idx, stop in enumerate(stops):
-            if from_location_lower in stop:
-                from_idx = idx
-            if to_location_lower in stop:
-                to_idx = idx
-        
-        # Check if route connects both locations
-        if from_idx >= 0 and to_idx >= 0 and from_idx < to_idx:
-            matching_routes.append({
-                'route_number': route_num,
-                'route_name': route_data.get('route_name', ''),
-                'from_stop': route_data['stops'][from_idx],
-                'to_stop': route_data['stops'][to_idx],
-                'stops_between': to_idx - from_idx,
-                'all_stops': route_data['stops'][from_idx:to_idx+1],
-                'distance_km': route_data.get('distance_km', 0),
-                'via': route_data.get('via', '')
-            })
+    # Only routes in both posting lists can connect the two locations
+    for route_num, from_idx, to_idx in dataset.stop_index.connections(from_location, to_location):
+        route_data = dataset.routes[route_num]
+        fare = leg_fare(dataset, route_num, from_idx, to_idx)
+        matching_routes.append({
+            'route_number': route_num,
+            'route_name': route_data.get('route_name', ''),
+            'from_stop': route_data['stops'][from_idx],
+            'to_stop': route_data['stops'][to_idx],
+            'stops_between': to_idx - from_idx,
+            'all_stops': route_data['stops'][from_idx:to_idx+1],
+            'distance_km': route_data.get('distance_km', 0),
+            'ride_distance_km': fare['distance_km'],
+            'fare_inr': fare['fare_inr'],
+            'via': route_data.get('via', '')
+        })
     
     # Sort by number of stops (fewer is better)
     matching_routes.sort(key=lambda x: x['stops_between'])
     
+    _route_cache.put(dataset.version, key, matching_routes)
     return matching_routes
 
 def plan_journey(start: str, end: str, preferences: Optional[Dict] = None) -> Dict:
@@ -67,81 +103,375 @@ def plan_journey(start: str, end: str, preferences: Optional[Dict] = None) -> Di
     if preferences is None:
         preferences = {}
     
-    # Find direct routes first
-    direct_routes = find_routes(start, end)
+    dataset = get_dataset()
+    key = (normalize_stop_name(start), normalize_stop_name(end), tuple(sorted(preferences.items())))
+    journey = _journey_cache.get(dataset.version, key)
+    if journey is MISSING:
+        journey = _plan_journey(dataset, start, end, preferences)
+        _journey_cache.put(dataset.version, key, journey)
     
-    if direct_routes:
-        best_route = direct_routes[0]
+    if journey is None:
         return {
-            'journey_type': 'direct',
-            'total_routes': 1,
-            'total_transfers': 0,
-            'estimated_time_minutes': best_route['stops_between'] * 3,  # ~3 min per stop
-            'recommended_route': {
-                'route_number': best_route['route_number'],
-                'route_name': best_route['route_name'],
-                'from_stop': best_route['from_stop'],
-                'to_stop': best_route['to_stop'],
-                'stops_count': best_route['stops_between'] + 1,
-                'stops': best_route['all_stops']
-            }
+            'journey_type': 'no_route_found',
+            'message': f'No direct or connecting routes found between {start} and {end}',
+            'suggestion': 'Try searching for nearby bus stops or alternative locations'
+        }
+    return journey
+
+def _plan_journey(dataset, start: str, end: str, preferences: Dict) -> Optional[Dict]:
+    """The plan_journey result, or None when no route connects the two"""
+    return _plan_journeys(dataset, [(start, end)], preferences)[0]
+
+def _plan_journeys(dataset, pairs: Sequence[Tuple[str, str]], preferences: Dict) -> List[Optional[Dict]]:
+    """
+    _plan_journey for many pairs
+    
+    Pairs that need a round-based search and start from the same stops are
+    searched together, in one sweep for all of their destinations.
+    """
+    network = dataset.network
+    max_transfers = preferences.get('max_transfers', DEFAULT_MAX_TRANSFERS)
+    minimize_transfers = preferences.get('minimize_transfers', True)
+    
+    journeys: List[Optional[Dict]] = []
+    # Source stops -> (indices of the pairs, their target stops)
+    searches: Dict[Tuple[int, ...], Tuple[List[int], List[List[int]]]] = {}
+    for index, (start, end) in enumerate(pairs):
+        # Find direct routes first
+        direct_routes = find_routes(start, end)
+        if direct_routes:
+            journeys.append(_direct_journey(dataset, direct_routes[0]))
+            continue
+        
+        sources = network.ids_for(dataset.stop_index.match(start))
+        targets = network.ids_for(dataset.stop_index.match(end))
+        
+        # One-transfer journeys come straight from the transfer table. They are
+        # the whole answer when no more transfers are allowed, or when they fill
+        # a page of options that rank transfers first
+        found = dataset.transfers.one_transfer(sources, targets) if max_transfers >= 1 else []
+        if max_transfers > 1 and (len(found) < MAX_JOURNEY_OPTIONS or not minimize_transfers):
+            # Left to the round-based search below
+            indices, target_sets = searches.setdefault(tuple(sources), ([], []))
+            indices.append(index)
+            target_sets.append(targets)
+            journeys.append(None)
+        else:
+            journeys.append(_ranked_journey(dataset, found, minimize_transfers))
+    
+    # Round-based search over the compiled network, one per set of sources
+    for sources, (indices, target_sets) in searches.items():
+        results = raptor_search_many(
+            network,
+            sources,
+            target_sets,
+            max_transfers=max_transfers,
+            # Journeys from later rounds would rank below a full page of options
+            stop_after=MAX_JOURNEY_OPTIONS if minimize_transfers else None
+        )
+        for index, found in zip(indices, results):
+            journeys[index] = _ranked_journey(dataset, found, minimize_transfers)
+    
+    return journeys
+
+def _direct_journey(dataset, best_route: Dict) -> Dict:
+    """The plan_journey result for a find_routes entry"""
+    return {
+        'journey_type': 'direct',
+        'total_routes': 1,
+        'total_transfers': 0,
+        'estimated_time_minutes': best_route['stops_between'] * MINUTES_PER_STOP,
+        'total_fare': best_route['fare_inr'],
+        'discounted_fares': discounted_fares(dataset, best_route['fare_inr']),
+        'recommended_route': {
+            'route_number': best_route['route_number'],
+            'route_name': best_route['route_name'],
+            'from_stop': best_route['from_stop'],
+            'to_stop': best_route['to_stop'],
+            'stops_count': best_route['stops_between'] + 1,
+            'distance_km': best_route['ride_distance_km'],
+            'fare_inr': best_route['fare_inr'],
+            'stops': best_route['all_stops']
         }
+    }
+
+def _ranked_journey(dataset, journeys: List[Dict], minimize_transfers: bool) -> Optional[Dict]:
+    """The plan_journey result for raptor_search journeys, or None without any"""
+    if not journeys:
+        return None
+    
+    # Rank by transfers then stops, or the reverse if transfers are acceptable
+    if minimize_transfers:
+        journeys = sorted(journeys, key=lambda j: (j['transfers'], j['stops_travelled']))
+    else:
+        journeys = sorted(journeys, key=lambda j: (j['stops_travelled'], j['transfers']))
+    
+    transfer_options = [_format_journey(dataset, j) for j in journeys[:MAX_JOURNEY_OPTIONS]]
+    best = transfer_options[0]
+    return {
+        'journey_type': 'with_transfer',
+        'total_routes': len(best['legs']),
+        'total_transfers': best['total_transfers'],
+        'estimated_time_minutes': best['estimated_time_minutes'],
+        'total_fare': best['total_fare'],
+        'discounted_fares': best['discounted_fares'],
+        'transfer_options': transfer_options
+    }
+
+def _format_journey(dataset, journey: Dict) -> Dict:
+    """Turn a raptor_search journey into named legs"""
+    legs = []
+    for route_idx, board_stop, alight_stop, board_pos, alight_pos in journey['legs']:
+        route_num = dataset.network.route_keys[route_idx]
+        route_data = dataset.routes[route_num]
+        legs.append({
+            'route_number': route_num,
+            'route_name': route_data.get('route_name', ''),
+            'from': route_data['stops'][board_pos],
+            'to': route_data['stops'][alight_pos],
+            'stops_count': alight_pos - board_pos + 1,
+            **leg_fare(dataset, route_num, board_pos, alight_pos),
+            'stops': route_data['stops'][board_pos:alight_pos+1]
+        })
+
+    transfers = journey['transfers']
+    total_fare = sum(leg['fare_inr'] for leg in legs)
+    return {
+        'total_transfers': transfers,
+        'stops_travelled': journey['stops_travelled'],
+        'estimated_time_minutes': (
+            journey['stops_travelled'] * MINUTES_PER_STOP
+            + transfers * TRANSFER_PENALTY_MINUTES
+        ),
+        'total_fare': total_fare,
+        'discounted_fares': discounted_fares(dataset, total_fare),
+        'transfer_points': [leg['to'] for leg in legs[:-1]],
+        'legs': legs
+    }
+
+def plan_timed_journey(start: str, end: str, departure_time: str) -> Dict:
+    """
+    Plan the earliest-arriving journey leaving at or after a given time
     
-    # No direct route - find routes with one transfer
-    start_routes = get_routes_for_stop(start)
-    end_routes = get_routes_for_stop(end)
-    
-    transfer_options = []
-    
-    for start_route in start_routes:
-        for end_route in end_routes:
-            # Find common stops (potential transfer points)
-            start_stops = [s.lower() for s in start_route['stops']]
-            end_stops = [s.lower() for s in end_route['stops']]
-            
-            common_stops = set(start_stops) & set(end_stops)
-            
-            if common_stops:
-                for transfer_stop in common_stops:
-                    transfer_options.append({
-                        'first_route': {
-                            'route_number': start_route['route_number'],
-                            'route_name': start_route['route_name'],
-                            'from': start,
-                            'to': transfer_stop
-                        },
-                        'transfer_point': transfer_stop,
-                        'second_route': {
-                            'route_number': end_route['route_number'],
-                            'route_name': end_route['route_name'],
-                            'from': transfer_stop,
-                            'to': end
-                        }
-                    })
-    
-    if transfer_options:
+    Args:
+        start: Starting location name
+        end: Destination location name
+        departure_time: Departure time as HH:MM (24-hour)
+    
+    Returns:
+        Journey plan with departure, arrival, wait and ride time per leg
+    
+    Raises:
+        ValueError: If departure_time is not a valid HH:MM time
+    """
+    departure = parse_clock(departure_time)
+    dataset = get_dataset()
+    key = (normalize_stop_name(start), normalize_stop_name(end), departure)
+    journey = _timed_journey_cache.get(dataset.version, key)
+    if journey is MISSING:
+        journey = _plan_timed_journey(dataset, start, end, departure)
+        _timed_journey_cache.put(dataset.version, key, journey)
+    
+    if journey is None:
         return {
-            'journey_type': 'with_transfer',
-            'total_routes': 2,
-            'total_transfers': 1,
-            'estimated_time_minutes': 45,  # Estimate with transfer
-            'transfer_options': transfer_options[:3]  # Top 3 options
+            'journey_type': 'no_route_found',
+            'departure_time': format_clock(departure),
+            'message': f'No bus service from {start} to {end} after {format_clock(departure)}',
+            'suggestion': 'Try an earlier departure time or nearby bus stops'
         }
+    return journey
+
+def _plan_timed_journey(dataset, start: str, end: str, departure: int) -> Optional[Dict]:
+    """The plan_timed_journey result, or None when no bus gets there that day"""
+    return _plan_timed_journeys(dataset, [(start, end)], departure)[0]
+
+def _plan_timed_journeys(dataset, pairs: Sequence[Tuple[str, str]], departure: int) -> List[Optional[Dict]]:
+    """
+    _plan_timed_journey for many pairs
+    
+    The untimed reachability check is one sweep per set of source stops;
+    each reachable pair then gets its own scan of the day's connections.
+    """
+    network = dataset.network
     
-    # No routes found
+    # Source stops -> (indices of the pairs, their target stops)
+    searches: Dict[Tuple[int, ...], Tuple[List[int], List[List[int]]]] = {}
+    for index, (start, end) in enumerate(pairs):
+        sources = network.ids_for(dataset.stop_index.match(start))
+        targets = network.ids_for(dataset.stop_index.match(end))
+        indices, target_sets = searches.setdefault(tuple(sources), ([], []))
+        indices.append(index)
+        target_sets.append(targets)
+    
+    journeys: List[Optional[Dict]] = [None] * len(pairs)
+    for sources, (indices, target_sets) in searches.items():
+        # A cheap untimed search rules out unreachable pairs before scanning the day
+        reachable = raptor_search_many(network, sources, target_sets, max_transfers=network.num_routes, stop_after=1)
+        for index, targets, found in zip(indices, target_sets, reachable):
+            if found:
+                journeys[index] = _timed_journey(dataset, sources, targets, departure)
+    return journeys
+
+def _timed_journey(dataset, sources: Sequence[int], targets: Sequence[int], departure: int) -> Optional[Dict]:
+    """The earliest-arriving journey between two stop sets, or None"""
+    network = dataset.network
+    timetable = dataset.timetable
+    result = connection_scan(timetable, network.num_stops, sources, targets, departure)
+    if result is None:
+        return None
+    
+    legs = []
+    ready_at = departure
+    for enter, exit_ in result['legs']:
+        trip = timetable.conn_trip[enter]
+        route_idx = timetable.trip_route[trip]
+        route_num = network.route_keys[route_idx]
+        route_data = dataset.routes[route_num]
+        board_pos = timetable.conn_pos[enter]
+        alight_pos = timetable.conn_pos[exit_] + 1
+        leaves = timetable.conn_dep[enter]
+        arrives = timetable.conn_arr[exit_]
+        legs.append({
+            'route_number': route_num,
+            'route_name': route_data.get('route_name', ''),
+            'from': route_data['stops'][board_pos],
+            'to': route_data['stops'][alight_pos],
+            'stops_count': alight_pos - board_pos + 1,
+            **leg_fare(dataset, route_num, board_pos, alight_pos),
+            'departure_time': format_clock(leaves),
+            'arrival_time': format_clock(arrives),
+            'wait_minutes': leaves - ready_at,
+            'ride_minutes': arrives - leaves,
+            'headway_minutes': timetable.headway(route_idx),
+            'schedule': 'published' if timetable.is_published(route_idx) else 'estimated'
+        })
+        ready_at = arrives
+    
+    total_fare = sum(leg['fare_inr'] for leg in legs)
     return {
-        'journey_type': 'no_route_found',
-        'message': f'No direct or connecting routes found between {start} and {end}',
-        'suggestion': 'Try searching for nearby bus stops or alternative locations'
+        'journey_type': 'direct' if len(legs) == 1 else 'with_transfer',
+        'total_routes': len(legs),
+        'total_transfers': len(legs) - 1,
+        'departure_time': format_clock(departure),
+        'arrival_time': format_clock(result['arrival']),
+        'estimated_time_minutes': result['arrival'] - departure,
+        'total_wait_minutes': sum(leg['wait_minutes'] for leg in legs),
+        'total_ride_minutes': sum(leg['ride_minutes'] for leg in legs),
+        'total_fare': total_fare,
+        'discounted_fares': discounted_fares(dataset, total_fare),
+        'legs': legs
+    }
+
+def plan_journeys(
+    pairs: Sequence[Tuple[str, str]],
+    preferences: Optional[Dict] = None,
+    departure_time: Optional[str] = None
+) -> List[Dict]:
+    """
+    Plan journeys for many origin/destination pairs
+    
+    Pairs that differ only in case, spacing or punctuation are planned once,
+    and pairs already in the planner caches are not planned again. The rest
+    are planned together: pairs that need a round-based search and start
+    from the same stops share one sweep for all of their destinations.
+    
+    Args:
+        pairs: (start, end) location names
+        preferences: As for plan_journey
+        departure_time: HH:MM; when given, pairs are planned as by plan_timed_journey
+    
+    Returns:
+        A summarize_journey dict per pair, in input order
+    
+    Raises:
+        ValueError: If departure_time is not a valid HH:MM time
+    """
+    if preferences is None:
+        preferences = {}
+    
+    dataset = get_dataset()
+    if departure_time is None:
+        cache, variant = _journey_cache, tuple(sorted(preferences.items()))
+        plan = lambda uncached: _plan_journeys(dataset, uncached, preferences)
+    else:
+        departure = parse_clock(departure_time)
+        cache, variant = _timed_journey_cache, departure
+        plan = lambda uncached: _plan_timed_journeys(dataset, uncached, departure)
+    
+    distinct: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    for start, end in pairs:
+        distinct.setdefault((compact_name(start), compact_name(end)), (start, end))
+    
+    summaries: Dict[Tuple[str, str], Dict] = {}
+    uncached = []
+    for name_key, (start, end) in distinct.items():
+        key = (normalize_stop_name(start), normalize_stop_name(end), variant)
+        journey = cache.get(dataset.version, key)
+        if journey is MISSING:
+            uncached.append((name_key, key))
+        else:
+            summaries[name_key] = _summarize_planned(journey)
+    
+    for (name_key, key), journey in zip(uncached, plan([distinct[name_key] for name_key, _ in uncached])):
+        cache.put(dataset.version, key, journey)
+        summaries[name_key] = _summarize_planned(journey)
+    
+    return [
+        {'from': start, 'to': end, **summaries[(compact_name(start), compact_name(end))]}
+        for start, end in pairs
+    ]
+
+def _summarize_planned(journey: Optional[Dict]) -> Dict:
+    """summarize_journey for a planner result, where None means no route was found"""
+    if journey is None:
+        return {'journey_type': 'no_route_found'}
+    return summarize_journey(journey)
+
+def summarize_journey(journey: Dict) -> Dict:
+    """
+    The best option of a plan_journey or plan_timed_journey result, without stop lists
+    
+    Returns:
+        Dict with journey_type, total_transfers, estimated_time_minutes,
+        total_fare and legs of route_number/from/to/stops_count/fare_inr (plus departure and arrival
+        times for timed journeys); just journey_type when no route was found
+    """
+    journey_type = journey['journey_type']
+    if journey_type == 'no_route_found':
+        return {'journey_type': journey_type}
+    
+    if 'legs' in journey:
+        legs = journey['legs']
+    elif 'transfer_options' in journey:
+        legs = journey['transfer_options'][0]['legs']
+    else:
+        route = journey['recommended_route']
+        legs = [{
+            'route_number': route['route_number'],
+            'from': route['from_stop'],
+            'to': route['to_stop'],
+            'stops_count': route['stops_count'],
+            'fare_inr': route['fare_inr']
+        }]
+    
+    leg_fields = ('route_number', 'from', 'to', 'stops_count', 'fare_inr', 'departure_time', 'arrival_time')
+    summary = {
+        'journey_type': journey_type,
+        'total_transfers': journey['total_transfers'],
+        'estimated_time_minutes': journey['estimated_time_minutes'],
+        'total_fare': journey['total_fare'],
+        'legs': [{field: leg[field] for field in leg_fields if field in leg} for leg in legs]
     }
+    if 'departure_time' in journey:
+        summary['departure_time'] = journey['departure_time']
+        summary['arrival_time'] = journey['arrival_time']
+    return summary
 
 def get_route_stops(route_number: str) -> List[str]:
     """Get all stops for a route in order"""
-    route_data = ROUTES.get(route_number, {})
+    route_data = get_dataset().routes.get(route_number, {})
     return route_data.get('stops', [])
 
 def is_stop_on_route(stop_name: str, route_number: str) -> bool:
     """Check if a stop is on a specific route"""
-    stops = get_route_stops(route_number)
-    stop_name_lower = stop_name.lower()
-    return any(stop_name_lower in stop.lower() for stop in stops)
+    return get_dataset().stop_index.on_route(stop_name, route_number)
@@ -0,0 +1,310 @@
+"""
+Round-based (RAPTOR-style) journey search
+Each round adds one bus ride; labels count stops travelled
+"""
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..data.network import TransitNetwork
+
+INFINITY = float('inf')
+
+# One ride in a journey: (route_idx, board_stop, alight_stop, board_pos, alight_pos)
+Leg = Tuple[int, int, int, int, int]
+
+
+def raptor_search(
+    network: TransitNetwork,
+    sources: Iterable[int],
+    targets: Iterable[int],
+    max_transfers: int = 3,
+    stop_after: Optional[int] = None
+) -> List[Dict]:
+    """
+    Find journeys between two stop sets with up to max_transfers transfers
+
+    Round k scans only routes touching stops improved in round k-1, so work
+    grows with the part of the network actually reached. Labels that do not
+    beat the best known cost at a stop, or the best cost already found at the
+    destination with fewer rides, are pruned.
+
+    Args:
+        network: Compiled transit network
+        sources: Stop ids where the journey may start
+        targets: Stop ids where the journey may end
+        max_transfers: Maximum number of transfers (rounds - 1)
+        stop_after: Stop after the first round that has found at least this
+            many journeys (useful when ranking by transfers first)
+
+    Returns:
+        Journeys as dicts with legs, transfers and stops travelled.
+        Several journeys may share a transfer count; none is dominated by
+        a journey with fewer transfers and no more stops.
+    """
+    return raptor_search_many(network, sources, [targets], max_transfers, stop_after)[0]
+
+
+def raptor_search_many(
+    network: TransitNetwork,
+    sources: Iterable[int],
+    target_sets: Sequence[Iterable[int]],
+    max_transfers: int = 3,
+    stop_after: Optional[int] = None
+) -> List[List[Dict]]:
+    """
+    raptor_search from one stop set to several destinations in one sweep
+
+    Each destination keeps its own bound and stop_after count, and gets the
+    journeys raptor_search would find for it (up to ties between equally
+    good legs). Labels are pruned only once they cannot improve on any
+    destination still being searched.
+
+    Args:
+        network: Compiled transit network
+        sources: Stop ids where the journeys may start
+        target_sets: Stop ids where the journeys may end, one set per destination
+        max_transfers: Maximum number of transfers (rounds - 1)
+        stop_after: As for raptor_search, applied to each destination
+
+    Returns:
+        The journeys to each destination, in target_sets order
+    """
+    source_list = list(dict.fromkeys(sources))
+    num_stops = network.num_stops
+    # Destinations each stop belongs to
+    sets_at: List[Optional[List[int]]] = [None] * num_stops
+    for index, targets in enumerate(target_sets):
+        for stop in dict.fromkeys(targets):
+            if sets_at[stop] is None:
+                sets_at[stop] = [index]
+            else:
+                sets_at[stop].append(index)
+    active = {index for stop_sets in sets_at if stop_sets is not None for index in stop_sets}
+    if not source_list or not active:
+        return [[] for _ in target_sets]
+
+    route_stops = network.route_stops
+    stop_routes = network.stop_routes
+
+    best = [INFINITY] * num_stops
+    # Labels from the previous round; only entries in `marked` are set
+    previous = [INFINITY] * num_stops
+    for stop in source_list:
+        best[stop] = 0
+        previous[stop] = 0
+    marked = source_list
+    if stop_after is None:
+        stop_after = INFINITY
+
+    # parents[k][stop] = leg that reached stop with k rides
+    parents: List[Dict[int, Leg]] = [{}]
+    # Best arrival found at each destination in earlier rounds, and the
+    # loosest of them over the destinations still being searched
+    bounds = [INFINITY] * len(target_sets)
+    target_bound = INFINITY
+    found: List[List[Tuple[int, int, Leg]]] = [[] for _ in target_sets]
+
+    for round_num in range(1, max_transfers + 2):
+        # First and last marked position on each route touched by the last round
+        queue: Dict[int, List[int]] = {}
+        for stop in marked:
+            for route_idx, position in stop_routes[stop]:
+                span = queue.get(route_idx)
+                if span is None:
+                    queue[route_idx] = [position, position]
+                elif position < span[0]:
+                    span[0] = position
+                elif position > span[1]:
+                    span[1] = position
+
+        current: Dict[int, int] = {}
+        round_parents: Dict[int, Leg] = {}
+        round_bounds = list(bounds)
+        round_bound = target_bound
+
+        for route_idx, (board_pos, last_marked) in queue.items():
+            sequence = route_stops[route_idx]
+            # Label at the boarding stop minus its position
+            board_value = previous[sequence[board_pos]] - board_pos
+
+            for position, stop in enumerate(islice(sequence, board_pos + 1, None), board_pos + 1):
+                arrival = board_value + position
+
+                if arrival < target_bound:
+                    stop_sets = sets_at[stop]
+                    if stop_sets is not None:
+                        leg = (route_idx, sequence[board_pos], stop, board_pos, position)
+                        tightened = False
+                        for index in stop_sets:
+                            if arrival < bounds[index] and index in active:
+                                found[index].append((arrival, round_num, leg))
+                                if arrival < round_bounds[index]:
+                                    tightened = tightened or round_bounds[index] == round_bound
+                                    round_bounds[index] = arrival
+                        if tightened:
+                            round_bound = max(round_bounds[index] for index in active)
+                    if arrival < best[stop] and arrival < round_bound:
+                        best[stop] = arrival
+                        current[stop] = arrival
+                        round_parents[stop] = (route_idx, sequence[board_pos], stop, board_pos, position)
+                elif position > last_marked:
+                    # Arrivals only grow from here and no better boarding remains
+                    break
+
+                label = previous[stop]
+                if label < INFINITY and label - position < board_value:
+                    board_value = label - position
+                    board_pos = position
+
+        parents.append(round_parents)
+        bounds = round_bounds
+        active = {index for index in active if len(found[index]) < stop_after}
+        if not current or not active:
+            break
+        target_bound = max(bounds[index] for index in active)
+
+        for stop in marked:
+            previous[stop] = INFINITY
+        # Labels no cheaper than every destination's best arrival cannot improve on them
+        marked = [stop for stop, label in current.items() if label < target_bound]
+        if not marked:
+            break
+        for stop in marked:
+            previous[stop] = current[stop]
+
+    results = []
+    for set_found in found:
+        journeys = []
+        seen = set()
+        for stops_travelled, rides, leg in set_found:
+            legs = _reconstruct(parents, rides, leg)
+            if legs is None:
+                continue
+            signature = tuple((l[0], l[1], l[2]) for l in legs)
+            if signature in seen:
+                continue
+            seen.add(signature)
+            journeys.append({
+                'transfers': rides - 1,
+                'stops_travelled': stops_travelled,
+                'legs': legs
+            })
+        results.append(journeys)
+    return results
+
+
+def _reconstruct(parents: List[Dict[int, Leg]], rides: int, last_leg: Leg) -> Optional[List[Leg]]:
+    """Walk parent pointers back from the final leg to a source stop"""
+    legs = [last_leg]
+    board_stop = last_leg[1]
+    for round_num in range(rides - 1, 0, -1):
+        leg = parents[round_num].get(board_stop)
+        if leg is None:
+            return None
+        legs.append(leg)
+        board_stop = leg[1]
+    legs.reverse()
+    return legs
+
+
+def raptor_reach(
+    network: TransitNetwork,
+    sources: Iterable[int],
+    max_transfers: int = 1,
+    stop_cost: float = 1,
+    transfer_cost: float = 0,
+    max_cost: float = INFINITY
+) -> Dict[int, Dict]:
+    """
+    Find every stop reachable from a stop set, with its cheapest journey
+
+    The same rounds as raptor_search with no target: round k scans routes
+    touching stops improved in round k-1, so one sweep labels the whole
+    reachable network.
+
+    Args:
+        network: Compiled transit network
+        sources: Stop ids where the journey may start
+        max_transfers: Maximum number of transfers (rounds - 1)
+        stop_cost: Cost of riding one stop further
+        transfer_cost: Cost added each time a later bus is boarded
+        max_cost: Stops costing more than this are left out
+
+    Returns:
+        Stop id -> dict with cost, transfers and legs (as in raptor_search),
+        for every reachable stop other than the sources. Equal costs go to
+        the journey with fewer transfers.
+    """
+    source_list = list(dict.fromkeys(sources))
+    if not source_list:
+        return {}
+
+    route_stops = network.route_stops
+    stop_routes = network.stop_routes
+
+    best = [INFINITY] * network.num_stops
+    previous = [INFINITY] * network.num_stops
+    for stop in source_list:
+        best[stop] = 0
+        previous[stop] = 0
+    marked = source_list
+
+    parents: List[Dict[int, Leg]] = [{}]
+    best_round: Dict[int, int] = {}
+
+    for round_num in range(1, max_transfers + 2):
+        queue: Dict[int, List[int]] = {}
+        for stop in marked:
+            for route_idx, position in stop_routes[stop]:
+                span = queue.get(route_idx)
+                if span is None:
+                    queue[route_idx] = [position, position]
+                elif position < span[0]:
+                    span[0] = position
+                elif position > span[1]:
+                    span[1] = position
+
+        boarding_cost = transfer_cost if round_num > 1 else 0
+        current: Dict[int, float] = {}
+        round_parents: Dict[int, Leg] = {}
+
+        for route_idx, (board_pos, last_marked) in queue.items():
+            sequence = route_stops[route_idx]
+            # Cost at the boarding stop, less the cost of riding to its position
+            board_value = previous[sequence[board_pos]] + boarding_cost - board_pos * stop_cost
+
+            for position, stop in enumerate(islice(sequence, board_pos + 1, None), board_pos + 1):
+                arrival = board_value + position * stop_cost
+
+                if arrival <= max_cost:
+                    if arrival < best[stop]:
+                        best[stop] = arrival
+                        current[stop] = arrival
+                        round_parents[stop] = (route_idx, sequence[board_pos], stop, board_pos, position)
+                elif position > last_marked:
+                    # Costs only grow from here and no cheaper boarding remains
+                    break
+
+                label = previous[stop]
+                if label < INFINITY and label + boarding_cost - position * stop_cost < board_value:
+                    board_value = label + boarding_cost - position * stop_cost
+                    board_pos = position
+
+        parents.append(round_parents)
+        for stop in round_parents:
+            best_round[stop] = round_num
+        if not current:
+            break
+
+        for stop in marked:
+            previous[stop] = INFINITY
+        marked = list(current)
+        for stop in marked:
+            previous[stop] = current[stop]
+
+    reached = {}
+    for stop, rides in best_round.items():
+        legs = _reconstruct(parents, rides, parents[rides][stop])
+        if legs is not None:
+            reached[stop] = {'cost': best[stop], 'transfers': rides - 1, 'legs': legs}
+    return reached
@@ -0,0 +1,69 @@
+"""
+Reachability (isochrone) service
+Every stop reachable from a stop within a transfer and travel-time budget
+"""
+from typing import Dict, Optional
+
+from ..data import get_dataset
+from ..data.timetable import MINUTES_PER_STOP
+from .planner import TRANSFER_PENALTY_MINUTES
+from .raptor import raptor_reach, INFINITY
+
+
+def find_reachable_stops(
+    stop_name: str,
+    max_transfers: int = 1,
+    max_minutes: Optional[int] = None
+) -> Dict:
+    """
+    Stops reachable from a stop, each with its quickest route chain
+
+    Travel time is estimated as in plan_journey: minutes per stop travelled
+    plus a penalty per transfer. All stops are labelled in one round-based
+    sweep over the compiled network.
+
+    Args:
+        stop_name: Starting stop name
+        max_transfers: Maximum number of transfers
+        max_minutes: Leave out stops further than this many estimated minutes
+
+    Returns:
+        Dict with the matched origin stops and the reachable stops, quickest
+        first, each with estimated_time_minutes, transfers and legs
+    """
+    dataset = get_dataset()
+    network = dataset.network
+    sources = network.ids_for(dataset.stop_index.match(stop_name))
+
+    reached = raptor_reach(
+        network,
+        sources,
+        max_transfers=max_transfers,
+        stop_cost=MINUTES_PER_STOP,
+        transfer_cost=TRANSFER_PENALTY_MINUTES,
+        max_cost=INFINITY if max_minutes is None else max_minutes
+    )
+
+    stops = []
+    for stop, journey in sorted(reached.items(), key=lambda item: (item[1]['cost'], item[1]['transfers'])):
+        legs = []
+        for route_idx, board_stop, alight_stop, board_pos, alight_pos in journey['legs']:
+            route_num = network.route_keys[route_idx]
+            route_stops = dataset.routes[route_num]['stops']
+            legs.append({
+                'route_number': route_num,
+                'from': route_stops[board_pos],
+                'to': route_stops[alight_pos],
+                'stops_count': alight_pos - board_pos + 1
+            })
+        stops.append({
+            'stop': network.stop_names[stop],
+            'estimated_time_minutes': journey['cost'],
+            'transfers': journey['transfers'],
+            'legs': legs
+        })
+
+    return {
+        'origin_stops': [network.stop_names[stop] for stop in dict.fromkeys(sources)],
+        'reachable_stops': stops
+    }
@@ -1,5 +1,13 @@
 """Utility functions for Mo Bus MCP Server"""
 
-from .distance import calculate_distance
+from .distance import (
+    calculate_distance,
+    distances_from,
+    distance_matrix
+)
 
-__all__ = ['calculate_distance']
+__all__ = [
+    'calculate_distance',
+    'distances_from',
+    'distance_matrix'
+]
@@ -1,26 +1,133 @@
-"""Distance calculation utilities"""
+"""
+Distance calculation utilities
+Scalar, one-to-many and many-to-many haversine distances
+
+The batch functions use NumPy when it is installed (the "fast" extra) and
+fall back to plain Python otherwise; both paths share the same formula.
+"""
 from math import radians, sin, cos, sqrt, atan2
+from typing import Dict, Hashable, List, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371
+
+# Below this many pairs the NumPy call overhead outweighs the vectorization
+NUMPY_MIN_BATCH = 16
+
+_numpy_module = None
+_numpy_checked = False
+
+
+def _numpy():
+    """NumPy, imported on first batch use rather than at startup, or None"""
+    global _numpy_module, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = None
+        _numpy_checked = True
+    return _numpy_module
+
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate distance between two coordinates using Haversine formula
-    
+
     Args:
         lat1: Latitude of first point
         lon1: Longitude of first point
         lat2: Latitude of second point
         lon2: Longitude of second point
-    
+
     Returns:
         Distance in kilometers
     """
-    R = 6371  # Earth radius in km
-    
     lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    return _haversine(lat1, lon1, cos(lat1), lat2, lon2, cos(lat2))
+
+
+def _haversine(lat1: float, lon1: float, cos_lat1: float, lat2: float, lon2: float, cos_lat2: float) -> float:
+    """Haversine on coordinates already in radians"""
     dlat = lat2 - lat1
     dlon = lon2 - lon1
-    
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+
+    a = sin(dlat/2)**2 + cos_lat1 * cos_lat2 * sin(dlon/2)**2
     c = 2 * atan2(sqrt(a), sqrt(1-a))
-    
-    return R * c
+
+    return EARTH_RADIUS_KM * c
+
+
+def _haversine_array(np, lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    """Haversine over broadcastable NumPy arrays in radians"""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * np.sin((lon2 - lon1) / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def distances_from(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> List[float]:
+    """
+    Distances from one point to many
+
+    Args:
+        lat: Latitude of the origin
+        lon: Longitude of the origin
+        lats: Latitudes of the destinations
+        lons: Longitudes of the destinations (same length as lats)
+
+    Returns:
+        Distances in kilometers, in destination order
+    """
+    np = _numpy() if len(lats) >= NUMPY_MIN_BATCH else None
+    if np is not None:
+        lat_rad = np.radians(np.asarray(lats, dtype=float))
+        lon_rad = np.radians(np.asarray(lons, dtype=float))
+        origin_lat, origin_lon = radians(lat), radians(lon)
+        return _haversine_array(
+            np, origin_lat, origin_lon, cos(origin_lat), lat_rad, lon_rad, np.cos(lat_rad)
+        ).tolist()
+
+    origin_lat, origin_lon = radians(lat), radians(lon)
+    cos_origin = cos(origin_lat)
+    distances = []
+    for p_lat, p_lon in zip(lats, lons):
+        p_lat, p_lon = radians(p_lat), radians(p_lon)
+        distances.append(_haversine(origin_lat, origin_lon, cos_origin, p_lat, p_lon, cos(p_lat)))
+    return distances
+
+
+def distance_matrix(
+    lats1: Sequence[float],
+    lons1: Sequence[float],
+    lats2: Sequence[float],
+    lons2: Sequence[float]
+) -> List[List[float]]:
+    """
+    Distances between every point of one set and every point of another
+
+    Returns:
+        One row per point of the first set, one column per point of the
+        second, in kilometers
+    """
+    np = _numpy() if len(lats1) * len(lats2) >= NUMPY_MIN_BATCH else None
+    if np is not None:
+        lat1 = np.radians(np.asarray(lats1, dtype=float))[:, None]
+        lon1 = np.radians(np.asarray(lons1, dtype=float))[:, None]
+        lat2 = np.radians(np.asarray(lats2, dtype=float))[None, :]
+        lon2 = np.radians(np.asarray(lons2, dtype=float))[None, :]
+        return _haversine_array(np, lat1, lon1, np.cos(lat1), lat2, lon2, np.cos(lat2)).tolist()
+
+    return [distances_from(lat, lon, lats2, lons2) for lat, lon in zip(lats1, lons1)]
+
+
+def stop_points(stops: Dict) -> List[Tuple[Hashable, float, float]]:
+    """(stop_id, lat, lon) for the stops that carry usable coordinates"""
+    points = []
+    for stop_id, stop_info in stops.items():
+        coords = stop_info.get('coordinates')
+        if not coords:
+            continue
+        lat, lon = coords.get('lat'), coords.get('lon')
+        if not lat or not lon:
+            continue
+        points.append((stop_id, lat, lon))
+    return points
@@ -0,0 +1,172 @@
+"""
+Logging pipeline for Mo Bus MCP Server
+Log records are queued and written by a background thread, so formatting
+and terminal I/O stay off the request path, and the per-call chatter of
+tools can be sampled
+
+LOG_LEVEL: DEBUG, INFO (default), WARNING or ERROR
+MOBUS_LOG_PAYLOADS: '1' to log request payloads (default off)
+MOBUS_LOG_PAYLOAD_LENGTH: characters of each payload kept (default 2000)
+MOBUS_LOG_SAMPLE_RATE: fraction of calls, 0-1, whose debug and info
+    records are written (default 1); warnings and errors always are
+"""
+import atexit
+import logging
+import os
+import queue
+import random
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List, Optional
+
+from .metrics import METRICS
+
+logger = logging.getLogger("Mo.Bus.Server")
+
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+# Records waiting for the writer thread; beyond this they are dropped, not waited on
+QUEUE_SIZE = 10000
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_level() -> str:
+    value = os.getenv('LOG_LEVEL', 'INFO').strip().upper()
+    if value not in LOG_LEVELS:
+        logger.warning(f"Ignoring LOG_LEVEL={value!r}; expected one of {', '.join(LOG_LEVELS)}")
+        return 'INFO'
+    return value
+
+
+def _env_rate() -> float:
+    try:
+        return min(max(float(os.getenv('MOBUS_LOG_SAMPLE_RATE', '1')), 0.0), 1.0)
+    except ValueError:
+        logger.warning("Ignoring MOBUS_LOG_SAMPLE_RATE; expected a number from 0 to 1")
+        return 1.0
+
+
+LOG_LEVEL = _env_level()
+LOG_PAYLOADS = _env_flag('MOBUS_LOG_PAYLOADS')
+LOG_PAYLOAD_LENGTH = int(os.getenv('MOBUS_LOG_PAYLOAD_LENGTH', '2000'))
+SAMPLE_RATE = _env_rate()
+
+METRICS.describe('mobus_log_records_dropped_total', 'Log records dropped because the log queue was full')
+METRICS.describe('mobus_log_calls_sampled_total', 'Calls by whether their debug and info records were kept')
+
+# ================== SAMPLING ==================
+
+# Whether the current request's debug and info records are kept; code
+# outside a request (startup, reloads) is always logged
+_sampled: ContextVar[bool] = ContextVar('mobus_log_sampled', default=True)
+
+
+def start_call():
+    """Decide whether the current request is sampled; returns a token for end_call"""
+    sampled = SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+    METRICS.increment('mobus_log_calls_sampled_total', sampled='yes' if sampled else 'no')
+    return _sampled.set(sampled)
+
+
+def end_call(token):
+    _sampled.reset(token)
+
+
+def is_sampled() -> bool:
+    """True when the current call's debug and info output should be produced"""
+    return _sampled.get()
+
+
+class SamplingFilter(logging.Filter):
+    """Drops records below WARNING that belong to an unsampled call"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+# ================== QUEUED OUTPUT ==================
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the writer thread
+
+    The standard QueueHandler formats each record before queueing it. Here
+    the message, its arguments and any traceback go on the queue as they
+    are, so arguments must not be mutated after they are logged. A full
+    queue drops the record instead of blocking.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            METRICS.increment('mobus_log_records_dropped_total')
+
+
+_listener: Optional[QueueListener] = None
+
+
+def install(loggers: List[logging.Logger], level: str = LOG_LEVEL) -> QueueListener:
+    """
+    Move the handlers of the given loggers behind one queue and writer thread
+
+    Each logger keeps its level and gets a single DeferredQueueHandler with
+    a SamplingFilter; its previous handlers (or, for loggers without any,
+    stderr) do the writing on the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    records: queue.Queue = queue.Queue(QUEUE_SIZE)
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(SamplingFilter())
+
+    writers: List[logging.Handler] = []
+    for target in loggers:
+        writers.extend(h for h in target.handlers if h not in writers)
+    if not writers:
+        writers.append(logging.StreamHandler())
+
+    for target in loggers:
+        target.handlers = [handler]
+        target.setLevel(level)
+        target.propagate = False
+
+    _listener = QueueListener(records, *writers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+    return _listener
+
+
+def shutdown():
+    """Write out queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# ================== REQUEST LOGGING ==================
+
+class TruncatedPayload:
+    """A request payload, serialized and truncated only when the record is written"""
+
+    __slots__ = ('message', 'max_length')
+
+    def __init__(self, message: Any, max_length: int):
+        self.message = message
+        self.max_length = max_length
+
+    def __str__(self) -> str:
+        from fastmcp.server.middleware.logging import default_serializer
+        text = default_serializer(self.message)
+        if self.max_length and len(text) > self.max_length:
+            text = text[:self.max_length] + '...'
+        return text
@@ -0,0 +1,85 @@
+"""
+Bounded LRU cache for results derived from one dataset version
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# Returned by get() on a miss, since None is a valid cached value
+MISSING = object()
+
+
+class VersionedLRUCache:
+    """
+    Least-recently-used cache whose entries belong to a dataset version
+
+    A lookup or store with a different version than the cached entries
+    empties the cache first, so results computed from an older dataset are
+    never served after a reload. A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: str):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+    def get(self, version: str, key: Hashable) -> Any:
+        """The cached value, or MISSING"""
+        if not self.maxsize:
+            return MISSING
+        with self._lock:
+            self._check_version(version)
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, version: str, key: Hashable, value: Any):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """Hit/miss figures, in the same shape as metrics.cache_stats"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,228 @@
+"""
+In-process metrics for Mo Bus MCP Server
+Counters and latency histograms, readable as JSON or Prometheus text
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+# Histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate, interpolating linearly within the bucket that holds it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50_ms': round(self.quantile(0.50), 3),
+            'p95_ms': round(self.quantile(0.95), 3),
+            'p99_ms': round(self.quantile(0.99), 3),
+            'max_ms': round(self.max, 3)
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters and histograms
+
+    Collectors are callables returning {name: {field: number}}, read when
+    metrics are exported; they report state kept elsewhere, such as cache
+    statistics, without the owner pushing updates. Several collectors may
+    share a group, and their entries are merged.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: Dict[str, List[Callable[[], Dict[str, Dict]]]] = {}
+        self.started = time.time()
+
+    def describe(self, name: str, text: str):
+        """Help text for a metric, shown in the Prometheus output"""
+        self._help[name] = text
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value_ms: float, **labels):
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value_ms)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of a block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000, **labels)
+
+    def add_collector(self, group: str, collector: Callable[[], Dict[str, Dict]]):
+        self._collectors.setdefault(group, []).append(collector)
+
+    def _collect(self) -> Dict[str, Dict[str, Dict]]:
+        collected = {}
+        for group, collectors in list(self._collectors.items()):
+            entries = collected.setdefault(group, {})
+            for collector in collectors:
+                try:
+                    entries.update(collector())
+                except Exception as e:
+                    entries[f"{getattr(collector, '__name__', 'collector')}_error"] = {'message': str(e)}
+        return collected
+
+    def snapshot(self) -> Dict:
+        """Everything as nested dicts, for the metrics resource"""
+        with self._lock:
+            counters = {
+                name: {_label_text(key) or 'total': value for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {_label_text(key) or 'all': histogram.summary() for key, histogram in series.items()}
+                for name, series in self._histograms.items()
+            }
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'counters': counters,
+            'latency': histograms,
+            **self._collect()
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+
+        def header(name: str, kind: str):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                header(name, 'counter')
+                for key, value in series.items():
+                    lines.append(f"{name}{_prometheus_labels(key)} {_number(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                header(name, 'histogram')
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        le = bound if bound == '+Inf' else _number(bound)
+                        lines.append(f"{name}_bucket{_prometheus_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_prometheus_labels(key)} {_number(histogram.total)}")
+                    lines.append(f"{name}_count{_prometheus_labels(key)} {histogram.count}")
+
+        # Collector fields become gauges: mobus_<collector>_<field>{name="..."}
+        for collector, entries in sorted(self._collect().items()):
+            fields = sorted({field for values in entries.values() for field, value in values.items()
+                             if isinstance(value, (int, float))})
+            for field in fields:
+                name = f"mobus_{collector}_{field}"
+                header(name, 'gauge')
+                for entry, values in entries.items():
+                    if isinstance(values.get(field), (int, float)):
+                        lines.append(f"{name}{_prometheus_labels((('name', entry),))} {_number(values[field])}")
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+
+def _label_text(key: Labels) -> str:
+    return ','.join(f"{k}={v}" for k, v in key)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _prometheus_labels(key: Labels) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in key) + '}'
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def cache_stats(cached_function) -> Dict:
+    """Hit/miss figures of a functools.lru_cache wrapper"""
+    info = cached_function.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'hit_ratio': round(info.hits / lookups, 4) if lookups else 0.0
+    }
+
+
+# Shared registry for the whole server
+METRICS = MetricsRegistry()
+
+METRICS.describe('mobus_tool_calls_total', 'MCP tool calls')
+METRICS.describe('mobus_tool_errors_total', 'MCP tool calls that raised or returned an error')
+METRICS.describe('mobus_tool_latency_ms', 'MCP tool call latency in milliseconds')
+METRICS.describe('mobus_resource_reads_total', 'MCP resource reads')
+METRICS.describe('mobus_resource_errors_total', 'MCP resource reads that failed')
+METRICS.describe('mobus_resource_latency_ms', 'MCP resource read latency in milliseconds')
+METRICS.describe('mobus_geocode_lookups_total', 'Geocoding lookups by the tier that answered')
+METRICS.describe('mobus_geocode_coalesced_total', 'Geocoding lookups answered by an identical lookup already in flight')
+METRICS.describe('mobus_geocode_provider_requests_total', 'Geocoding provider requests by outcome')
+METRICS.describe('mobus_geocode_provider_latency_ms', 'Geocoding provider latency in milliseconds')
@@ -0,0 +1,83 @@
+"""
+Token-bucket rate limiting shared by threads and event loops
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Requests per second with a burst allowance
+
+    Callers reserve a token under a short lock and then wait outside it, so
+    one caller's wait never holds up another's reservation. Reservations
+    past the available tokens queue up in order. The same bucket can be used
+    from plain threads (acquire) and from coroutines (acquire_async). A rate
+    of 0 or less disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token, returning the seconds to wait before using it"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self):
+        """Give back a token that was reserved but not used"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def acquire(self):
+        """Wait for a token, sleeping only the calling thread"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Wait for a token without blocking the event loop"""
+        wait = self.reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+
+
+# Requests per second allowed for each geocoding provider. Nominatim's usage
+# policy allows at most one per second per application
+PROVIDER_RATES = {
+    'serpapi': float(os.getenv('MOBUS_SERPAPI_RATE', '1')),
+    'osm': float(os.getenv('MOBUS_OSM_RATE', '1'))
+}
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+def provider_bucket(provider: str) -> TokenBucket:
+    """The process-wide bucket of a provider, shared by the sync and async geocoders"""
+    bucket = _buckets.get(provider)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(provider)
+            if bucket is None:
+                rate = PROVIDER_RATES.get(provider, 1.0)
+                bucket = _buckets[provider] = TokenBucket(rate, capacity=rate)
+    return bucket
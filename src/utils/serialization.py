@@ -0,0 +1,80 @@
+"""
+JSON serialization for tool and resource responses
+Uses orjson when it is installed and the standard library otherwise
+
+MOBUS_JSON_MODE: 'pretty' (default, 2-space indent) or 'compact'
+MOBUS_JSON_BACKEND: 'auto' (default, orjson when installed), 'orjson' or 'json'
+"""
+import json
+import logging
+import os
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("Mo.Bus.Server")
+
+JSON_MODES = ('pretty', 'compact')
+JSON_BACKENDS = ('auto', 'orjson', 'json')
+
+
+def _env_choice(name: str, choices, default: str) -> str:
+    value = os.getenv(name, default).strip().lower()
+    if value not in choices:
+        logger.warning(f"Ignoring {name}={value!r}; expected one of {', '.join(choices)}")
+        return default
+    return value
+
+
+def _resolve_backend(requested: str) -> str:
+    if requested == 'json':
+        return 'json'
+    if orjson is None:
+        if requested == 'orjson':
+            logger.warning("MOBUS_JSON_BACKEND=orjson but orjson is not installed; using json")
+        return 'json'
+    return 'orjson'
+
+
+JSON_MODE = _env_choice('MOBUS_JSON_MODE', JSON_MODES, 'pretty')
+JSON_BACKEND = _resolve_backend(_env_choice('MOBUS_JSON_BACKEND', JSON_BACKENDS, 'auto'))
+
+
+def dumps_json(data: Any, compact: bool = False) -> str:
+    """Standard library serializer, used directly or as the orjson fallback"""
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def dumps_orjson(data: Any, compact: bool = False) -> str:
+    """orjson serializer; same output shape as dumps_json"""
+    option = orjson.OPT_NON_STR_KEYS
+    if not compact:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option).decode('utf-8')
+
+
+def dumps(data: Any, compact: Optional[bool] = None) -> str:
+    """
+    Serialize a response to JSON text
+
+    Args:
+        data: JSON-compatible value
+        compact: Force compact (True) or indented (False) output; None
+            follows MOBUS_JSON_MODE
+
+    Non-ASCII text is kept as is. Values orjson cannot encode (such as
+    integers beyond 64 bits) fall back to the standard library.
+    """
+    if compact is None:
+        compact = JSON_MODE == 'compact'
+    if JSON_BACKEND == 'orjson':
+        try:
+            return dumps_orjson(data, compact)
+        except TypeError:
+            pass
+    return dumps_json(data, compact)
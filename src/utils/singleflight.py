@@ -0,0 +1,110 @@
+"""
+Single-flight call coalescing: concurrent calls with the same key share one execution
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ('running', 'result', 'error')
+
+    def __init__(self):
+        # Held by the leader until the result is set; a plain lock is much
+        # cheaper to create than an Event, and most calls are never shared
+        self.running = threading.Lock()
+        self.running.acquire()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces calls made from several threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn, or wait for the identical call already running
+
+        Returns:
+            (result, shared): shared is True when another caller's run was
+            used. Its exception is raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            with call.running:
+                pass
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.running.release()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces coroutine calls on one event loop
+
+    The shared call runs as its own task. Each caller waits on it with its
+    own timeout; the task is cancelled once every caller has given up.
+    """
+
+    def __init__(self):
+        # key -> [loop, task, waiting callers]
+        self._calls: Dict[Hashable, list] = {}
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Await fn(), or the identical call already running on this loop
+
+        Returns:
+            (result, shared), as for SingleFlight.do
+
+        Raises:
+            asyncio.TimeoutError: If the result is not ready within timeout
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._calls.get(key)
+        shared = entry is not None and entry[0] is loop and not entry[1].done()
+        if not shared:
+            entry = [loop, loop.create_task(fn()), 0]
+            self._calls[key] = entry
+            entry[1].add_done_callback(lambda task: self._forget(key, entry))
+
+        entry[2] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(entry[1]), timeout)
+        finally:
+            entry[2] -= 1
+            if entry[2] == 0 and not entry[1].done():
+                entry[1].cancel()
+        return result, shared
+
+    def _forget(self, key: Hashable, entry: list):
+        if self._calls.get(key) is entry:
+            del self._calls[key]
+        # Retrieve the outcome so an abandoned task's error is not reported as unhandled
+        if not entry[1].cancelled():
+            entry[1].exception()
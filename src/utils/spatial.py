@@ -0,0 +1,107 @@
+"""Grid-bucket spatial index for radius and k-nearest stop queries"""
+from math import cos, floor, radians
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .distance import distances_from, stop_points
+
+KM_PER_DEGREE_LAT = 111.195  # 6371 km * pi / 180
+DEFAULT_CELL_DEGREES = 0.02  # ~2.2 km, the default nearest-stop search radius
+
+
+class SpatialIndex:
+    """
+    Points bucketed into fixed lat/lon cells
+
+    Queries only visit cells overlapping the search box, so cost grows with
+    the number of nearby points rather than the size of the network.
+    """
+
+    def __init__(
+        self,
+        points: Iterable[Tuple[Hashable, float, float]],
+        cell_degrees: float = DEFAULT_CELL_DEGREES
+    ):
+        self.cell_degrees = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[Tuple[int, Hashable, float, float]]] = {}
+        self.size = 0
+
+        for ordinal, (key, lat, lon) in enumerate(points):
+            cell = self._cell(lat, lon)
+            self.cells.setdefault(cell, []).append((ordinal, key, lat, lon))
+            self.size += 1
+
+    @classmethod
+    def from_stops(cls, stops: Dict, cell_degrees: float = DEFAULT_CELL_DEGREES) -> 'SpatialIndex':
+        """Index the stops that carry usable coordinates, keyed by stop id"""
+        return cls(stop_points(stops), cell_degrees)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (floor(lat / self.cell_degrees), floor(lon / self.cell_degrees))
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Hashable, float, float]]:
+        """
+        Points that may lie within radius_km, in insertion order
+
+        A superset of the exact answer: everything in the cells overlapping
+        the bounding box of the search circle.
+        """
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        # Longitude degrees shrink towards the poles; size the box for the widest row
+        max_abs_lat = min(abs(lat) + lat_span, 89.9)
+        lon_span = radius_km / (KM_PER_DEGREE_LAT * cos(radians(max_abs_lat))) * 1.01
+
+        lat_lo, lon_lo = self._cell(lat - lat_span, lon - lon_span)
+        lat_hi, lon_hi = self._cell(lat + lat_span, lon + lon_span)
+
+        found = []
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > len(self.cells):
+            # Huge radius: walking the occupied cells is cheaper than the box
+            for (i, j), bucket in self.cells.items():
+                if lat_lo <= i <= lat_hi and lon_lo <= j <= lon_hi:
+                    found.extend(bucket)
+        else:
+            for i in range(lat_lo, lat_hi + 1):
+                for j in range(lon_lo, lon_hi + 1):
+                    found.extend(self.cells.get((i, j), ()))
+
+        found.sort()
+        return [(key, p_lat, p_lon) for _, key, p_lat, p_lon in found]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """Points within radius_km as (key, distance_km), nearest first"""
+        candidates = self.candidates(lat, lon, radius_km)
+        distances = distances_from(
+            lat, lon, [p_lat for _, p_lat, _ in candidates], [p_lon for _, _, p_lon in candidates]
+        )
+        results = [
+            (key, distance_km)
+            for (key, _, _), distance_km in zip(candidates, distances)
+            if distance_km <= radius_km
+        ]
+        results.sort(key=lambda item: item[1])
+        return results
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        k: int,
+        max_distance_km: Optional[float] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        The k nearest points as (key, distance_km), nearest first
+
+        Doubles the search radius until k points are inside it; anything
+        outside the radius is farther than everything returned.
+        """
+        if k <= 0 or self.size == 0:
+            return []
+
+        radius_km = self.cell_degrees * KM_PER_DEGREE_LAT
+        limit = max_distance_km if max_distance_km is not None else 20037.5  # half the equator
+        while True:
+            radius_km = min(radius_km, limit)
+            results = self.within(lat, lon, radius_km)
+            if len(results) >= k or radius_km >= limit:
+                return results[:k]
+            radius_km *= 2
@@ -0,0 +1,75 @@
+"""
+Cold-start profiling
+Records how long each startup phase takes and how many modules it imports
+
+Enable with MOBUS_PROFILE_STARTUP=1 or the --profile-startup flag.
+The report goes to stderr, which stays clear of the stdio MCP stream, once
+the first tool call or resource read has been answered.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+# Offsets are measured from the first import of this module
+_STARTED = time.perf_counter()
+
+ENABLED = (
+    os.getenv('MOBUS_PROFILE_STARTUP', '').strip().lower() in ('1', 'true', 'yes', 'on')
+    or '--profile-startup' in sys.argv
+)
+
+# (phase, offset_ms, duration_ms, modules_imported)
+_phases: List[Tuple[str, float, Optional[float], int]] = []
+_reported = False
+
+
+def elapsed_ms() -> float:
+    """Milliseconds since profiling started"""
+    return (time.perf_counter() - _STARTED) * 1000
+
+
+@contextmanager
+def phase(name: str):
+    """Time a block of startup work; free when profiling is off"""
+    if not ENABLED:
+        yield
+        return
+
+    modules_before = len(sys.modules)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        _phases.append((name, (started - _STARTED) * 1000, duration, len(sys.modules) - modules_before))
+
+
+def mark(name: str):
+    """Record a point in time, such as the first request arriving"""
+    if ENABLED:
+        _phases.append((name, elapsed_ms(), None, 0))
+
+
+def report() -> str:
+    """Phases in start order, as a table"""
+    lines = [f"Startup profile ({len(sys.modules)} modules loaded)"]
+    lines.append(f"{'at ms':>9}  {'took ms':>9}  {'modules':>7}  phase")
+    for name, offset, duration, modules in sorted(_phases, key=lambda item: item[1]):
+        took = f"{duration:9.1f}" if duration is not None else f"{'':>9}"
+        lines.append(f"{offset:9.1f}  {took}  {modules:7d}  {name}")
+    return '\n'.join(lines)
+
+
+def is_reported() -> bool:
+    """Whether the report has already been printed"""
+    return _reported
+
+
+def report_once():
+    """Print the report to stderr the first time this is called"""
+    global _reported
+    if ENABLED and not _reported:
+        _reported = True
+        print(report(), file=sys.stderr, flush=True)
@@ -0,0 +1,23 @@
+"""
+Tests for short queries in the fuzzy name index
+"""
+from src.data.fuzzy import FuzzyNameIndex, PREFIX_SCORE
+
+
+NAMES = ['AG Square', 'Agrahat', 'Jagamara', 'Nayapalli', 'Rasulgarh']
+
+
+def test_short_query_matches_name_starts_only():
+    index = FuzzyNameIndex(NAMES)
+
+    matches = [name for name, score in index.search('ag')]
+    assert sorted(matches) == ['AG Square', 'Agrahat']
+    assert all(score >= PREFIX_SCORE for _, score in index.search('ag'))
+
+
+def test_short_query_has_no_fuzzy_suggestions():
+    index = FuzzyNameIndex(NAMES)
+
+    assert index.search('qz') == ()
+    assert index.search('q') == ()
+    assert index.resolve('qz') == ()
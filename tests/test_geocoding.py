@@ -0,0 +1,89 @@
+"""
+Tests for provider failures versus empty answers in the geocoders
+"""
+import asyncio
+
+import httpx
+import pytest
+import requests
+
+from src.services.async_geocoding import AsyncMultiSourceGeocoder
+from src.services.geocache import GeocodeCache, NOT_FOUND
+from src.services.geocoding import MultiSourceGeocoder
+from src.utils.ratelimit import TokenBucket
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+class _Client:
+    """Stands in for the async geocoder's httpx client"""
+
+    def __init__(self, payload=None, error=None):
+        self.payload = payload
+        self.error = error
+
+    async def get(self, url, **kwargs):
+        if self.error is not None:
+            raise self.error
+        return _Response(self.payload)
+
+
+@pytest.fixture
+def geocoder():
+    geocoder = MultiSourceGeocoder(cache=GeocodeCache(':memory:'))
+    geocoder.serpapi_key = None
+    # No waiting between the requests of a test
+    geocoder.osm_limiter = TokenBucket(0)
+    return geocoder
+
+
+def test_provider_error_is_not_cached(geocoder, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise requests.ConnectionError('network is unreachable')
+    monkeypatch.setattr(geocoder.session, 'get', unreachable)
+
+    assert geocoder.geocode('Nowhere In Particular') is None
+    assert geocoder.cache.get('Nowhere In Particular', 'Bhubaneswar') is None
+
+    # The next lookup asks again and can succeed
+    place = {'lat': '20.3', 'lon': '85.8', 'display_name': 'Nowhere In Particular'}
+    monkeypatch.setattr(geocoder.session, 'get', lambda *args, **kwargs: _Response([place]))
+    assert geocoder.geocode('Nowhere In Particular')['source'] == 'openstreetmap'
+
+
+def test_empty_answer_is_cached_as_not_found(geocoder, monkeypatch):
+    monkeypatch.setattr(geocoder.session, 'get', lambda *args, **kwargs: _Response([]))
+
+    assert geocoder.geocode('Nowhere In Particular') is None
+    assert geocoder.cache.get('Nowhere In Particular', 'Bhubaneswar') is NOT_FOUND
+
+
+@pytest.fixture
+def async_geocoder():
+    geocoder = AsyncMultiSourceGeocoder(cache=GeocodeCache(':memory:'))
+    geocoder.serpapi_key = None
+    geocoder.osm_limiter = TokenBucket(0)
+    return geocoder
+
+
+def test_async_provider_error_is_not_cached(async_geocoder):
+    async_geocoder._get_client = lambda: _Client(error=httpx.ConnectError('network is unreachable'))
+
+    assert asyncio.run(async_geocoder.geocode('Nowhere In Particular')) is None
+    assert async_geocoder.cache.get('Nowhere In Particular', 'Bhubaneswar') is None
+
+
+def test_async_empty_answer_is_cached_as_not_found(async_geocoder):
+    async_geocoder._get_client = lambda: _Client(payload=[])
+
+    assert asyncio.run(async_geocoder.geocode('Nowhere In Particular')) is None
+    assert async_geocoder.cache.get('Nowhere In Particular', 'Bhubaneswar') is NOT_FOUND
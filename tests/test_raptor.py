@@ -0,0 +1,58 @@
+"""
+Tests for the round-based journey search
+"""
+from src.data.index import normalize_stop_name
+from src.data.network import TransitNetwork
+from src.services.raptor import raptor_search
+
+
+ROUTES = {
+    '1': {'stops': ['A', 'B', 'C', 'D']},
+    '2': {'stops': ['C', 'E', 'F']},
+    '3': {'stops': ['F', 'G']},
+    # Direct to G, but four stops longer than changing twice
+    '4': {'stops': ['A', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'G']}
+}
+
+
+def _ids(network, *names):
+    return network.ids_for(normalize_stop_name(name) for name in names)
+
+
+def _routes(network, journey):
+    return [network.route_keys[leg[0]] for leg in journey['legs']]
+
+
+def test_journeys_are_found_across_several_transfers():
+    network = TransitNetwork(ROUTES)
+
+    journeys = raptor_search(network, _ids(network, 'A'), _ids(network, 'G'), max_transfers=2)
+
+    assert {(journey['transfers'], journey['stops_travelled']) for journey in journeys} == {(0, 9), (2, 5)}
+    changing = next(journey for journey in journeys if journey['transfers'] == 2)
+    assert _routes(network, changing) == ['1', '2', '3']
+
+
+def test_max_transfers_bounds_the_search():
+    network = TransitNetwork(ROUTES)
+
+    journeys = raptor_search(network, _ids(network, 'A'), _ids(network, 'G'), max_transfers=1)
+
+    assert [(journey['transfers'], _routes(network, journey)) for journey in journeys] == [(0, ['4'])]
+    assert raptor_search(network, _ids(network, 'B'), _ids(network, 'G'), max_transfers=1) == []
+
+
+def test_dominated_journeys_are_dropped():
+    routes = {**ROUTES, '4': {'stops': ['A', 'P', 'Q', 'G']}}
+    network = TransitNetwork(routes)
+
+    journeys = raptor_search(network, _ids(network, 'A'), _ids(network, 'G'), max_transfers=3)
+
+    # Changing twice is not shorter than riding route 4, so it is not offered
+    assert [_routes(network, journey) for journey in journeys] == [['4']]
+
+
+def test_buses_are_not_ridden_backwards():
+    network = TransitNetwork(ROUTES)
+
+    assert raptor_search(network, _ids(network, 'D'), _ids(network, 'A'), max_transfers=3) == []
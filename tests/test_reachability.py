@@ -0,0 +1,75 @@
+"""
+Tests for reachability from a stop
+"""
+import asyncio
+import json
+
+from fastmcp import Client
+
+from src.data.index import normalize_stop_name
+from src.data.network import TransitNetwork
+from src.server import MAX_REACH_TRANSFERS, mcp
+from src.services.raptor import raptor_reach
+from src.services.reachability import find_reachable_stops
+
+
+ROUTES = {
+    '1': {'stops': ['A', 'B', 'C', 'D']},
+    '2': {'stops': ['C', 'E', 'F']},
+    '3': {'stops': ['F', 'G']},
+    '4': {'stops': ['A', 'P', 'Q', 'R', 'S', 'T', 'U', 'V', 'W', 'G']}
+}
+
+
+def _reach(**kwargs):
+    network = TransitNetwork(ROUTES)
+    sources = network.ids_for([normalize_stop_name('A')])
+    reached = raptor_reach(network, sources, **kwargs)
+    return {network.stop_names[stop]: journey for stop, journey in reached.items()}
+
+
+def test_transfer_bound_is_enforced():
+    direct = _reach(max_transfers=0)
+    assert 'E' not in direct and 'F' not in direct
+    assert direct['G']['transfers'] == 0
+
+    once = _reach(max_transfers=1)
+    assert once['F']['transfers'] == 1
+    assert all(journey['transfers'] <= 1 for journey in once.values())
+
+    # Changing twice reaches G in 5 stops instead of route 4's 9
+    twice = _reach(max_transfers=2)
+    assert (twice['G']['cost'], twice['G']['transfers']) == (5, 2)
+
+
+def test_transfer_cost_and_max_cost():
+    penalised = _reach(max_transfers=2, transfer_cost=3)
+    assert (penalised['G']['cost'], penalised['G']['transfers']) == (9, 0)
+
+    near = _reach(max_transfers=2, max_cost=2)
+    assert sorted(near) == ['B', 'C', 'P', 'Q']
+
+
+def test_max_minutes_bounds_reachable_stops():
+    result = find_reachable_stops('Master Canteen', max_transfers=1, max_minutes=30)
+
+    times = [stop['estimated_time_minutes'] for stop in result['reachable_stops']]
+    assert times and max(times) <= 30
+    assert times == sorted(times)
+    assert all(stop['transfers'] <= 1 for stop in result['reachable_stops'])
+
+    unbounded = find_reachable_stops('Master Canteen', max_transfers=1)
+    assert len(unbounded['reachable_stops']) > len(times)
+
+
+def test_tool_rejects_transfers_out_of_range():
+    async def call(max_transfers):
+        async with Client(mcp) as client:
+            result = await client.call_tool(
+                'get_reachable_stops', {'stop_name': 'Master Canteen', 'max_transfers': max_transfers}
+            )
+            return json.loads(result.content[0].text)
+
+    assert 'error' in asyncio.run(call(MAX_REACH_TRANSFERS + 1))
+    assert 'error' in asyncio.run(call(-1))
+    assert asyncio.run(call(MAX_REACH_TRANSFERS))['max_transfers'] == MAX_REACH_TRANSFERS
@@ -0,0 +1,57 @@
+"""
+Tests for the data resources, read through an MCP client
+"""
+import asyncio
+import json
+
+from fastmcp import Client
+
+from src.data import STOPS_PAGE_SIZE, get_dataset
+from src.data.payloads import get_payload, payload_versions
+from src.server import mcp
+
+
+def _read(uri):
+    async def read():
+        async with Client(mcp) as client:
+            return (await client.read_resource(uri))[0].text
+    return asyncio.run(read())
+
+
+def test_compact_resources_hold_the_same_data():
+    for name, uri in [('routes', 'mobus://routes/all'), ('stops', 'mobus://stops/all')]:
+        pretty = _read(uri)
+        compact = _read(f'{uri}/compact')
+
+        assert json.loads(compact) == json.loads(pretty)
+        assert '\n' not in compact
+        assert len(compact) < len(pretty)
+
+
+def test_both_variants_carry_the_compact_hash():
+    pretty = get_payload('stops', compact=False)
+    compact = get_payload('stops', compact=True)
+
+    assert pretty.sha256 == compact.sha256
+    versions = json.loads(_read('mobus://system/version'))
+    assert versions['resources']['stops'] == payload_versions()['resources']['stops']
+    assert versions['resources']['stops']['compact_bytes'] == compact.size
+
+
+def test_stop_pages_cover_every_stop():
+    total = len(get_dataset().stops)
+    first = json.loads(_read('mobus://stops/page/1'))
+
+    assert first['total_stops'] == total
+    assert len(first['stops']) == min(STOPS_PAGE_SIZE, total)
+
+    last = json.loads(_read(f"mobus://stops/page/{first['total_pages']}"))
+    assert len(last['stops']) == total - (first['total_pages'] - 1) * STOPS_PAGE_SIZE
+
+
+def test_stop_pages_out_of_range_are_errors():
+    total_pages = json.loads(_read('mobus://stops/page/1'))['total_pages']
+
+    for page in (0, total_pages + 1, total_pages + 2):
+        response = json.loads(_read(f'mobus://stops/page/{page}'))
+        assert response == {'error': f'Page {page} is out of range (1-{total_pages})'}
@@ -0,0 +1,76 @@
+"""
+Tests for route distances and the fares priced from them
+"""
+import pytest
+
+from src.data import get_dataset
+from src.data.route_distances import RouteDistances
+from src.services.fares import stop_fare
+from src.utils.distance import calculate_distance
+
+
+def _distances(routes, coordinates):
+    """RouteDistances over routes whose stop ids are their names"""
+    stops = {}
+    for route_data in routes.values():
+        for name in route_data['stops']:
+            stops[name] = {'name': name}
+            if name in coordinates:
+                lat, lon = coordinates[name]
+                stops[name]['coordinates'] = {'lat': lat, 'lon': lon}
+    return RouteDistances(routes, stops, {name: [name] for name in stops})
+
+
+def test_stops_outside_anchors_use_network_spacing():
+    routes = {
+        '1': {'stops': ['A', 'B', 'C', 'D', 'E']},
+        # Sets the network's typical spacing to 2 km per stop
+        '2': {'stops': ['X', 'Y', 'Z'], 'distance_km': 4.0}
+    }
+    distances = _distances(routes, {'C': (20.0, 85.0), 'D': (20.01, 85.0)})
+
+    anchored = calculate_distance(20.0, 85.0, 20.01, 85.0)
+    assert distances.km_per_stop == 2.0
+    assert distances.between('1', 0, 2) == pytest.approx(4.0)
+    assert distances.between('1', 2, 3) == pytest.approx(anchored)
+    assert distances.between('1', 3, 4) == pytest.approx(2.0)
+
+
+def test_stops_outside_anchors_use_route_spacing():
+    routes = {
+        '1': {'stops': ['A', 'B', 'C', 'D'], 'distance_km': 9.0},
+        '2': {'stops': ['X', 'Y', 'Z'], 'distance_km': 2.0}
+    }
+    distances = _distances(routes, {'B': (20.0, 85.0), 'C': (20.01, 85.0)})
+
+    assert distances.km_per_stop == 2.0
+    assert distances.length('1') == pytest.approx(9.0)
+    # Each segment keeps its share of the route's own 3 km per stop
+    anchored = calculate_distance(20.0, 85.0, 20.01, 85.0)
+    scale = 9.0 / (3.0 + anchored + 3.0)
+    assert distances.between('1', 0, 1) == pytest.approx(3.0 * scale)
+
+
+def test_ride_is_never_shorter_than_straight_line():
+    # A published length far shorter than the ground covered
+    routes = {'1': {'stops': ['A', 'B', 'C'], 'distance_km': 1.0}}
+    distances = _distances(routes, {'A': (20.0, 85.0), 'C': (20.1, 85.0)})
+
+    assert distances.between('1', 0, 2) >= calculate_distance(20.0, 85.0, 20.1, 85.0)
+    assert distances.between('1', 2, 0) == distances.between('1', 0, 2)
+
+
+def test_unanchored_route_fare_covers_straight_line():
+    dataset = get_dataset()
+    coordinates = dataset.route_distances.stop_coordinates
+    # Patia's leg of route 16 has no stop coordinates behind it
+    assert coordinates.get('Patia') is None
+
+    fare = stop_fare('Patia', 'Airport')
+
+    straight_line = calculate_distance(
+        *coordinates['Patia Square'],
+        *coordinates['Biju Patnaik International Airport']
+    )
+    assert fare['distance_km'] >= round(straight_line, 2)
+    assert sum(leg['distance_km'] for leg in fare['legs']) == pytest.approx(fare['distance_km'], abs=0.02)
@@ -0,0 +1,63 @@
+"""
+Tests for snapshot freshness checks
+"""
+import json
+
+from src.data import snapshot
+from src.data.dataset import Dataset
+from src.data.snapshot import build_snapshot, read_snapshot, source_digest
+
+
+DATABASE = {
+    'stops': {
+        'S1': {'name': 'Master Canteen', 'city': 'Bhubaneswar'},
+        'S2': {'name': 'Vani Vihar', 'city': 'Bhubaneswar'}
+    },
+    'routes': {'1': {'stops': ['Master Canteen', 'Vani Vihar']}}
+}
+
+
+def _build(tmp_path, database=DATABASE):
+    json_path = tmp_path / 'database.json'
+    json_path.write_text(json.dumps(database))
+    snapshot_path = tmp_path / 'database.snapshot'
+    build_snapshot(json_path, snapshot_path)
+    return json_path, snapshot_path
+
+
+def test_fresh_snapshot_loads(tmp_path):
+    json_path, snapshot_path = _build(tmp_path)
+
+    dataset = read_snapshot(snapshot_path, source_digest(json_path.read_bytes()))
+
+    assert isinstance(dataset, Dataset)
+    assert dataset.source_hash == source_digest(json_path.read_bytes()).hex()
+    assert dataset.stops.keys() == DATABASE['stops'].keys()
+
+
+def test_snapshot_of_another_database_is_stale(tmp_path):
+    json_path, snapshot_path = _build(tmp_path)
+
+    changed = {**DATABASE, 'routes': {'1': {'stops': ['Vani Vihar', 'Master Canteen']}}}
+    json_path.write_text(json.dumps(changed))
+
+    assert read_snapshot(snapshot_path, source_digest(json_path.read_bytes())) is None
+
+
+def test_snapshot_built_by_other_code_is_stale(tmp_path, monkeypatch):
+    json_path, snapshot_path = _build(tmp_path)
+
+    monkeypatch.setattr(snapshot, 'code_fingerprint', lambda: b'\0' * 32)
+
+    assert read_snapshot(snapshot_path, source_digest(json_path.read_bytes())) is None
+
+
+def test_corrupt_snapshot_fails_its_checksum(tmp_path):
+    json_path, snapshot_path = _build(tmp_path)
+
+    data = bytearray(snapshot_path.read_bytes())
+    data[-1] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+
+    assert read_snapshot(snapshot_path, source_digest(json_path.read_bytes())) is None
+    assert read_snapshot(tmp_path / 'missing.snapshot', source_digest(json_path.read_bytes())) is None
@@ -0,0 +1,55 @@
+"""
+Tests for the headway-expanded timetable and the connection scan over it
+"""
+import pytest
+
+from src.data.index import normalize_stop_name
+from src.data.network import TransitNetwork
+from src.data.timetable import Timetable, parse_clock, route_service
+from src.services.connection_scan import connection_scan
+
+
+ROUTES = {
+    '1': {'stops': ['A', 'B', 'C'], 'first_bus': '06:00', 'last_bus': '07:00', 'frequency_minutes': 30},
+    '2': {'stops': ['C', 'D'], 'first_bus': '06:10', 'last_bus': '07:10', 'frequency_minutes': 30}
+}
+
+
+def _scan(departure, start='A', end='D'):
+    network = TransitNetwork(ROUTES)
+    timetable = Timetable(ROUTES, network)
+    sources = network.ids_for([normalize_stop_name(start)])
+    targets = network.ids_for([normalize_stop_name(end)])
+    return network, timetable, connection_scan(timetable, network.num_stops, sources, targets, departure)
+
+
+def test_earliest_arrival_waits_for_each_bus():
+    network, timetable, journey = _scan(parse_clock('06:05'))
+
+    # The 06:30 from A reaches C at 06:36, in time for the 06:40 to D
+    assert journey['arrival'] == parse_clock('06:43')
+    boardings = [timetable.conn_dep[enter] for enter, _ in journey['legs']]
+    assert boardings == [parse_clock('06:30'), parse_clock('06:40')]
+    assert network.stop_names[journey['target']] == 'D'
+
+
+def test_no_journey_after_the_last_bus():
+    _, _, journey = _scan(parse_clock('07:05'))
+
+    assert journey is None
+
+
+def test_route_service_reads_published_and_default_headways():
+    assert route_service({'frequency': '8 trips/day', 'first_bus': '06:00', 'last_bus': '20:00'})['headway'] == 120
+    assert route_service({'frequency': 'every 15 min'})['headway'] == 15
+
+    service = route_service({})
+    assert not service['published']
+    assert (service['first'], service['last']) == (parse_clock('06:00'), parse_clock('22:00'))
+
+
+def test_invalid_clock_times_are_rejected():
+    with pytest.raises(ValueError):
+        parse_clock('24:00')
+    with pytest.raises(ValueError):
+        parse_clock('9am')
@@ -0,0 +1,68 @@
+"""
+Tests for the route-to-route transfer table
+"""
+import random
+
+from src.data import get_dataset
+from src.data.index import normalize_stop_name
+from src.data.network import TransitNetwork
+from src.data.transfers import TransferTable
+from src.services.raptor import raptor_search
+
+
+def _table(routes):
+    network = TransitNetwork(routes)
+    return network, TransferTable(network)
+
+
+def _ids(network, *names):
+    return network.ids_for(normalize_stop_name(name) for name in names)
+
+
+def test_transfers_keep_each_route_direction():
+    network, table = _table({
+        '1': {'stops': ['A', 'B', 'C', 'D']},
+        '2': {'stops': ['E', 'C', 'F']}
+    })
+    a, c, f = _ids(network, 'A', 'C', 'F')
+
+    journeys = table.one_transfer([a], [f])
+
+    assert journeys == [{'transfers': 1, 'stops_travelled': 3, 'legs': [(0, a, c, 0, 2), (1, c, f, 1, 2)]}]
+    # Boarding after the transfer stop, or alighting before it, is not a journey
+    assert table.one_transfer(_ids(network, 'D'), _ids(network, 'F')) == []
+    assert table.one_transfer(_ids(network, 'A'), _ids(network, 'E')) == []
+
+
+def test_shortest_transfer_is_kept_per_route_pair():
+    network, table = _table({
+        '1': {'stops': ['A', 'B', 'C', 'D']},
+        '2': {'stops': ['B', 'Q', 'C', 'Z']}
+    })
+
+    journeys = table.one_transfer(_ids(network, 'A'), _ids(network, 'Z'))
+
+    # Changing at C rides 2 + 1 stops; changing at B would ride 1 + 3
+    assert [journey['stops_travelled'] for journey in journeys] == [3]
+    assert network.stop_names[journeys[0]['legs'][0][2]] == 'C'
+
+
+def test_table_matches_round_based_search():
+    dataset = get_dataset()
+    network = dataset.network
+    stops = list(range(network.num_stops))
+    rng = random.Random(21)
+
+    checked = 0
+    for _ in range(500):
+        source, target = rng.sample(stops, 2)
+        journeys = raptor_search(network, [source], [target], max_transfers=1)
+        if not journeys or any(journey['transfers'] == 0 for journey in journeys):
+            continue
+        table_journeys = dataset.transfers.one_transfer([source], [target])
+        assert (
+            min(journey['stops_travelled'] for journey in table_journeys)
+            == min(journey['stops_travelled'] for journey in journeys)
+        )
+        checked += 1
+    assert checked > 0